@@ -0,0 +1,35 @@
+"""Compiled path accessors and bulk pluck, against hand-written getattr
+chains.
+
+    $ python -m benchmarks.access [records]
+"""
+from __future__ import print_function, unicode_literals, absolute_import
+
+import sys
+
+from cuckoos.access import path, pluck
+from cuckoos.flock import flock
+from .common import measure, report
+from .stream import record
+
+
+def main(count=10000):
+    objects = [flock(record(index)) for index in range(count)]
+    paths = ['user.address.city', 'auth.token', 'id']
+    results = []
+    for name, func in (
+            ('getattr chain, 1 path',
+             lambda: [getattr(getattr(getattr(obj, 'user'), 'address'), 'city') for obj in objects]),
+            ('path, 1 path', lambda: [path('user.address.city')(obj) for obj in objects]),
+            ('pluck, 1 path', lambda: pluck(objects, 'user.address.city')),
+            ('pluck with default, 1 path', lambda: pluck(objects, 'user.address.city', default=None)),
+            ('getattr chain, 3 paths',
+             lambda: [(getattr(getattr(getattr(obj, 'user'), 'address'), 'city'),
+                       getattr(getattr(obj, 'auth'), 'token'), getattr(obj, 'id')) for obj in objects]),
+            ('pluck, 3 paths', lambda: pluck(objects, paths))):
+        results.append((name, measure(func, 5) * 1e3, 'ms'))
+    report('Plucking from %d records' % count, results)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,29 @@
+"""Bulk flock throughput with 1, 2, 4 and 8 workers, against a plain flock
+loop.
+
+    $ python -m benchmarks.bulk [records]
+"""
+from __future__ import print_function, unicode_literals, absolute_import
+
+import sys
+
+from cuckoos.bulk import flock_many
+from cuckoos.flock import flock
+from .common import measure, report
+from .stream import record
+
+
+def main(count=200000):
+    definitions = [record(index) for index in range(count)]
+    results = []
+    seconds = measure(lambda: [flock(definition) for definition in definitions], repeat=1)
+    results.append(('flock loop', count / seconds / 1000, 'krecords/s'))
+    for executor in ('process', 'thread'):
+        for workers in (1, 2, 4, 8):
+            seconds = measure(lambda: list(flock_many(definitions, workers, executor)), repeat=1)
+            results.append(('%s, %d workers' % (executor, workers), count / seconds / 1000, 'krecords/s'))
+    report('Bulk flock of %d records' % count, results)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,29 @@
+from __future__ import print_function, unicode_literals, absolute_import
+
+import timeit
+
+__all__ = ['measure', 'report']
+
+
+def measure(func, number=1, repeat=3):
+    """Returns the best time per call of the given function, in seconds.
+
+    :param func: callable to time, called without arguments.
+    :param number: number of calls per measure.
+    :type number: int
+    :param repeat: number of measures.
+    :type repeat: int
+    :rtype: float
+
+    """
+    return min(timeit.Timer(func).repeat(repeat=repeat, number=number)) / number
+
+
+def report(title, results):
+    """Print the given (name, value, unit) results as a table."""
+    print(title)
+    print('-' * len(title))
+    width = max(len(name) for name, _, _ in results)
+    for name, value, unit in results:
+        print('{0:<{1}}  {2:>12.3f} {3}'.format(name, width, value, unit))
+    print()
@@ -0,0 +1,61 @@
+"""flock and unflock over wide and deep trees, against the former recursive,
+dir() based implementations.
+
+    $ python -m benchmarks.flock
+"""
+from __future__ import print_function, unicode_literals, absolute_import
+
+import six
+
+from cuckoos.flock import flock, unflock, Context
+from .common import measure, report
+
+
+def legacy_flock(definition):
+    schema = {}
+    for key, value in six.iteritems(definition):
+        if isinstance(value, dict):
+            schema[key] = legacy_flock(value)
+        else:
+            schema[key] = value
+    return type(str('Flock'), (Context,), schema)()
+
+
+def legacy_unflock(obj):
+    schema = {}
+    for attr_name in (entity for entity in dir(obj) if '_' not in entity[:2]):
+        attr = getattr(obj, attr_name)
+        if isinstance(attr, Context):
+            schema[attr_name] = legacy_unflock(attr)
+        else:
+            schema[attr_name] = attr
+    return schema
+
+
+def wide(width):
+    return dict(('key%d' % index, index) for index in range(width))
+
+
+def deep(depth):
+    definition = leaf = {}
+    for _ in range(depth):
+        leaf['next'] = leaf = {}
+    leaf['value'] = 1
+    return definition
+
+
+def main():
+    for title, trees in (('Wide trees', [('width %d' % width, wide(width)) for width in (10, 100, 1000)]),
+                         ('Deep trees', [('depth %d' % depth, deep(depth)) for depth in (10, 100, 500)])):
+        results = []
+        for name, definition in trees:
+            obj, legacy_obj = flock(definition), legacy_flock(definition)
+            results.append(('legacy_flock, ' + name, measure(lambda: legacy_flock(definition), 20) * 1e6, 'us'))
+            results.append(('flock, ' + name, measure(lambda: flock(definition), 20) * 1e6, 'us'))
+            results.append(('legacy_unflock, ' + name, measure(lambda: legacy_unflock(legacy_obj), 20) * 1e6, 'us'))
+            results.append(('unflock, ' + name, measure(lambda: unflock(obj), 20) * 1e6, 'us'))
+        report(title, results)
+
+
+if __name__ == '__main__':
+    main()
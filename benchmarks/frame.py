@@ -0,0 +1,43 @@
+"""Columnar frame memory and aggregation speed, against a list of flocked
+objects.
+
+    $ python -m benchmarks.frame [records]
+"""
+from __future__ import print_function, unicode_literals, absolute_import
+
+import sys
+
+from cuckoos.flock import flock
+from cuckoos.frame import FlockFrame
+from cuckoos.memory import allocated
+from .common import measure, report
+
+
+def record(index):
+    return {
+        'id': index,
+        'user': {'age': 18 + index % 60, 'score': index * 0.5, 'name': 'User %d' % index},
+        'active': index % 2 == 0,
+    }
+
+
+def main(count=100000):
+    definitions = [record(index) for index in range(count)]
+    objects, objects_size = allocated(lambda: [flock(definition) for definition in definitions])
+    frame, frame_size = allocated(lambda: FlockFrame(definitions))
+    results = [
+        ('flock list, memory', objects_size / 2.0 ** 20, 'MiB'),
+        ('frame, memory', frame_size / 2.0 ** 20, 'MiB'),
+        ('flock list, mean age',
+         measure(lambda: sum(obj.user.age for obj in objects) / float(count), 5) * 1e3, 'ms'),
+        ('frame, mean age', measure(lambda: frame.user.age.mean(), 5) * 1e3, 'ms'),
+        ('flock list, active score',
+         measure(lambda: sum(obj.user.score for obj in objects if obj.active), 5) * 1e3, 'ms'),
+        ('frame, active score', measure(lambda: frame.user.score[frame.active].sum(), 5) * 1e3, 'ms'),
+        ('frame, build', measure(lambda: FlockFrame(definitions), repeat=1) * 1e3, 'ms'),
+    ]
+    report('Columnar frame of %d records' % count, results)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,37 @@
+"""Frozen flocks as memoization keys, against keys built with `unflock` and
+`json.dumps`.
+
+    $ python -m benchmarks.frozen [objects]
+"""
+from __future__ import print_function, unicode_literals, absolute_import
+
+import json
+import sys
+
+from cuckoos.flock import flock, unflock
+from cuckoos.frozen import freeze
+from .common import measure, report
+from .stream import record
+
+
+def main(count=1000):
+    definitions = [record(index % 100) for index in range(count)]
+    objects = [flock(definition) for definition in definitions]
+    frozen = [freeze(definition) for definition in definitions]
+    json_cache = dict((json.dumps(unflock(obj), sort_keys=True), index) for index, obj in enumerate(objects))
+    frozen_cache = dict((obj, index) for index, obj in enumerate(frozen))
+    fresh = [freeze(definition) for definition in definitions]
+    results = [
+        ('json key, lookup', measure(lambda: [json_cache[json.dumps(unflock(obj), sort_keys=True)]
+                                              for obj in objects], 5) * 1e3, 'ms'),
+        ('frozen, lookup', measure(lambda: [frozen_cache[obj] for obj in frozen], 5) * 1e3, 'ms'),
+        ('frozen, first lookup', measure(lambda: [frozen_cache[freeze(definition)]
+                                                  for definition in definitions], 5) * 1e3, 'ms'),
+        ('frozen, equal objects', measure(lambda: [a == b for a, b in zip(frozen, fresh)], 5) * 1e3, 'ms'),
+        ('freeze', measure(lambda: [freeze(definition) for definition in definitions], 5) * 1e3, 'ms'),
+    ]
+    report('Memoization keys of %d objects' % count, results)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,57 @@
+"""Handing flocked objects to code expecting mappings, directly against
+unflocking them first, over a pipeline of records.
+
+    $ python -m benchmarks.mapping [records]
+"""
+from __future__ import print_function, unicode_literals, absolute_import
+
+import sys
+
+from cuckoos import instrument
+from cuckoos.flock import flock, unflock
+from .common import measure, report
+from .stream import record
+
+template = '{id}: {user[name]} <{user[email]}> from {user[address][city]}'
+
+
+def audit(id, user, auth, **fields):
+    return id, len(user), len(auth['scopes'])
+
+
+def pipeline(objects, convert):
+    """Render, audit and filter each record, converting it for every stage
+    expecting a mapping."""
+    lines = []
+    for obj in objects:
+        if not obj.active:
+            continue
+        lines.append(template.format(**convert(obj)))
+        audit(**convert(obj))
+        if 'email' in convert(obj.user):
+            lines.append(obj.user.email)
+    return lines
+
+
+def main(count=10000):
+    objects = [flock(record(index)) for index in range(count)]
+    assert pipeline(objects, unflock) == pipeline(objects, lambda obj: obj)
+    instrument.enable()
+    try:
+        pipeline(objects, unflock)
+        calls = instrument.snapshot()['unflock']
+        instrument.reset()
+        pipeline(objects, lambda obj: obj)
+        remaining = instrument.snapshot()['unflock']
+    finally:
+        instrument.disable()
+    report('Mapping pipeline over %d records' % count, [
+        ('unflock calls, unflocking', calls, 'calls'),
+        ('unflock calls, mapping', remaining, 'calls'),
+        ('unflocking', measure(lambda: pipeline(objects, unflock), repeat=3) * 1e3, 'ms'),
+        ('mapping', measure(lambda: pipeline(objects, lambda obj: obj), repeat=3) * 1e3, 'ms'),
+    ])
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,47 @@
+"""Layered merge of large dictionaries with `combine`, against `merge`.
+
+    $ python -m benchmarks.merge [keys]
+"""
+from __future__ import print_function, unicode_literals, absolute_import
+
+import copy
+import sys
+
+from cuckoos.utils import merge, combine
+from .common import measure, report
+
+
+def layers(count, keys):
+    """Returns the given number of layers of about the given number of keys
+    in total, a tenth of them nested, half of them colliding."""
+    size = keys // count
+    return [dict(('key%d' % (index + layer * size // 2),
+                  {'value': index} if index % 10 == 0 else index) for index in range(size))
+            for layer in range(count)]
+
+
+def merge_all(definitions):
+    result = {}
+    for definition in definitions:
+        result = merge(result, definition)
+    return result
+
+
+def main(keys=1000000):
+    results = []
+    for size in (keys // 100, keys // 10, keys):
+        definitions = layers(4, size)
+        results.append(('combine, %d keys' % size, measure(lambda: combine(definitions), repeat=1) * 1e3, 'ms'))
+        copies = [copy.deepcopy(definitions) for _ in range(3)]
+        results.append(('merge, %d keys' % size, measure(lambda: merge_all(copies.pop()), repeat=3) * 1e3, 'ms'))
+    for count in (1000, 10000, 30000):
+        definitions = [{'key': index} for index in range(count)]
+        results.append(('combine, %d collisions' % count,
+                        measure(lambda: combine(definitions), repeat=1) * 1e3, 'ms'))
+        results.append(('merge, %d collisions' % count,
+                        measure(lambda: merge_all(definitions), repeat=1) * 1e3, 'ms'))
+    report('Merging layers', results)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
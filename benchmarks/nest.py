@@ -0,0 +1,124 @@
+"""Call overhead of fledged nested methods, against plain method calls and the
+former wrapper based fledge, and creation of nested classes against the former
+partition/merge/consolidated compiler.
+
+    $ python -m benchmarks.nest
+"""
+from __future__ import print_function, unicode_literals, absolute_import
+
+from functools import update_wrapper
+
+import six
+
+from cuckoos.flock import flock, get_context
+from cuckoos.nest import Nest, NestedObjectType, excluded, fledge
+from cuckoos.utils import merge, partition
+from .common import measure, report
+
+
+def legacy_fledge(method):
+    def wrapped_method(self, *args, **kwargs):
+        result = method(get_context(self), *args, **kwargs)
+        update_wrapper(wrapped_method, method)
+        return result
+
+    update_wrapper(wrapped_method, method)
+    return wrapped_method
+
+
+class Plain(object):
+    def method(self, value):
+        return value
+
+
+class Birds(Nest):
+    def method(self, value):
+        return value
+
+    def nested__method(self, value):
+        return value
+
+    def nested__deeper__method(self, value):
+        return value
+
+
+class Legacy(object):
+    nested = flock({'method': legacy_fledge(Plain.__dict__['method'])})
+
+
+def legacy_consolidated(schema):
+    if not isinstance(schema, dict):
+        return schema
+    consolidated_schema = {}
+    for key, value in six.iteritems(schema):
+        if isinstance(value, list):
+            value_dict = {}
+            for element in value:
+                if six.callable(element):
+                    element = {'__call__': element}
+                value_dict = merge(value_dict, element)
+            consolidated_schema[key] = legacy_consolidated(value_dict)
+        else:
+            consolidated_schema[key] = legacy_consolidated(value)
+    return consolidated_schema
+
+
+def legacy_compile(namespace):
+    schema = {}
+    for method_name, reference in six.iteritems(namespace):
+        if excluded(method_name, reference):
+            structure = {method_name: reference}
+        else:
+            reference = fledge(reference)
+            structure = partition(method_name, reference)
+        schema = merge(schema, structure)
+    for key, value in six.iteritems(legacy_consolidated(schema)):
+        schema[key] = flock(value) if isinstance(value, dict) else value
+    return schema
+
+
+def methods(count):
+    """Namespace of `count` methods, a few namespaces holding many siblings."""
+    def method(self):
+        pass
+
+    namespace = {'api': method}
+    for index in range(count):
+        namespace['api__group%d__method%d' % (index % 10, index)] = method
+        namespace['api__group%d' % (index % 10)] = method
+    return namespace
+
+
+def creation(number=1):
+    results = []
+    for count in (10, 100, 1000, 10000):
+        namespace = methods(count)
+        results.append(('legacy, %d methods' % count,
+                        measure(lambda: legacy_compile(namespace), number) * 1e3, 'ms'))
+        results.append(('NestedObjectType, %d methods' % count,
+                        measure(lambda: NestedObjectType(str('Api'), (object,), dict(namespace)),
+                                number) * 1e3, 'ms'))
+    report('Class creation', results)
+
+
+def calls(number=100000):
+    plain, birds, legacy = Plain(), Birds(), Legacy()
+    baseline = measure(lambda: plain.method(1), number)
+    results = [('plain method', baseline * 1e9, 'ns')]
+    for name, func in (('fledged method', lambda: birds.method(1)),
+                       ('fledged nested method', lambda: birds.nested.method(1)),
+                       ('fledged deeper method', lambda: birds.nested.deeper.method(1)),
+                       ('legacy nested method', lambda: legacy.nested.method(1))):
+        seconds = measure(func, number)
+        results.append((name, seconds * 1e9, 'ns'))
+        results.append((name + ' (overhead)', (seconds - baseline) * 1e9, 'ns'))
+    report('Call overhead', results)
+
+
+def main():
+    calls()
+    creation()
+
+
+if __name__ == '__main__':
+    main()
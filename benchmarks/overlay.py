@@ -0,0 +1,53 @@
+"""Per-request configuration overrides with overlays, against merging the
+overrides into an unflocked copy of the configuration, for growing
+configurations, and for a growing level left untouched by the overrides.
+
+    $ python -m benchmarks.overlay [overrides]
+"""
+from __future__ import print_function, unicode_literals, absolute_import
+
+import sys
+
+from cuckoos.flock import flock, unflock
+from cuckoos.overlay import overlay
+from cuckoos.utils import combine
+from .common import measure, report
+
+
+def configuration(size):
+    """Returns a configuration of about the given number of values, in
+    sections of 10."""
+    return dict(('section%d' % section, dict(('key%d' % key, key) for key in range(10)))
+                for section in range(max(size // 10, 1)))
+
+
+def main(count=5):
+    overrides = dict(('section%d' % section, {'key0': -1, 'extra': True}) for section in range(count))
+    results = []
+    for size in (100, 10000, 100000):
+        base = flock(configuration(size))
+
+        def request():
+            obj = overlay(base, overrides)
+            return obj.section0.key0, obj.section1.key1
+
+        def copy():
+            obj = flock(combine([unflock(base), overrides], 'override'))
+            return obj.section0.key0, obj.section1.key1
+        number = 1000 if size < 100000 else 100
+        results.append(('overlay, %d values' % size, measure(request, number) * 1e6, 'us'))
+        results.append(('merged copy, %d values' % size, measure(copy, 1) * 1e6, 'us'))
+    report('Requests overriding %d sections' % count, results)
+
+    results = []
+    for size in (100, 10000, 100000):
+        base = flock({'wide': dict(('key%d' % key, key) for key in range(size)), 'other': {'key': 0}})
+
+        def untouched():
+            return overlay(base, {'other': {'key': 1}}).wide.key0
+        results.append(('overlay, %d values' % size, measure(untouched, 1000) * 1e6, 'us'))
+    report('Requests reading an untouched level', results)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,60 @@
+"""Typed flock throughput, against validating records before flocking them.
+
+    $ python -m benchmarks.schema [records]
+"""
+from __future__ import print_function, unicode_literals, absolute_import
+
+import sys
+
+import six
+
+from cuckoos.flock import flock
+from cuckoos.schema import Schema
+from .common import measure, report
+from .stream import record
+
+definition = {
+    'id': int,
+    'user': {'name': str, 'email': str, 'address': {'city': str, 'zip': str}},
+    'auth': {'token': str, 'scopes': [str]},
+    'created_at': str,
+    'active': bool,
+}
+
+
+def validate(data, spec=definition):
+    """Validation walking the data against the definition, as done before
+    flocking."""
+    stack = [(data, spec)]
+    while stack:
+        data, spec = stack.pop()
+        if not isinstance(data, dict) or set(data) != set(spec):
+            raise ValueError('invalid record')
+        for key, kind in six.iteritems(spec):
+            value = data[key]
+            if isinstance(kind, dict):
+                stack.append((value, kind))
+            elif isinstance(kind, list):
+                if not isinstance(value, list) or not all(isinstance(item, kind[0]) for item in value):
+                    raise ValueError('invalid %s' % key)
+            elif not isinstance(value, kind):
+                raise ValueError('invalid %s' % key)
+    return data
+
+
+def main(count=10000):
+    records = [record(index) for index in range(count)]
+    schema = Schema(definition)
+    results = []
+    for name, func in (
+            ('flock only', lambda: [flock(data) for data in records]),
+            ('validate then flock', lambda: [flock(validate(data)) for data in records]),
+            ('schema', lambda: [schema(data) for data in records]),
+            ('schema, batch', lambda: schema.many(records))):
+        seconds = measure(func, repeat=3)
+        results.append((name, count / seconds / 1000, 'krecords/s'))
+    report('Typed flock of %d records' % count, results)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
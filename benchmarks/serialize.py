@@ -0,0 +1,40 @@
+"""Pickling and JSON serialization of flocked objects, against unflocking
+them first.
+
+    $ python -m benchmarks.serialize
+"""
+from __future__ import print_function, unicode_literals, absolute_import
+
+import json
+import pickle
+
+from cuckoos.flock import flock, unflock
+from cuckoos.serialize import dumps
+from .common import measure, report
+from .stream import record
+
+
+def main(count=1000):
+    results = []
+    for compact in (False, True):
+        mode = 'compact' if compact else 'default'
+        objects = [flock(record(index), compact) for index in range(count)]
+        pickled = pickle.dumps(objects, pickle.HIGHEST_PROTOCOL)
+        pickled_dicts = pickle.dumps([unflock(obj) for obj in objects], pickle.HIGHEST_PROTOCOL)
+        for name, func in (
+                ('unflock + json.dumps', lambda: [json.dumps(unflock(obj)) for obj in objects]),
+                ('serialize.dumps', lambda: [dumps(obj) for obj in objects]),
+                ('unflock + pickle.dumps',
+                 lambda: pickle.dumps([unflock(obj) for obj in objects], pickle.HIGHEST_PROTOCOL)),
+                ('pickle.dumps', lambda: pickle.dumps(objects, pickle.HIGHEST_PROTOCOL)),
+                ('pickle.loads + flock',
+                 lambda: [flock(definition, compact) for definition in pickle.loads(pickled_dicts)]),
+                ('pickle.loads', lambda: pickle.loads(pickled))):
+            results.append(('%s, %s' % (name, mode), measure(func, 5) * 1e3, 'ms'))
+        results.append(('pickle size, %s' % mode, len(pickled) / 1024., 'KiB'))
+        results.append(('pickle size of dictionaries, %s' % mode, len(pickled_dicts) / 1024., 'KiB'))
+    report('Serializing %d records' % count, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Streaming flock over a NDJSON fixture, against json.loads + flock.
+
+    $ python -m benchmarks.stream [records]
+"""
+from __future__ import print_function, unicode_literals, absolute_import
+
+import io
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from cuckoos.flock import flock
+from cuckoos.stream import flock_stream
+from .common import measure, report
+
+
+def record(index):
+    return {
+        'id': index,
+        'user': {
+            'name': 'User %d' % index,
+            'email': 'user%d@example.com' % index,
+            'address': {'city': 'City', 'zip': '%05d' % index},
+        },
+        'auth': {'token': '%032x' % index, 'scopes': ['read', 'write']},
+        'created_at': '2023-10-12T07:32:11',
+        'active': index % 2 == 0,
+    }
+
+
+def write_fixture(path, count):
+    with io.open(path, 'w', encoding='utf-8') as fd:
+        for index in range(count):
+            fd.write(json.dumps(record(index)) + '\n')
+
+
+def loads_flock(path):
+    with io.open(path, encoding='utf-8') as fd:
+        for line in fd:
+            flock(json.loads(line))
+
+
+def stream_flock(path):
+    with io.open(path, encoding='utf-8') as fd:
+        for _ in flock_stream(fd):
+            pass
+
+
+def peak_memory(func, path):
+    tracemalloc.start()
+    try:
+        func(path)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(count=100000):
+    fd, path = tempfile.mkstemp(suffix='.ndjson')
+    os.close(fd)
+    try:
+        write_fixture(path, count)
+        size = os.path.getsize(path) / float(1 << 20)
+        results = []
+        for name, func in (('json.loads + flock', loads_flock),
+                           ('flock_stream', stream_flock)):
+            seconds = measure(lambda: func(path))
+            results.append((name, count / seconds / 1000, 'krecords/s'))
+            results.append((name + ' (peak)', peak_memory(func, path) / 1024., 'KiB'))
+        report('Streaming %d records (%.1f MiB)' % (count, size), results)
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,224 @@
+"""Regression suite over the hot paths of cuckoos, compared against a stored
+baseline.
+
+    $ python -m benchmarks                      # compare against the baseline
+    $ python -m benchmarks --save               # record a new baseline
+    $ python -m benchmarks --threshold 1.3 --output results.json
+
+Cases are timed as the best time per call, in seconds. A case fails when it
+is slower than its baseline by more than the threshold, a ratio which
+defaults to the one stored in the baseline and can be overridden per case
+there (`"thresholds": {"flock, width 1000": 2.0}`).
+"""
+from __future__ import print_function, unicode_literals, absolute_import
+
+import argparse
+import io
+import json
+import os
+import re
+import sys
+from collections import OrderedDict
+from operator import attrgetter
+
+from cuckoos.access import pluck
+from cuckoos.flock import flock, unflock, get_context
+from cuckoos.nest import Nest, NestedObjectType
+from cuckoos.utils import merge, partition
+from .common import measure, report
+from .flock import wide, deep
+from .nest import methods
+from .stream import record
+
+__all__ = ['cases', 'run', 'compare', 'main']
+
+baseline_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+default_threshold = 1.5
+
+cases = OrderedDict()
+
+
+def case(name, number):
+    """Register a benchmark case. The decorated function prepares the case
+    and returns the callable to time, called `number` times per measure."""
+    def register(setup):
+        cases[name] = (setup, number)
+        return setup
+    return register
+
+
+def flock_cases():
+    trees = [('width %d' % width, width, wide(width)) for width in (10, 100, 1000)] + \
+            [('depth %d' % depth, depth, deep(depth)) for depth in (10, 100)]
+    for name, size, definition in trees:
+        number = 200 if size <= 10 else 20
+
+        def flock_setup(definition=definition):
+            return lambda: flock(definition)
+
+        def unflock_setup(definition=definition):
+            obj = flock(definition)
+            return lambda: unflock(obj)
+
+        case('flock, ' + name, number)(flock_setup)
+        case('unflock, ' + name, number)(unflock_setup)
+
+
+def access_cases():
+    for depth in (1, 3, 10):
+        def setup(depth=depth):
+            obj, get = flock(deep(depth)), attrgetter('.'.join(['next'] * depth + ['value']))
+            return lambda: get(obj)
+        case('access, depth %d' % depth, 10000)(setup)
+
+
+flock_cases()
+access_cases()
+
+
+class Birds(Nest):
+    def method(self, value):
+        return value
+
+    def nested__method(self, value):
+        return value
+
+    def nested__deeper__method(self, value):
+        return value
+
+
+@case('fledged call, nested', 10000)
+def nested_call():
+    birds = Birds()
+    return lambda: birds.nested.method(1)
+
+
+@case('fledged call, deeper', 10000)
+def deeper_call():
+    birds = Birds()
+    return lambda: birds.nested.deeper.method(1)
+
+
+@case('get_context, nested', 10000)
+def nested_context():
+    nested = flock(deep(3)).next.next
+    return lambda: get_context(nested)
+
+
+@case('NestedObjectType, 100 methods', 20)
+def small_class():
+    namespace = methods(100)
+    return lambda: NestedObjectType(str('Api'), (object,), dict(namespace))
+
+
+@case('NestedObjectType, 1000 methods', 2)
+def large_class():
+    namespace = methods(1000)
+    return lambda: NestedObjectType(str('Api'), (object,), dict(namespace))
+
+
+@case('merge + partition, 1000 names', 2)
+def merge_partition():
+    names = sorted(methods(1000))
+
+    def compile_names():
+        schema = {}
+        for name in names:
+            schema = merge(schema, partition(name, name))
+        return schema
+    return compile_names
+
+
+@case('pluck, 3 paths from 1000 objects', 20)
+def pluck_paths():
+    objects = [flock(record(index)) for index in range(1000)]
+    return lambda: pluck(objects, ['user.address.city', 'auth.token', 'id'])
+
+
+def run(pattern=None, repeat=5):
+    """Time the registered cases whose name matches the given pattern.
+
+    :param pattern: regular expression filtering case names.
+    :param repeat: number of measures per case, the best one being kept.
+    :return: seconds per call, by case name.
+    :rtype: OrderedDict
+
+    """
+    results = OrderedDict()
+    for name, (setup, number) in cases.items():
+        if pattern is None or re.search(pattern, name):
+            results[name] = measure(setup(), number, repeat)
+    return results
+
+
+def compare(results, baseline, threshold=None):
+    """Compare results against a baseline.
+
+    :param results: seconds per call, by case name.
+    :type results: dict
+    :param baseline: baseline as stored by `--save`.
+    :type baseline: dict
+    :param threshold: maximum slowdown ratio, overriding the baseline ones.
+    :type threshold: float
+    :return: (name, seconds, ratio, failed) tuples, ratio being None for cases
+             missing from the baseline.
+    :rtype: list
+
+    """
+    reference = baseline.get('results', {})
+    thresholds = baseline.get('thresholds', {})
+    comparison = []
+    for name, seconds in results.items():
+        if name not in reference:
+            comparison.append((name, seconds, None, False))
+            continue
+        limit = threshold or thresholds.get(name) or baseline.get('threshold', default_threshold)
+        ratio = seconds / reference[name]
+        comparison.append((name, seconds, ratio, ratio > limit))
+    return comparison
+
+
+def load(path):
+    with io.open(path, encoding='utf-8') as fd:
+        return json.load(fd)
+
+
+def dump(data, path):
+    with io.open(path, 'w', encoding='utf-8') as fd:
+        fd.write(json.dumps(data, indent=2, sort_keys=True) + '\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.split('\n')[0])
+    parser.add_argument('--baseline', default=baseline_path, help='baseline file (default: %(default)s)')
+    parser.add_argument('--save', action='store_true', help='store results as the new baseline')
+    parser.add_argument('--threshold', type=float, help='maximum slowdown ratio')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--filter', help='only run cases matching this regular expression')
+    parser.add_argument('--repeat', type=int, default=5, help='measures per case (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.repeat)
+    if args.save:
+        baseline = load(args.baseline) if os.path.exists(args.baseline) else {}
+        baseline.setdefault('results', {}).update(results)
+        baseline.setdefault('threshold', default_threshold)
+        dump(baseline, args.baseline)
+        report('Saved baseline', [(name, seconds * 1e6, 'us') for name, seconds in results.items()])
+        return 0
+
+    baseline = load(args.baseline) if os.path.exists(args.baseline) else {}
+    comparison = compare(results, baseline, args.threshold)
+    if args.output:
+        dump({'results': results,
+              'comparison': [{'name': name, 'seconds': seconds, 'ratio': ratio, 'failed': failed}
+                             for name, seconds, ratio, failed in comparison]},
+             args.output)
+    report('Benchmarks', [(name + (' (x%.2f%s)' % (ratio, ', SLOWER' if failed else '') if ratio else ''),
+                           seconds * 1e6, 'us')
+                          for name, seconds, ratio, failed in comparison])
+    failures = [name for name, _, _, failed in comparison if failed]
+    if failures:
+        print('Slower than baseline: ' + ', '.join(failures), file=sys.stderr)
+        return 1
+    return 0
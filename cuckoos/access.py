@@ -0,0 +1,130 @@
+from __future__ import unicode_literals, absolute_import
+
+from operator import attrgetter
+from threading import Lock
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+
+import six
+
+from .delta import missing
+
+__all__ = ['path', 'pluck']
+
+# Compiled getters, least recently used first, by paths, separator and
+# default (along with its type, so that equal defaults of different types are
+# not mixed up).
+getters = OrderedDict()
+getters_lock = Lock()
+max_getters = 1024
+
+
+def path(spec, sep='.', default=missing):
+    """
+    Returns a getter of the given path, compiled once.
+
+    Paths are split as `cuckoos.utils.partition` splits names and compiled
+    into an `operator.attrgetter`, cached by path, separator and default
+    (unless the default cannot be hashed).
+    >>> from cuckoos.flock import flock
+    >>> obj = flock({'user': {'auth': {'token': 'abc'}}})
+    >>> path('user.auth.token')(obj)
+    'abc'
+    >>> path('user__name', sep='__', default=None)(obj) is None
+    True
+
+    :param spec: path of the value.
+    :type spec: basestring
+    :param sep: separator of the names of the path.
+    :type sep: basestring
+    :param default: value returned when a level of the path is missing.
+                    AttributeError is raised if not given.
+    :rtype: callable
+
+    """
+    return compiled(spec, sep, default)
+
+
+def compiled(specs, sep, default=missing):
+    """Returns the getter of the given path (or tuple of paths), compiled once
+    and kept in a bounded LRU cache."""
+    key = (specs, sep, type(default), default)
+    try:
+        hash(key)
+    except TypeError:
+        return compile_path(specs, sep, default)
+    with getters_lock:
+        getter = getters.pop(key, None)
+        if getter is None:
+            getter = compile_path(specs, sep, default)
+            while len(getters) >= max_getters:
+                getters.popitem(last=False)
+        getters[key] = getter
+        return getter
+
+
+def compile_path(specs, sep, default):
+    if isinstance(specs, six.string_types):
+        getter = attrgetter('.'.join(specs.split(sep)))
+    else:
+        getter = attrgetter(*['.'.join(spec.split(sep)) for spec in specs])
+    if default is missing:
+        return getter
+
+    def get(obj):
+        try:
+            return getter(obj)
+        except AttributeError:
+            return default
+    return get
+
+
+def pluck(objects, paths, sep='.', default=missing):
+    """
+    Returns the values of the given paths for each of the given objects.
+
+    Values of a single path are returned as they are, values of several paths
+    as tuples. All paths are read at once, by a single compiled getter.
+    >>> from cuckoos.flock import flock
+    >>> objects = [flock({'id': index, 'user': {'name': 'User %d' % index}}) for index in range(2)]
+    >>> pluck(objects, 'user.name')
+    ['User 0', 'User 1']
+    >>> pluck(objects, ['id', 'user.email'], default='')
+    [(0, ''), (1, '')]
+
+    :param objects: objects to read values from.
+    :param paths: path or list of paths.
+    :param sep: separator of the names of the paths.
+    :type sep: basestring
+    :param default: value of missing paths. AttributeError is raised if not
+                    given.
+    :rtype: list
+
+    """
+    single = isinstance(paths, six.string_types)
+    if single:
+        getter = compiled(paths, sep)
+    else:
+        paths = tuple(paths)
+        getter = compiled(paths, sep)
+        if len(paths) == 1:
+            getter = one_tuple(getter)
+    if default is missing:
+        return [getter(obj) for obj in objects]
+    fallback = [path(spec, sep, default) for spec in ([paths] if single else paths)]
+    values = []
+    for obj in objects:
+        try:
+            values.append(getter(obj))
+        except AttributeError:
+            # Only objects missing a level pay for reading paths one by one.
+            value = tuple(get(obj) for get in fallback)
+            values.append(value[0] if single else value)
+    return values
+
+
+def one_tuple(getter):
+    return lambda obj: (getter(obj),)
@@ -0,0 +1,87 @@
+"""Asyncio helpers for nested coroutine methods (Python 3.5+)."""
+from __future__ import unicode_literals, absolute_import
+
+import asyncio
+import timeit
+from functools import update_wrapper
+from inspect import iscoroutinefunction, isasyncgenfunction
+from operator import attrgetter
+
+from six import string_types
+
+__all__ = ['fan_out']
+
+timer = timeit.default_timer
+
+
+async def fan_out(obj, calls, limit=None, return_exceptions=False):
+    """
+    Run nested coroutine methods of the given object concurrently.
+
+    Calls are given as dotted paths from the object, optionally with their
+    arguments: 'get.json', ('get.json', (key,)) or ('get.json', (key,),
+    {'timeout': 1}). Results are returned in the order of the calls.
+    >>> from cuckoos import Nest
+    >>> class Client(Nest):
+    ...     async def get__json(self, key):
+    ...         return {'id': key}
+    ...
+    >>> loop = asyncio.new_event_loop()
+    >>> loop.run_until_complete(fan_out(Client(), [('get.json', (1,)), ('get.json', (2,))]))
+    [{'id': 1}, {'id': 2}]
+    >>> loop.close()
+
+    :param obj: object the methods are looked up from.
+    :param calls: iterable of calls.
+    :param limit: maximum number of calls running at once, unbounded if None.
+    :type limit: int
+    :param return_exceptions: whether exceptions are returned as results
+                              rather than raised, see `asyncio.gather`.
+    :type return_exceptions: bool
+    :rtype: list
+
+    """
+    semaphore = asyncio.Semaphore(limit) if limit else None
+
+    async def run(method, args, kwargs):
+        if semaphore is None:
+            return await method(*args, **kwargs)
+        async with semaphore:
+            return await method(*args, **kwargs)
+
+    awaitables = []
+    for call in calls:
+        call = (call,) if isinstance(call, string_types) else tuple(call)
+        path, args, kwargs = call + ((), {})[len(call) - 1:]
+        awaitables.append(run(attrgetter(path)(obj), args, kwargs))
+    return await asyncio.gather(*awaitables, return_exceptions=return_exceptions)
+
+
+def timed(method, record):
+    """Returns a wrapper of the given method calling `record` with the
+    duration of each call, in seconds. Coroutine methods are timed until
+    awaited and asynchronous generators until exhausted, wrappers being of the
+    same kind as the method."""
+    if iscoroutinefunction(method):
+        async def wrapper(*args, **kwargs):
+            start = timer()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                record(timer() - start)
+    elif isasyncgenfunction(method):
+        async def wrapper(*args, **kwargs):
+            start = timer()
+            try:
+                async for item in method(*args, **kwargs):
+                    yield item
+            finally:
+                record(timer() - start)
+    else:
+        def wrapper(*args, **kwargs):
+            start = timer()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                record(timer() - start)
+    return update_wrapper(wrapper, method)
@@ -0,0 +1,154 @@
+from __future__ import unicode_literals, absolute_import
+
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+
+import six
+
+from .flock import flock, adopt, instantiate, plain_types, registry
+
+__all__ = ['flock_many']
+
+
+def flock_many(iterable, workers=None, executor='process', chunksize=1000, compact=False):
+    """
+    Flock every definition of the given iterable, using a pool of workers.
+
+    Definitions are sent to workers by chunks and flocked objects are yielded
+    in order, as soon as their chunk is done. At most two chunks per worker
+    are in flight at once, so that neither definitions nor results pile up.
+    >>> [obj.one.two for obj in flock_many([{'one': {'two': index}} for index in range(3)])]
+    [0, 1, 2]
+
+    Process workers do not send flocked objects back: they walk definitions
+    and send their shapes and values, encoded so that each shape is sent once
+    per chunk. Flocked objects are then built straight from the cached types
+    of these shapes, without walking definitions again (see `encode_chunk`).
+
+    :param iterable: definitions to flock.
+    :param workers: number of workers. Definitions are flocked in the current
+                    thread when None.
+    :type workers: int
+    :param executor: 'process' or 'thread' to use a pool of the given kind,
+                     or a `multiprocessing` pool (or thread pool) to use.
+    :param chunksize: number of definitions sent to a worker at once.
+    :type chunksize: int
+    :param compact: whether to flock objects in compact mode.
+    :type compact: bool
+    :return: generator of flocked objects.
+
+    """
+    if not workers and isinstance(executor, six.string_types):
+        for definition in iterable:
+            yield flock(definition, compact)
+        return
+    if executor == 'process':
+        pool, decode = Pool(workers), True
+    elif executor == 'thread':
+        pool, decode = ThreadPool(workers), False
+    elif hasattr(executor, 'apply_async'):
+        pool, decode = executor, not isinstance(executor, ThreadPool)
+    else:
+        raise ValueError('Unknown executor %r' % (executor,))
+    window = 2 * (workers or getattr(pool, '_processes', 1))
+    iterable = iter(iterable)
+    chunks = iter(lambda: list(islice(iterable, chunksize)), [])
+    pending = deque()
+    try:
+        for chunk in chunks:
+            if decode:
+                pending.append(pool.apply_async(encode_chunk, (chunk,)))
+            else:
+                pending.append(pool.apply_async(flock_chunk, (chunk, compact)))
+            if len(pending) < window:
+                continue
+            for obj in results(pending.popleft().get(), decode, compact):
+                yield obj
+        while pending:
+            for obj in results(pending.popleft().get(), decode, compact):
+                yield obj
+    finally:
+        if pool is not executor:
+            pool.terminate()
+
+
+def results(chunk, decode, compact):
+    return decode_chunk(chunk, compact) if decode else chunk
+
+
+def flock_chunk(chunk, compact):
+    return [flock(definition, compact) for definition in chunk]
+
+
+def encode_chunk(chunk):
+    """
+    Encode the given definitions as (shapes, records), to be flocked by
+    `decode_chunk`.
+
+    Shapes are (names, bound, nested) tuples: the names of the fields of a
+    level, the names of its bindable fields and the positions of its nested
+    levels. Records are lists of (shape, values) nodes, nested levels coming
+    before their parent and being referred to by their index in place of
+    their value.
+    >>> encode_chunk([{'one': {'two': 2}}])
+    ([(('two',), (), ()), (('one',), ('one',), (0,))], [[(0, [2]), (1, [0])]])
+
+    """
+    shapes, indices, records = [], {}, []
+    for definition in chunk:
+        assert isinstance(definition, dict)
+        nodes = []
+        stack = [(six.iteritems(definition), [], [], [], [])]
+        while stack:
+            items, names, values, bound, nested = stack[-1]
+            for key, value in items:
+                if isinstance(value, dict):
+                    stack.append((six.iteritems(value), [], [], [], []))
+                    names.append(key)
+                    values.append(None)
+                    bound.append(key)
+                    nested.append(len(values) - 1)
+                    break
+                if not isinstance(value, plain_types) and hasattr(type(value), '__get__'):
+                    bound.append(key)
+                names.append(key)
+                values.append(value)
+            else:
+                stack.pop()
+                shape = (tuple(names), tuple(bound), tuple(nested))
+                index = indices.get(shape)
+                if index is None:
+                    index = indices[shape] = len(shapes)
+                    shapes.append(shape)
+                if stack:
+                    stack[-1][2][-1] = len(nodes)
+                nodes.append((index, values))
+        records.append(nodes)
+    return shapes, records
+
+
+def decode_chunk(chunk, compact=False):
+    """Build flocked objects out of definitions encoded by `encode_chunk`.
+
+    :param chunk: (shapes, records) tuple.
+    :param compact: whether to build objects in compact mode.
+    :type compact: bool
+    :rtype: list
+
+    """
+    shapes, records = chunk
+    # Types are looked up once per shape rather than once per object.
+    shapes = [(names, nested, registry[(names, bound, compact)])
+              for names, bound, nested in shapes]
+    objects = []
+    for nodes in records:
+        built = []
+        for index, values in nodes:
+            names, nested, cls = shapes[index]
+            for position in nested:
+                values[position] = built[values[position]]
+            built.append(instantiate(cls, dict(zip(names, values)), compact))
+        objects.append(adopt(built.pop(), built))
+    return objects
@@ -0,0 +1,237 @@
+from __future__ import unicode_literals, absolute_import
+
+import weakref
+from functools import update_wrapper
+from threading import Lock
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+
+try:
+    from time import monotonic as default_timer
+except ImportError:  # Python 2
+    from time import time as default_timer
+
+try:
+    from inspect import iscoroutinefunction
+except ImportError:  # Python 2
+    def iscoroutinefunction(func):
+        return False
+
+from .access import path as compile_path
+from .flock import get_context
+from .registry import CacheInfo
+
+__all__ = ['cached', 'cache_info', 'invalidate']
+
+# Caches of each instance, by id, along with a weak reference to the instance
+# dropping them once it is collected.
+instances = {}
+instances_lock = Lock()
+# Separates positional and keyword arguments in cache keys.
+keywords = object()
+# Returned by `Cache.get` for missing keys.
+miss = object()
+
+
+def cached(maxsize=128, ttl=None, timer=default_timer):
+    """
+    Decorator caching the results of a method per instance, keyed on its
+    arguments.
+
+    Caches are held by the top most context of the namespace the method is
+    called from (the instance of a `Nest`, for nested methods), so that
+    `get__json` shares its cache with every `obj.get.json` lookup and not with
+    other instances. They live as long as the instance, which must support
+    weak references. Results are computed outside of the cache lock: two
+    threads missing the same key at once both call the method.
+    >>> from cuckoos.nest import Nest
+    >>> class Client(Nest):
+    ...     calls = 0
+    ...
+    ...     @cached(maxsize=16, ttl=60)
+    ...     def get__json(self, key):
+    ...         self.calls += 1
+    ...         return {'key': key}
+    ...
+    >>> client = Client()
+    >>> client.get.json(1) is client.get.json(1), client.calls
+    (True, 1)
+    >>> cache_info(client, 'get.json')
+    CacheInfo(hits=1, misses=1, evictions=0, maxsize=16, currsize=1)
+
+    :param maxsize: maximum number of results cached per instance, the least
+                    recently used one being evicted first. None for no limit.
+    :type maxsize: int
+    :param ttl: number of seconds results are kept for. None for no limit.
+    :type ttl: float
+    :param timer: clock measuring time to live, in seconds.
+    :rtype: callable
+
+    """
+    def decorate(method):
+        if iscoroutinefunction(method) or iscoroutinefunction(getattr(method, '__func__', None)):
+            raise TypeError('Coroutine methods cannot be cached, their coroutines can be awaited once only')
+
+        def call(self, *args, **kwargs):
+            cache = cache_of(get_context(self), call, True)
+            key = make_key(args, kwargs)
+            value = cache.get(key)
+            if value is not miss:
+                return value
+            value = method(self, *args, **kwargs)
+            cache.set(key, value)
+            return value
+        if hasattr(method, '__name__'):
+            update_wrapper(call, method)
+        call.cache_parameters = {'maxsize': maxsize, 'ttl': ttl}
+        call.new_cache = lambda: Cache(maxsize, ttl, timer)
+        return call
+    return decorate
+
+
+class Cache(object):
+    """Results of a method for a single instance, in least recently used
+    order, along with their expiry time.
+
+    :param maxsize: maximum number of results, None for no limit.
+    :type maxsize: int
+    :param ttl: number of seconds results are kept for, None for no limit.
+    :type ttl: float
+    :param timer: clock measuring time to live.
+
+    """
+    def __init__(self, maxsize, ttl, timer):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.results = OrderedDict()
+        self.lock = Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            try:
+                expiry, value = self.results[key]
+            except KeyError:
+                self.misses += 1
+                return miss
+            if expiry is not None and self.timer() >= expiry:
+                del self.results[key]
+                self.misses += 1
+                return miss
+            # Moved to the end as the most recently used result.
+            del self.results[key]
+            self.results[key] = (expiry, value)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        expiry = None if self.ttl is None else self.timer() + self.ttl
+        with self.lock:
+            self.results.pop(key, None)
+            self.results[key] = (expiry, value)
+            if self.maxsize is not None:
+                while len(self.results) > self.maxsize:
+                    self.results.popitem(last=False)
+                    self.evictions += 1
+
+    def discard(self, key=miss):
+        with self.lock:
+            if key is miss:
+                self.results.clear()
+            else:
+                self.results.pop(key, None)
+
+    def info(self):
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self.results))
+
+
+def make_key(args, kwargs):
+    return args + (keywords,) + tuple(sorted(kwargs.items())) if kwargs else args
+
+
+def cache_of(instance, method, create=False):
+    """Returns the cache of the given cached method for the given instance,
+    or None if not created yet (and not asked to)."""
+    entry = instances.get(id(instance))
+    if entry is not None and entry[0]() is instance:
+        cache = entry[1].get(method)
+        if cache is not None or not create:
+            return cache
+    elif not create:
+        return None
+    with instances_lock:
+        entry = instances.get(id(instance))
+        if entry is None or entry[0]() is not instance:
+            key = id(instance)
+            try:
+                reference = weakref.ref(instance, lambda _: instances.pop(key, None))
+            except TypeError:
+                raise TypeError('%r cannot hold caches, it does not support weak references' % (instance,))
+            entry = instances[key] = (reference, {})
+        cache = entry[1].get(method)
+        if cache is None:
+            cache = entry[1][method] = method.new_cache()
+        return cache
+
+
+def resolve(obj, path):
+    """Returns the cached method found at the given dotted path of the given
+    object, namespaces standing for their `__call__` method."""
+    target = compile_path(path)(obj)
+    method = getattr(target, '__func__', None)
+    if method is None:
+        method = getattr(getattr(target, '__call__', None), '__func__', None)
+    if not hasattr(method, 'cache_parameters'):
+        raise ValueError('%s is not a cached method' % path)
+    return method
+
+
+def cache_info(obj, path):
+    """Returns the statistics of the cache of the method found at the given
+    dotted path, for the given object.
+
+    :param obj: instance holding the cache.
+    :param path: dotted path of the method, e.g. 'get.json'.
+    :type path: basestring
+    :rtype: CacheInfo
+    :raises ValueError: if the method is not cached.
+
+    """
+    method = resolve(obj, path)
+    cache = cache_of(get_context(obj), method)
+    if cache is None:
+        return CacheInfo(0, 0, 0, method.cache_parameters['maxsize'], 0)
+    return cache.info()
+
+
+def invalidate(obj, path=None, *args, **kwargs):
+    """
+    Drop cached results of the given object: every result of every method if
+    no path is given, every result of the method at the given dotted path if
+    no arguments are given, and the result of the given arguments otherwise.
+
+    :param obj: instance holding the caches.
+    :param path: dotted path of the method, e.g. 'get.json'.
+    :type path: basestring
+    :raises ValueError: if the method is not cached.
+
+    """
+    instance = get_context(obj)
+    if path is None:
+        entry = instances.get(id(instance))
+        if entry is not None and entry[0]() is instance:
+            for cache in list(entry[1].values()):
+                cache.discard()
+        return
+    cache = cache_of(instance, resolve(obj, path))
+    if cache is None:
+        return
+    if args or kwargs:
+        cache.discard(make_key(args, kwargs))
+    else:
+        cache.discard()
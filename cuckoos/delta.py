@@ -0,0 +1,220 @@
+from __future__ import unicode_literals, absolute_import
+
+import six
+
+from .flock import Context, flock, unflock, build, bindable, registry, fields
+from .utils import extend, listify
+
+__all__ = ['patch', 'diff', 'missing']
+
+
+class Missing(object):
+    """Placeholder for a field which does not exist."""
+    __slots__ = ()
+
+    def __repr__(self):
+        return 'missing'
+
+    def __reduce__(self):
+        return str('missing')
+
+
+missing = Missing()
+
+
+def patch(obj, delta, copy=False, overwrite=False, callback=None):
+    """
+    Apply the given delta to a flocked object, without rebuilding it.
+
+    Deltas are nested dictionaries merged into the object level by level, as
+    `cuckoos.utils.merge` merges dictionaries: fields missing from the object
+    are added and fields found in both become multi-value fields, unless
+    overwritten. A `missing` value removes the field. Levels left untouched
+    by the delta are neither walked nor copied.
+    >>> obj = flock({'one': {'two': 2}, 'three': 3})
+    >>> patch(obj, {'one': {'two': 4, 'five': 5}}).one.two
+    [2, 4]
+    >>> patch(obj, {'one': {'two': 2}, 'three': missing}, overwrite=True) is obj
+    True
+    >>> unflock(obj)
+    {'one': {'two': 2, 'five': 5}}
+
+    :param obj: flocked object to patch.
+    :type obj: Context
+    :param delta: changes to apply.
+    :type delta: dict
+    :param copy: whether to leave the object untouched and return a patched
+                 copy, sharing unchanged levels with the object. Otherwise the
+                 object is patched in place, except for lazy levels and
+                 compact levels whose fields change, which are replaced within
+                 their parent. Copies of the object bound to other contexts
+                 (namespaces looked up from instances, see `bind`) are taken
+                 when first looked up and do not see changes made in place:
+                 patch shared namespaces with copy=True and replace them.
+    :type copy: bool
+    :param overwrite: whether values of the delta replace values of the
+                      object rather than being merged with them.
+    :type overwrite: bool
+    :param callback: called with the path of each changed field (as a
+                     tuple of names), its former value and its new value,
+                     `missing` standing for fields added or removed, once the
+                     object is patched.
+    :return: patched object.
+    :rtype: Context
+    :raises TypeError: if the fields of the compact object to patch in place
+                       change, or if it is lazy. The object is left untouched.
+
+    """
+    assert isinstance(obj, Context) and isinstance(delta, dict)
+    # Objects created along the way, and whether objects nested in them are
+    # new as well (flocked values) or shared with the original object.
+    created = []
+    # Objects updated in place and changed fields are only committed once the
+    # whole delta is walked, so that a failed patch leaves the object as is.
+    updates, changes = [], []
+    # Levels are patched depth first, using an explicit stack of suspended
+    # levels, each one being rebuilt (or updated) once its children are done.
+    stack = [(obj, six.iteritems(delta), values_of(obj), ())]
+    while True:
+        target, items, values, path = stack[-1]
+        for key, change in items:
+            old = values.get(key, missing)
+            if change is missing:
+                if old is missing:
+                    continue
+                del values[key]
+                new = missing
+            elif isinstance(change, dict) and isinstance(old, Context):
+                stack.append((old, six.iteritems(change), values_of(old), path + (key,)))
+                break
+            elif overwrite and old is not missing and (old is change or old == change):
+                continue
+            elif overwrite or old is missing:
+                new = values[key] = change
+            else:
+                new = values[key] = extend(listify(unflock(old) if isinstance(old, Context) else old), change)
+            if isinstance(new, dict):
+                new = values[key] = flock(new, getattr(type(target), '__storage__', None) is not None)
+                created.append((new, True))
+            if callback is not None:
+                changes.append((path + (key,), old, new))
+        else:
+            stack.pop()
+            patched = rebuild(target, values, copy, updates)
+            if not stack:
+                break
+            if patched is not target:
+                created.append((patched, False))
+                stack[-1][2][path[-1]] = patched
+    if copy:
+        patched.__context__ = None
+        context = patched
+    elif patched is not obj:
+        raise TypeError('Fields of compact or lazy objects cannot change in place, use copy=True')
+    else:
+        context = getattr(obj, '__context__', None) or obj
+    for target, values, shape in updates:
+        update(target, values, shape)
+    for new, deep in created:
+        if deep:
+            adopt_tree(new, context)
+        else:
+            new.__context__ = context
+    for change in changes:
+        callback(*change)
+    return patched
+
+
+def rebuild(target, values, copy, updates):
+    """Returns the given object holding the given values: the object itself
+    when it can be updated in place (the update being added to the given
+    ones), a new object otherwise."""
+    cls = type(target)
+    storage = getattr(cls, '__storage__', None)
+    names = tuple(values)
+    bound = tuple(name for name in names if bindable(values[name]))
+    shape = (names, bound, storage is not None)
+    if copy or not hasattr(cls, '__shape__') or (storage is not None and shape != cls.__shape__):
+        return build(values, bound, storage is not None)
+    updates.append((target, values, shape))
+    return target
+
+
+def update(target, values, shape):
+    """Update the given object in place with the given values."""
+    cls = type(target)
+    storage = getattr(cls, '__storage__', None)
+    if storage is None:
+        if shape != cls.__shape__:
+            target.__class__ = registry[shape]
+        target.__dict__ = values
+    else:
+        for slot, name in zip(storage, shape[0]):
+            slot.__set__(target, values[name])
+
+
+def adopt_tree(obj, context):
+    """Bind the given object and the objects nested in it to the given top
+    most context."""
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        obj.__context__ = context
+        stack.extend(value for value in six.itervalues(values_of(obj)) if isinstance(value, Context))
+
+
+def values_of(obj):
+    """Returns the fields of the given object (or dictionary) as they are
+    stored, by name: nested objects are not bound to their context."""
+    if isinstance(obj, dict):
+        return obj
+    cls = type(obj)
+    storage = getattr(cls, '__storage__', None)
+    if storage is not None:
+        return dict(zip(cls.__fields__, [slot.__get__(obj, cls) for slot in storage]))
+    if hasattr(cls, '__shape__'):
+        return dict(obj.__dict__)
+    return dict((name, getattr(obj, name)) for name in fields(obj))
+
+
+def diff(this, that):
+    """
+    Returns the smallest delta turning the first flocked object into the
+    second one once patched with `overwrite=True`. Levels shared by both
+    objects are not walked.
+    >>> diff(flock({'one': {'two': 2}, 'three': 3}), flock({'one': {'two': 4}}))
+    {'one': {'two': 4}, 'three': missing}
+
+    :param this: flocked object (or definition).
+    :param that: flocked object (or definition).
+    :rtype: dict
+
+    """
+    delta = {}
+    # Deltas of nested levels are added as they are walked and dropped once
+    # done if empty, the deepest ones first.
+    nested = []
+    stack = [(values_of(this), values_of(that), delta)]
+    while stack:
+        this, that, changes = stack.pop()
+        for name, value in six.iteritems(that):
+            old = this.get(name, missing)
+            if old is value:
+                continue
+            if is_level(old) and is_level(value):
+                changes[name] = {}
+                nested.append((changes, name))
+                stack.append((values_of(old), values_of(value), changes[name]))
+            elif old is missing or old != value:
+                changes[name] = unflock(value) if isinstance(value, Context) else value
+        for name in this:
+            if name not in that:
+                changes[name] = missing
+    for changes, name in reversed(nested):
+        if not changes[name]:
+            del changes[name]
+    return delta
+
+
+def is_level(value):
+    return isinstance(value, (Context, dict))
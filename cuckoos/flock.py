@@ -1,15 +1,26 @@
 from __future__ import unicode_literals, absolute_import
 
 import six
+import weakref
 from inspect import getmodule, ismethod
 from types import FunctionType, BuiltinFunctionType
+from threading import RLock
+from .registry import TypeRegistry
 
-__all__ = ['flock', 'unflock', 'get_context']
+try:
+    from collections.abc import Mapping, KeysView, ItemsView, ValuesView
+except ImportError:  # Python 2
+    from collections import Mapping, KeysView, ItemsView, ValuesView
+
+__all__ = ['flock', 'unflock', 'get_context', 'LazyFlock']
 
 collection_types = (dict, list, tuple,)
 
+# Set by `cuckoos.instrument` while instrumentation is enabled.
+monitor = None
+
 
-def flock(definition):
+def flock(definition, compact=False, lazy=False):
     """
     Turns a dictionary into an object. This supports nested structures. Each
     level will spawn a new object.
@@ -18,20 +29,114 @@ def flock(definition):
     >>> flock({'one': {'two': 2}}).one.two
     2
 
+    Flocked types are cached by shape: dictionaries sharing the same keys (and
+    the same kind of values, see `bindable`) produce instances of the same
+    type, values being stored on the instances themselves.
+    >>> type(flock({'one': 1})) is type(flock({'one': 2}))
+    True
+
+    In compact mode, flocked types declare `__slots__` for their fields so that
+    instances do not carry a `__dict__`. Keys must then be valid identifiers.
+    >>> hasattr(flock({'one': 1}, compact=True), '__dict__')
+    False
+
+    In lazy mode, the definition is wrapped rather than walked, see
+    `LazyFlock`.
+    >>> flock({'one': {'two': 2}}, lazy=True).one.two
+    2
+
     :param definition: definition of the object to flock.
     :type definition: dict
+    :param compact: whether to store values in slots rather than in a
+                    per-instance dictionary.
+    :type compact: bool
+    :param lazy: whether to flock nested levels on first access only.
+    :type lazy: bool
     :return : full-fledged object as defined by the original dictionary.
     :rtype: Namespace
 
     """
     assert isinstance(definition, dict)
-    schema = {}
-    for key, value in six.iteritems(definition):
-        if isinstance(value, dict):
-            schema[key] = flock(value)
-        else:
+    if monitor is not None:
+        monitor.count('flock')
+    if lazy:
+        return LazyFlock(definition)
+    # Nested dictionaries are walked depth first using an explicit stack of
+    # suspended levels rather than recursion, so that depth is not limited.
+    stack, nested = [], []
+    items, schema, bound = six.iteritems(definition), {}, []
+    while True:
+        for key, value in items:
+            if isinstance(value, dict):
+                stack.append((items, schema, bound, key))
+                items, schema, bound = six.iteritems(value), {}, []
+                break
+            if not isinstance(value, plain_types) and hasattr(type(value), '__get__'):
+                bound.append(key)
             schema[key] = value
-    return type(str('Flock'), (Context,), schema)()
+        else:
+            obj = build(schema, tuple(bound), compact)
+            if not stack:
+                return adopt(obj, nested)
+            nested.append(obj)
+            items, schema, bound, key = stack.pop()
+            bound.append(key)
+            schema[key] = obj
+
+
+def assemble(schema, compact=False):
+    """
+    Build a single flocked level out of the given schema. Unlike `flock`,
+    values are taken as they are: nested dictionaries are not flocked.
+    >>> assemble({'one': flock({'two': 2})}).one.two
+    2
+
+    :param schema: values of the object to build, by name. In default mode,
+                   the schema becomes the dictionary of the instance.
+    :type schema: dict
+    :param compact: whether to store values in slots.
+    :type compact: bool
+    :rtype: Context
+
+    """
+    bound = tuple([key for key, value in six.iteritems(schema)
+                   if not isinstance(value, plain_types) and hasattr(type(value), '__get__')])
+    return adopt(build(schema, bound, compact))
+
+
+def build(schema, bound, compact):
+    """Instantiate the flocked type matching the given schema, `bound` being
+    the names of its bindable values, in order."""
+    return instantiate(registry[(tuple(schema), bound, compact)], schema, compact)
+
+
+def instantiate(cls, schema, compact):
+    """Instantiate the given flocked type out of the given schema, which must
+    hold its fields in order."""
+    obj = cls.__new__(cls)
+    if compact:
+        for slot, key in zip(cls.__storage__, cls.__fields__):
+            slot.__set__(obj, schema[key])
+    else:
+        obj.__dict__ = schema
+    return obj
+
+
+def adopt(root, nested=()):
+    """Make the given object a top most context, binding the given nested
+    objects to it. Bound objects are returned as they are by their parents,
+    other contexts are rebound first (see `Context.__get__`).
+
+    :param root: top most flocked object.
+    :type root: Context
+    :param nested: flocked objects nested in `root`.
+    :return: root
+
+    """
+    root.__context__ = None
+    for obj in nested:
+        obj.__context__ = root
+    return root
 
 
 def unflock(obj):
@@ -48,15 +153,43 @@ def unflock(obj):
 
     """
     assert isinstance(obj, object)
-    schema = {}
-    for attr_name in (entity for entity in dir(obj) if '_' not in entity[:2]):
-        attr = getattr(obj, attr_name)
-        if isinstance(attr, Context):
-            structure = {attr_name: unflock(attr)}
+    if monitor is not None:
+        monitor.count('unflock')
+    definition = {}
+    stack = [(obj, definition)]
+    while stack:
+        obj, schema = stack.pop()
+        names = getattr(type(obj), '__bound__', None)
+        if names is not None and hasattr(obj, '__dict__'):
+            # Plain values of default flocked objects are copied at once, only
+            # bindable ones need to be looked up.
+            schema.update(obj.__dict__)
         else:
-            structure = {attr_name: attr}
-        schema.update(structure)
-    return schema
+            names = fields(obj)
+        for name in names:
+            attr = getattr(obj, name)
+            if isinstance(attr, Context):
+                schema[name] = {}
+                stack.append((attr, schema[name]))
+            else:
+                schema[name] = attr
+    return definition
+
+
+def fields(obj):
+    """Returns the names of the fields of the given object. Flocked objects
+    know their fields, public attributes are used for any other object.
+    >>> fields(flock({'one': 1, '_two': 2}))
+    ('one', '_two')
+
+    :param obj: object to inspect.
+    :rtype: tuple
+
+    """
+    try:
+        return obj.__fields__
+    except AttributeError:
+        return tuple(name for name in dir(obj) if name[0] != '_')
 
 
 if six.PY2:
@@ -69,6 +202,10 @@ else:
                 FunctionType, BuiltinFunctionType,
                 list, tuple, dict)
 
+plain_types = six.integer_types + (float, complex, bool, type(None),
+                                   six.text_type, six.binary_type,
+                                   list, tuple, dict)
+
 
 def get_context(entity):
     """Returns the operating context of the given object.
@@ -88,19 +225,524 @@ def get_context(entity):
     :return: context of the current object.
 
     """
-    if isinstance(entity, builtins):
+    if monitor is not None:
+        monitor.count('get_context')
+    while not isinstance(entity, builtins):
+        if not ismethod(entity):
+            break
+        entity = six.get_method_self(entity)
+    else:
         return getmodule(entity)
-    if ismethod(entity):
-        return get_context(six.get_method_self(entity))
 
-    return entity.__context__ if hasattr(entity, '__context__') else entity
+    context = getattr(entity, '__context__', None)
+    return entity if context is None else context
+
+
+class field_first(object):
+    """Mapping method of flocked objects looking their fields up through
+    `__getattr__`: a field of the same name is returned instead, as instances
+    of flocked types do (see `Record`)."""
+    __slots__ = ('method',)
+
+    def __init__(self, method):
+        self.method = method
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self.method
+        lookup = getattr(owner, '__getattr__', None)
+        if lookup is not None and self.method.__name__ in instance:
+            return lookup(instance, self.method.__name__)
+        return self.method.__get__(instance, owner)
 
 
 class Context(object):
-    """Base class for flocked object."""
+    """Base class for flocked object.
+
+    A flocked object is bound to its top most container through its
+    `__context__` attribute, which is None (or unset) for top most objects.
+    Objects nested by `flock` are bound when created. Any other object is never
+    modified when accessed through a new container: a copy bound to that
+    container is returned instead, see `bind`.
+
+    Flocked objects implement the read-only `Mapping` protocol over their
+    fields, fields taking precedence over mapping methods of the same name.
+    """
+    __slots__ = ()
+
     def __get__(self, instance, owner):
         """Overriding __get__ allows us to create a context attribute.
         __context__ will be the top most container of the current context."""
-        context = instance.__context__ if hasattr(instance, '__context__') else instance
-        setattr(self, '__context__', context)
-        return self
+        if instance is None:
+            return self
+        context = getattr(instance, '__context__', None)
+        if context is None:
+            context = instance
+        if getattr(self, '__context__', None) is context:
+            return self
+        return bind(self, context)
+
+    def __rebind__(self, context):
+        """Returns a shallow copy of this object bound to the given context.
+
+        Copies of default flocked objects hold their own fields: methods, and
+        any other non data descriptor but nested contexts, are bound once when
+        copying so that looking them up is a plain attribute lookup. Special
+        methods are looked up on types and are left alone (see `prebind`).
+        Copies of other objects share their fields with the original object.
+
+        """
+        cls = type(self)
+        if not hasattr(cls, '__storage__') and hasattr(cls, '__bound__'):
+            schema = dict(self.__dict__)
+            prebound = frozenset(name for name in cls.__bound__ if name in schema and not (
+                name[:2] == name[-2:] == '__' or isinstance(schema[name], Context) or
+                hasattr(type(schema[name]), '__set__')))
+            bound = tuple(name for name in cls.__fields__
+                          if name in cls.__bound__ and name not in prebound)
+            copy_cls = registry[(cls.__fields__, bound, False)]
+            obj = copy_cls.__new__(copy_cls)
+            obj.__context__ = context
+            obj.__dict__ = schema
+            if prebound:
+                prebind(obj, self, prebound)
+                prebound_copies.add(obj, self, prebound)
+            return obj
+        obj = cls.__new__(cls)
+        for slot in getattr(cls, '__storage__', ()):
+            try:
+                slot.__set__(obj, slot.__get__(self, cls))
+            except AttributeError:
+                pass
+        if hasattr(self, '__dict__'):
+            obj.__dict__ = self.__dict__
+        obj.__context__ = context
+        return obj
+
+    def __reduce_ex__(self, protocol):
+        """Flocked objects are pickled as the shape of their type (see
+        `make_type`) and their values, their type being looked up again by
+        shape when unpickled.
+        >>> import pickle
+        >>> obj = pickle.loads(pickle.dumps(flock({'one': {'two': 2}})))
+        >>> obj.one.two, get_context(obj.one) is obj
+        (2, True)
+
+        """
+        cls = type(self)
+        storage = getattr(cls, '__storage__', None)
+        if storage is None:
+            values = self.__dict__
+        else:
+            values = tuple(slot.__get__(self, cls) for slot in storage)
+        return restore, (cls.__shape__,), (values, getattr(self, '__context__', None))
+
+    def __setstate__(self, state):
+        values, context = state
+        storage = getattr(type(self), '__storage__', None)
+        if storage is None:
+            self.__dict__ = dict(values)
+        else:
+            for slot, value in zip(storage, values):
+                slot.__set__(self, value)
+        self.__context__ = context
+
+    def __getitem__(self, key):
+        """Flocked objects can be read as mappings of their fields, nested
+        objects being returned as they are (as mappings of their own).
+        >>> obj = flock({'one': {'two': 2}})
+        >>> obj['one']['two'], 'one' in obj, len(obj), list(obj)
+        (2, True, 1, ['one'])
+
+        """
+        if isinstance(key, six.string_types) and key in self:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in fields(self)
+
+    def __iter__(self):
+        return iter(fields(self))
+
+    def __len__(self):
+        return len(fields(self))
+
+    def __bool__(self):
+        # Objects stay true whatever their number of fields.
+        return True
+
+    __nonzero__ = __bool__
+
+    @field_first
+    def keys(self):
+        return KeysView(self)
+
+    @field_first
+    def items(self):
+        return ItemsView(self)
+
+    @field_first
+    def values(self):
+        return ValuesView(self)
+
+    @field_first
+    def get(self, key, default=None):
+        if isinstance(key, six.string_types) and key in self:
+            return getattr(self, key)
+        return default
+
+
+Mapping.register(Context)
+
+
+def restore(shape):
+    """Returns an empty instance of the flocked type of the given shape, to be
+    filled by `Context.__setstate__`."""
+    cls = registry[shape]
+    return cls.__new__(cls)
+
+
+bind_lock = RLock()
+
+class Prebound(object):
+    """Copies holding pre-bound fields (see `prebind`), along with their
+    original namespace and the names of these fields. Copies are weakly
+    referenced, dead ones being dropped as more are added."""
+    def __init__(self):
+        self.entries = []
+        self.limit = 1024
+
+    def add(self, obj, namespace, names):
+        with bind_lock:
+            entries = self.entries
+            entries.append((weakref.ref(obj), namespace, names))
+            if len(entries) > self.limit:
+                entries[:] = [entry for entry in entries if entry[0]() is not None]
+                self.limit = max(1024, 2 * len(entries))
+
+    def __iter__(self):
+        with bind_lock:
+            entries = list(self.entries)
+        for ref, namespace, names in entries:
+            obj = ref()
+            if obj is not None:
+                yield obj, namespace, names
+
+
+prebound_copies = Prebound()
+
+
+def prebind(obj, namespace, names):
+    """Bind the given fields of the given namespace to its given copy, once
+    for all lookups (see `Context.__rebind__`)."""
+    schema, values, cls = obj.__dict__, namespace.__dict__, type(obj)
+    for name in names:
+        if name in values:
+            schema[name] = type(values[name]).__get__(values[name], obj, cls)
+
+
+def rebind_all():
+    """Bind again the fields pre-bound by copies, once the way their values
+    bind changed (as `cuckoos.instrument` does when enabled or disabled)."""
+    with bind_lock:
+        for obj, namespace, names in prebound_copies:
+            prebind(obj, namespace, names)
+
+
+def bind(namespace, context, rebind=None):
+    """
+    Returns a copy of the given namespace bound to the given context.
+
+    Copies are cached on the context itself (in its `__namespaces__`
+    attribute), so that binding a namespace is allocation free once done and
+    that copies live as long as their context, or until the field holding the
+    namespace is assigned or deleted (see `unbind`). Namespaces are never modified,
+    which makes sharing them (typically as class attributes) safe across
+    threads and tasks.
+    >>> namespace = flock({'one': 1})
+    >>> Class = type(str('Class'), (object,), {'namespace': namespace})
+    >>> obj = Class()
+    >>> obj.namespace is obj.namespace, obj.namespace is namespace
+    (True, False)
+    >>> get_context(obj.namespace) is obj
+    True
+
+    :param namespace: flocked object to bind.
+    :type namespace: Context
+    :param context: top most context.
+    :param rebind: function returning the copy of a namespace bound to a
+                   context, `__rebind__` by default.
+    :rtype: Context
+
+    """
+    try:
+        return context.__namespaces__[id(namespace)][1]
+    except (AttributeError, KeyError):
+        pass
+    with bind_lock:
+        namespaces = getattr(context, '__namespaces__', None)
+        if namespaces is None:
+            namespaces = {}
+            try:
+                context.__namespaces__ = namespaces
+            except (AttributeError, TypeError):
+                # The context cannot hold copies, they will not be cached.
+                return namespace.__rebind__(context) if rebind is None else rebind(namespace, context)
+        # The namespace is kept alongside its copy so that its id is not reused.
+        entry = namespaces.get(id(namespace))
+        if entry is None:
+            copy = namespace.__rebind__(context) if rebind is None else rebind(namespace, context)
+            entry = namespaces[id(namespace)] = (namespace, copy)
+        return entry[1]
+
+
+def unbind(namespace, instance):
+    """Drop the copy of the given namespace cached by `bind` for the context of
+    the given instance, if any, once the field of the instance holding the
+    namespace is replaced."""
+    if not isinstance(namespace, Context):
+        return
+    context = getattr(instance, '__context__', None)
+    if context is None:
+        context = instance
+    namespaces = getattr(context, '__namespaces__', None)
+    if namespaces:
+        with bind_lock:
+            namespaces.pop(id(namespace), None)
+
+
+class Field(object):
+    """Descriptor exposing a value stored on a flocked instance as if it was a
+    class attribute. Functions are bound to the instance and nested contexts
+    are given their context, exactly as they would be when looked up on the
+    class."""
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            value = instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name)
+        descriptor = getattr(type(value), '__get__', None)
+        if descriptor is None:
+            return value
+        return descriptor(value, instance, owner)
+
+    def __set__(self, instance, value):
+        unbind(instance.__dict__.get(self.name), instance)
+        instance.__dict__[self.name] = value
+
+    def __delete__(self, instance):
+        try:
+            unbind(instance.__dict__.pop(self.name), instance)
+        except KeyError:
+            raise AttributeError(self.name)
+
+
+def bindable(value):
+    """Returns whether the given value would be bound (or otherwise
+    transformed) when looked up as a class attribute.
+    >>> bindable(1)
+    False
+    >>> bindable(lambda _: 1)
+    True
+
+    """
+    return not isinstance(value, plain_types) and hasattr(type(value), '__get__')
+
+
+class SlotField(Field):
+    """`Field` reading its value from a slot rather than from the instance
+    dictionary."""
+    __slots__ = ('slot',)
+
+    def __init__(self, name, slot):
+        super(SlotField, self).__init__(name)
+        self.slot = slot
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = self.slot.__get__(instance, owner)
+        descriptor = getattr(type(value), '__get__', None)
+        if descriptor is None:
+            return value
+        return descriptor(value, instance, owner)
+
+    def __set__(self, instance, value):
+        unbind(getattr(instance, self.slot.__name__, None), instance)
+        self.slot.__set__(instance, value)
+
+    def __delete__(self, instance):
+        unbind(getattr(instance, self.slot.__name__, None), instance)
+        self.slot.__delete__(instance)
+
+
+def slot_name(name, bound):
+    """Returns the name of the slot holding the given field. Bindable fields
+    are stored in a private slot, leaving their public name to a `SlotField`.
+
+    """
+    return str('_slot_' + name if bound else name)
+
+
+def make_type(key):
+    """Create a new flocked type for the given registry key.
+
+    A key is a (names, bound, compact) tuple, `bound` being the names of the
+    bindable fields. Plain values are read straight from the instance
+    (dictionary or slot) whereas bindable ones go through a `Field`
+    descriptor.
+
+    :param key: shape and storage mode of the flocked type.
+    :type key: tuple
+    :rtype: type
+
+    """
+    names, bound, compact = key
+    bound = frozenset(bound)
+    namespace = {'__fields__': names, '__fieldset__': frozenset(names), '__bound__': bound, '__shape__': key}
+    if compact:
+        namespace['__slots__'] = (str('__context__'), str('__namespaces__')) + tuple(
+            slot_name(name, name in bound) for name in names)
+        base = Record
+    else:
+        namespace['__slots__'] = ()
+        for name in bound:
+            namespace[name] = Field(name)
+        base = Flocked
+    cls = type(str('Flock'), (base,), namespace)
+    if compact:
+        cls.__storage__ = tuple(getattr(cls, slot_name(name, name in bound))
+                                for name in names)
+        for name, slot in zip(names, cls.__storage__):
+            if name in bound:
+                setattr(cls, name, SlotField(name, slot))
+    return cls
+
+
+class Record(Context):
+    """
+    Base class of the types generated by `flock`, implementing the read-only
+    `Mapping` protocol from their type: objects can be handed to code expecting a mapping
+    (`**kwargs`, templates, `dict()`...) without being unflocked first.
+    >>> obj = flock({'user': {'name': 'Bird'}, 'id': 1})
+    >>> '{id} {user[name]}'.format(**obj)
+    '1 Bird'
+    >>> isinstance(obj.user, Mapping), dict(obj.user)
+    (True, {'name': 'Bird'})
+
+    Fields are looked up in constant time and iterated in order. Mapping
+    methods (`keys`, `items`, `values` and `get`) are looked up on the type:
+    fields of the same name take precedence over them, in which case the
+    methods of `Mapping` can be called instead, e.g. `Mapping.keys(obj)`.
+    Objects are always true, and only equal to themselves.
+
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key in type(self).__fieldset__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in type(self).__fieldset__
+
+    def __iter__(self):
+        return iter(type(self).__fields__)
+
+    def __len__(self):
+        return len(type(self).__fields__)
+
+    def keys(self):
+        return KeysView(self)
+
+    def items(self):
+        return ItemsView(self)
+
+    def values(self):
+        return ValuesView(self)
+
+    def get(self, key, default=None):
+        if key in type(self).__fieldset__:
+            return getattr(self, key)
+        return default
+
+
+class Flocked(Record):
+    """Base class of default flocked types. Sharing their storage, instances
+    can switch from one of these types to another when their fields change."""
+    __slots__ = ('__context__', '__namespaces__', '__dict__', '__weakref__')
+
+
+registry = TypeRegistry(make_type)
+flock.cache_info = registry.info
+flock.cache_clear = registry.clear
+
+
+class LazyFlock(Context):
+    """Flocked object wrapping its definition rather than walking it.
+
+    Fields are looked up in the definition on first access only: nested
+    dictionaries are flocked (lazily as well) at that point and cached on the
+    instance, along with plain values, so that later accesses are plain
+    attribute lookups. Bindable values are bound on every access, as they would
+    be by any other flocked object.
+
+    Since the definition is not copied, changes made to it are visible until
+    the corresponding field has been accessed.
+    >>> obj = LazyFlock({'one': {'two': 2}})
+    >>> 'one' in vars(obj)
+    False
+    >>> obj.one.two
+    2
+    >>> 'one' in vars(obj)
+    True
+
+    :param source: definition of the object to flock.
+    :type source: dict
+
+    """
+    __slots__ = ('__source__', '__context__', '__namespaces__', '__dict__')
+
+    def __init__(self, source, context=None):
+        assert isinstance(source, dict)
+        self.__source__ = source
+        self.__context__ = context
+
+    @property
+    def __fields__(self):
+        return tuple(self.__source__)
+
+    def __getattr__(self, name):
+        try:
+            value = self.__source__[name]
+        except KeyError:
+            raise AttributeError(name)
+        if isinstance(value, dict):
+            value = LazyFlock(value, self if self.__context__ is None else self.__context__)
+        elif bindable(value):
+            return type(value).__get__(value, self, type(self))
+        return self.__dict__.setdefault(name, value)
+
+    def __contains__(self, key):
+        return key in self.__source__
+
+    def __reduce_ex__(self, protocol):
+        # Materialized fields are left out, as they are not copied either.
+        return LazyFlock, (self.__source__, self.__context__)
+
+    def __rebind__(self, context):
+        # Materialized fields are bound to this object's context, a copy has to
+        # materialize its own.
+        return LazyFlock(self.__source__, context)
+
+    def __dir__(self):
+        return sorted(set(dir(type(self))) | set(self.__dict__) | set(self.__source__))
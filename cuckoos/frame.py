@@ -0,0 +1,217 @@
+from __future__ import unicode_literals, absolute_import
+
+import numpy
+import six
+
+from .flock import Context, flock, unflock
+
+__all__ = ['FlockFrame', 'RowView']
+
+# Python types stored in typed columns, any other value going to object ones.
+column_types = {bool: numpy.bool_, int: numpy.int64, float: numpy.float64}
+if six.PY2:
+    # noinspection PyUnresolvedReferences
+    column_types[long] = numpy.int64
+
+
+class FlockFrame(object):
+    """
+    Columnar storage of records sharing the same shape.
+
+    Each leaf path of the records is stored as a NumPy array: booleans,
+    integers and floats get typed arrays, any other value (or a mix of
+    values) an object array. Columns are exposed as nested attributes and
+    rows as flocked views reading their values from the columns. Fields named
+    after methods of the frame are read with `column`.
+    >>> frame = FlockFrame([{'user': {'age': 30}}, {'user': {'age': 40}}])
+    >>> print(frame.user.age.mean())
+    35.0
+    >>> frame[1].user.age
+    40
+
+    :param records: dictionaries (or flocked objects) sharing the same
+                    shape, nested dictionaries other than empty ones being
+                    walked.
+    :raises ValueError: if records do not share the same shape.
+
+    """
+    __slots__ = ('__columns__', '__length__', '__tree__', '__namespace__')
+
+    def __init__(self, records):
+        records = [unflock(record) if isinstance(record, Context) else record for record in records]
+        if not records:
+            raise ValueError('FlockFrame needs at least one record')
+        values = dict((path, []) for path in leaves(records[0]))
+        for index, record in enumerate(records):
+            stack = [((), record)]
+            while stack:
+                prefix, level = stack.pop()
+                for key, value in six.iteritems(level):
+                    if isinstance(value, dict) and value:
+                        stack.append((prefix + (key,), value))
+                        continue
+                    try:
+                        values[prefix + (key,)].append(value)
+                    except KeyError:
+                        raise ValueError('Record %d has an unexpected field %r'
+                                         % (index, '.'.join(prefix + (key,))))
+            for path, column in six.iteritems(values):
+                if len(column) != index + 1:
+                    raise ValueError('Record %d misses field %r' % (index, '.'.join(path)))
+        self.__init_columns(dict((path, to_array(column)) for path, column in six.iteritems(values)))
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Build a frame out of the given arrays, by path.
+
+        :param columns: arrays of the same length, by tuple of names.
+        :type columns: dict
+        :rtype: FlockFrame
+
+        """
+        frame = cls.__new__(cls)
+        frame.__init_columns(columns)
+        return frame
+
+    def __init_columns(self, columns):
+        self.__columns__ = columns
+        self.__length__ = len(next(iter(columns.values()))) if columns else 0
+        tree = {}
+        for path, column in six.iteritems(columns):
+            node = tree
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = column
+        self.__tree__ = tree
+        self.__namespace__ = flock(tree)
+
+    def __len__(self):
+        return self.__length__
+
+    def __iter__(self):
+        for index in range(self.__length__):
+            yield RowView(self.__tree__, index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return FlockFrame.from_columns(dict((path, column[index])
+                                                for path, column in six.iteritems(self.__columns__)))
+        if index < 0:
+            index += self.__length__
+        if not 0 <= index < self.__length__:
+            raise IndexError('Row index out of range')
+        return RowView(self.__tree__, index)
+
+    def __getattr__(self, name):
+        if name[:2] == '__' == name[-2:]:
+            raise AttributeError(name)
+        return getattr(self.__namespace__, name)
+
+    def __dir__(self):
+        return sorted(set(dir(type(self))) | set(self.__tree__))
+
+    def column(self, path, sep='.'):
+        """Returns the column found at the given path, or the flocked level of
+        columns if the path leads to a nested level.
+        >>> frame = FlockFrame([{'records': {'length': 1}}])
+        >>> print(frame.column('records.length'))
+        [1]
+
+        :param path: dotted path (or tuple of names) of the column.
+        :param sep: separator of the names of a path.
+        :type sep: basestring
+        :rtype: numpy.ndarray
+        :raises KeyError: if no column is found at the path.
+
+        """
+        names = tuple(path.split(sep)) if isinstance(path, six.string_types) else tuple(path)
+        value = self.__namespace__
+        for name in names:
+            if not isinstance(value, Context) or name not in value:
+                raise KeyError(path)
+            value = getattr(value, name)
+        return value
+
+    def records(self):
+        """Returns the records of the frame as dictionaries.
+
+        :rtype: list
+
+        """
+        return [unflock(row) for row in self]
+
+
+class RowView(Context):
+    """Flocked view of a row of a `FlockFrame`, reading its values from the
+    columns of the frame. Values are returned as Python objects.
+
+    :param tree: columns of the level, nested by name.
+    :type tree: dict
+    :param index: index of the row.
+    :type index: int
+    :param context: top most context, if any.
+
+    """
+    __slots__ = ('__tree__', '__index__', '__context__', '__namespaces__')
+
+    def __init__(self, tree, index, context=None):
+        self.__tree__ = tree
+        self.__index__ = index
+        self.__context__ = context
+
+    @property
+    def __fields__(self):
+        return tuple(self.__tree__)
+
+    def __getattr__(self, name):
+        try:
+            value = self.__tree__[name]
+        except KeyError:
+            raise AttributeError(name)
+        if isinstance(value, dict):
+            return RowView(value, self.__index__, self if self.__context__ is None else self.__context__)
+        value = value[self.__index__]
+        return value.item() if isinstance(value, numpy.generic) else value
+
+    def __contains__(self, key):
+        return key in self.__tree__
+
+    def __rebind__(self, context):
+        return RowView(self.__tree__, self.__index__, context)
+
+    def __reduce_ex__(self, protocol):
+        return flock, (unflock(self),)
+
+    def __dir__(self):
+        return sorted(set(dir(type(self))) | set(self.__tree__))
+
+
+def leaves(record):
+    """Returns the leaf paths of the given record, as tuples of names."""
+    paths = []
+    stack = [((), record)]
+    while stack:
+        prefix, level = stack.pop()
+        for key, value in six.iteritems(level):
+            if isinstance(value, dict) and value:
+                stack.append((prefix + (key,), value))
+            else:
+                paths.append(prefix + (key,))
+    return paths
+
+
+def to_array(values):
+    """Returns the given values as a typed array if they share the same
+    boolean or numeric type, as an object array otherwise."""
+    types = set(map(type, values))
+    if len(types) == 1:
+        dtype = column_types.get(types.pop())
+        if dtype is not None:
+            try:
+                return numpy.array(values, dtype=dtype)
+            except OverflowError:
+                pass
+    column = numpy.empty(len(values), dtype=object)
+    for index, value in enumerate(values):
+        column[index] = value
+    return column
@@ -0,0 +1,194 @@
+from __future__ import unicode_literals, absolute_import
+
+import six
+
+from .flock import Context, bind, bindable, unflock
+
+__all__ = ['freeze', 'FrozenFlock']
+
+
+def freeze(obj):
+    """
+    Returns an immutable, hashable flocked object out of the given definition
+    (or flocked object).
+
+    Nested dictionaries become nested frozen objects, lists and tuples become
+    tuples and sets become frozen sets, so that every level can be hashed.
+    Frozen objects compare structurally and can be used as dictionary keys or
+    memoization keys.
+    >>> obj = freeze({'db': {'hosts': ['a', 'b']}})
+    >>> obj.db.hosts
+    ('a', 'b')
+    >>> obj == freeze({'db': {'hosts': ('a', 'b')}})
+    True
+    >>> len({obj: 1, freeze(obj): 2})
+    1
+
+    :param obj: definition or flocked object.
+    :rtype: FrozenFlock
+
+    """
+    if isinstance(obj, FrozenFlock):
+        return obj
+    definition = unflock(obj) if isinstance(obj, Context) else obj
+    assert isinstance(definition, dict)
+    # Containers are frozen depth first, using an explicit stack of suspended
+    # containers, each one holding its key in its parent, its items frozen so
+    # far and the objects to bind to its top most object. Objects held by
+    # tuples and sets are top most objects.
+    stack = [(None, iter(six.iteritems(definition)), {}, [])]
+    while True:
+        key, items, frozen, nested = stack[-1]
+        for item in items:
+            value = item[1] if isinstance(frozen, dict) else item
+            if isinstance(value, dict):
+                stack.append((item[0] if isinstance(frozen, dict) else None, iter(six.iteritems(value)), {},
+                              nested if isinstance(frozen, dict) else []))
+                break
+            if isinstance(value, (list, tuple, set, frozenset)):
+                stack.append((item[0] if isinstance(frozen, dict) else None, iter(value),
+                              set() if isinstance(value, (set, frozenset)) else [], None))
+                break
+            if isinstance(frozen, dict):
+                frozen[item[0]] = value
+            elif isinstance(frozen, set):
+                frozen.add(value)
+            else:
+                frozen.append(value)
+        else:
+            stack.pop()
+            if isinstance(frozen, dict):
+                value = FrozenFlock(frozen)
+                if stack and isinstance(stack[-1][2], dict):
+                    nested.append(value)
+                else:
+                    for child in nested:
+                        object.__setattr__(child, '__context__', value)
+            else:
+                value = frozenset(frozen) if isinstance(frozen, set) else tuple(frozen)
+            if not stack:
+                return value
+            parent = stack[-1][2]
+            if isinstance(parent, dict):
+                parent[key] = value
+            elif isinstance(parent, set):
+                parent.add(value)
+            else:
+                parent.append(value)
+
+
+class FrozenFlock(Context):
+    """Immutable flocked object, comparing structurally.
+
+    Values are held in a dictionary rather than in a flocked type of their
+    own. The hash of an object is computed on first use and cached, nested
+    objects being hashed once as well, so that comparing objects which differ
+    usually stops at their hashes. Bindable values are bound on every access.
+
+    :param values: values of the object, by name. Values must be hashable.
+    :type values: dict
+    :param context: top most context, if any.
+
+    """
+    __slots__ = ('__values__', '__digest__', '__context__', '__namespaces__')
+
+    def __init__(self, values, context=None):
+        set_slot = object.__setattr__
+        set_slot(self, '__values__', values)
+        set_slot(self, '__digest__', None)
+        set_slot(self, '__context__', context)
+
+    @property
+    def __fields__(self):
+        return tuple(self.__values__)
+
+    def __getattr__(self, name):
+        if name[:2] == '__' == name[-2:]:
+            raise AttributeError(name)
+        try:
+            value = self.__values__[name]
+        except KeyError:
+            raise AttributeError(name)
+        if isinstance(value, Context):
+            context = self if self.__context__ is None else self.__context__
+            if value.__context__ is not context:
+                # Copies bound to another context share nested objects.
+                return bind(value, context)
+        elif bindable(value):
+            return type(value).__get__(value, self, type(self))
+        return value
+
+    def __setattr__(self, name, value):
+        if name in ('__context__', '__namespaces__'):
+            return object.__setattr__(self, name, value)
+        raise AttributeError('Frozen flocks are read-only')
+
+    def __delattr__(self, name):
+        raise AttributeError('Frozen flocks are read-only')
+
+    def __hash__(self):
+        digest = self.__digest__
+        if digest is not None:
+            return digest
+        # Nested objects are hashed first, deepest ones first, without
+        # recursion.
+        pending, stack = [], [self]
+        while stack:
+            obj = stack.pop()
+            pending.append(obj)
+            stack.extend(value for value in six.itervalues(obj.__values__)
+                         if isinstance(value, FrozenFlock) and value.__digest__ is None)
+        for obj in reversed(pending):
+            object.__setattr__(obj, '__digest__', hash(frozenset(six.iteritems(obj.__values__))))
+        return self.__digest__
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, FrozenFlock):
+            return NotImplemented
+        # Nested objects are compared without recursion, objects with
+        # different hashes being different.
+        stack = [(self, other)]
+        while stack:
+            this, that = stack.pop()
+            if hash(this) != hash(that) or len(this.__values__) != len(that.__values__):
+                return False
+            values = that.__values__
+            for name, value in six.iteritems(this.__values__):
+                try:
+                    other_value = values[name]
+                except KeyError:
+                    return False
+                if value is other_value:
+                    continue
+                if isinstance(value, FrozenFlock) and isinstance(other_value, FrozenFlock):
+                    stack.append((value, other_value))
+                elif not value == other_value:
+                    return False
+        return True
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __contains__(self, key):
+        return key in self.__values__
+
+    def __rebind__(self, context):
+        obj = FrozenFlock(self.__values__, context)
+        object.__setattr__(obj, '__digest__', self.__digest__)
+        return obj
+
+    def __reduce_ex__(self, protocol):
+        # Values are restored once the object exists, as nested objects refer
+        # to their top most object.
+        return FrozenFlock, ({},), (self.__values__, self.__context__)
+
+    def __setstate__(self, state):
+        set_slot = object.__setattr__
+        set_slot(self, '__values__', state[0])
+        set_slot(self, '__context__', state[1])
+
+    def __dir__(self):
+        return sorted(set(dir(type(self))) | set(self.__values__))
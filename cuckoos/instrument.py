@@ -0,0 +1,201 @@
+from __future__ import unicode_literals, absolute_import
+
+import timeit
+import weakref
+from collections import defaultdict
+from functools import update_wrapper
+from threading import Lock
+
+from . import flock as flocking
+from .flock import Context
+from .nest import FledgedMethod
+
+try:
+    from .aio import timed
+except SyntaxError:
+    # Python < 3.5: there are no coroutine methods to keep as they are.
+    def timed(method, record):
+        def wrapper(*args, **kwargs):
+            start = timer()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                record(timer() - start)
+        return update_wrapper(wrapper, method)
+
+__all__ = ['enable', 'disable', 'enabled', 'snapshot', 'reset', 'buckets']
+
+# Upper bounds of the latency histogram buckets, in seconds.
+buckets = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, float('inf'))
+
+timer = timeit.default_timer
+
+# Implementations swapped in while instrumentation is enabled.
+originals = {
+    'context': Context.__dict__['__get__'],
+    'fledged': FledgedMethod.__dict__['__get__'],
+    'factory': flocking.registry.factory,
+}
+
+
+class Monitor(object):
+    """Counters and latency histograms gathered while instrumentation is
+    enabled.
+
+    Depths are counted from top most contexts, which are at depth 0. The depth
+    of objects which cannot be weakly referenced (compact ones) is not tracked:
+    contexts accessed through them are counted at depth 1.
+
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.counters = defaultdict(int)
+        self.accesses = defaultdict(int)
+        self.calls = {}
+        self.depths = weakref.WeakKeyDictionary()
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def accessed(self, instance, value):
+        if getattr(instance, '__context__', None) is None:
+            depth = 1
+        else:
+            try:
+                depth = self.depths.get(instance, 0) + 1
+            except TypeError:
+                depth = 1
+        with self.lock:
+            self.accesses[depth] += 1
+        try:
+            self.depths[value] = depth
+        except TypeError:
+            pass
+
+    def called(self, path, seconds):
+        with self.lock:
+            stats = self.calls.get(path)
+            if stats is None:
+                stats = self.calls[path] = {'count': 0, 'total': 0.0,
+                                            'histogram': [0] * len(buckets)}
+            stats['count'] += 1
+            stats['total'] += seconds
+            for index, bound in enumerate(buckets):
+                if seconds <= bound:
+                    stats['histogram'][index] += 1
+                    break
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'flock': self.counters['flock'],
+                'unflock': self.counters['unflock'],
+                'get_context': self.counters['get_context'],
+                'types': self.counters['types'],
+                'accesses': dict(self.accesses),
+                'calls': dict((path, dict(stats, histogram=list(stats['histogram'])))
+                              for path, stats in self.calls.items()),
+                'buckets': list(buckets),
+            }
+
+
+def context_get(self, instance, owner):
+    value = originals['context'](self, instance, owner)
+    monitor = flocking.monitor
+    if instance is not None and monitor is not None:
+        monitor.accessed(instance, value)
+    return value
+
+
+def fledged_get(self, namespace, owner):
+    method = originals['fledged'](self, namespace, owner)
+    if namespace is None:
+        return method
+    path = self.path
+
+    def record(seconds):
+        monitor = flocking.monitor
+        if monitor is not None:
+            monitor.called(path, seconds)
+    return timed(method, record)
+
+
+def make_type(key):
+    monitor = flocking.monitor
+    if monitor is not None:
+        monitor.count('types')
+    return originals['factory'](key)
+
+
+def enable():
+    """
+    Enable instrumentation, resetting any previous measure.
+
+    While enabled, `flock`, `unflock` and `get_context` calls, flocked types
+    created and flocked objects accessed (by depth) are counted, and calls of
+    fledged methods are timed by nested path. Instrumented implementations are
+    swapped in and out: once disabled, hot paths run exactly the original
+    code.
+
+    Methods of nested namespaces are bound once per instance (see
+    `cuckoos.flock.bind`): they are bound again when instrumentation is
+    enabled or disabled, so that calls are timed whenever their namespace was
+    bound, and run without any wrapper once disabled.
+    >>> from cuckoos.flock import flock
+    >>> enable()
+    >>> flock({'one': {'two': 2}}).one.two
+    2
+    >>> stats = snapshot()
+    >>> stats['flock'], stats['accesses']
+    (1, {1: 1})
+    >>> disable()
+
+    """
+    flocking.monitor = Monitor()
+    Context.__get__ = context_get
+    FledgedMethod.__get__ = fledged_get
+    flocking.registry.factory = make_type
+    flocking.rebind_all()
+
+
+def disable():
+    """Disable instrumentation, restoring the original implementations."""
+    Context.__get__ = originals['context']
+    FledgedMethod.__get__ = originals['fledged']
+    flocking.registry.factory = originals['factory']
+    flocking.monitor = None
+    flocking.rebind_all()
+
+
+def enabled():
+    """Returns whether instrumentation is enabled.
+
+    :rtype: bool
+
+    """
+    return flocking.monitor is not None
+
+
+def reset():
+    """Reset every measure, if enabled."""
+    if flocking.monitor is not None:
+        flocking.monitor = Monitor()
+
+
+def snapshot():
+    """
+    Returns the measures taken since instrumentation was enabled (or reset).
+
+    Call statistics are given by nested path, e.g. `Birds.nested.method`: the
+    number of calls, their total duration in seconds and a histogram of their
+    durations, whose buckets are bounded by `buckets`.
+
+    :return: measures, or None if instrumentation is disabled.
+    :rtype: dict
+
+    """
+    monitor = flocking.monitor
+    if monitor is None:
+        return None
+    return monitor.snapshot()
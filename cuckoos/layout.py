@@ -0,0 +1,143 @@
+from __future__ import unicode_literals, absolute_import
+
+import io
+import json
+import os
+import tempfile
+from hashlib import sha1
+
+__all__ = ['LayoutCache', 'enable', 'disable']
+
+# Version of the stored layouts, bumped whenever their meaning changes.
+layout_version = 2
+
+cache = None
+
+
+class LayoutCache(object):
+    """Persistent cache of nested class layouts.
+
+    A layout maps the name of each nested method of a class to its path in the
+    compiled namespace, e.g. `nested__method` to `('nested', 'method')`. Layouts
+    are stored as JSON files in the given directory, one per class (named
+    after its module and name), along with a hash of the names of its nested
+    methods, so that any change to the class invalidates its layout. A new
+    layout overwrites the former one.
+
+    Cache failures (missing, unreadable or unwritable files) are never raised:
+    the layout is simply computed again.
+
+    :param directory: directory to store layouts in, created if needed.
+    :type directory: basestring
+
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = self.misses = 0
+
+    def path(self, module, name):
+        return os.path.join(self.directory, '%s.%s.json' % (module, name))
+
+    def load(self, module, name, names):
+        """Returns the stored layout of the given class, if any.
+
+        :param module: module of the class.
+        :param name: qualified name of the class.
+        :param names: names of the nested methods of the class, in order.
+        :return: paths by name, or None.
+        :rtype: dict
+
+        """
+        try:
+            with io.open(self.path(module, name), encoding='utf-8') as fd:
+                layout = json.load(fd)
+            if layout['digest'] != digest(names):
+                raise ValueError('Layout of %s.%s is outdated' % (module, name))
+            paths = dict((key, tuple(path)) for key, path in layout['paths'].items())
+            if set(paths) != set(names) or not consistent(paths):
+                raise ValueError('Layout does not match %s.%s' % (module, name))
+        except (IOError, OSError, ValueError, AttributeError, TypeError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return paths
+
+    def store(self, module, name, names, layout):
+        """Store the layout of the given class, replacing any previous one.
+
+        :param layout: paths by name.
+        :type layout: dict
+
+        """
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            fd, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with io.open(fd, 'w', encoding='utf-8') as stream:
+                stream.write(json.dumps({'digest': digest(names),
+                                         'paths': dict((key, list(value)) for key, value in layout.items())}))
+            os.rename(temporary, self.path(module, name))
+        except (IOError, OSError):
+            pass
+
+
+def digest(names):
+    """Returns the hash identifying the given names of nested methods."""
+    return sha1(json.dumps([layout_version] + list(names)).encode('utf-8')).hexdigest()
+
+
+def consistent(paths, sep='__'):
+    """Returns whether the given paths are a layout `graft` may have built:
+    each name leads to the path of its parts, or to the '__call__' entry of
+    that path, and no method is stored where a namespace is.
+    >>> consistent({'nested': ('nested', '__call__'), 'nested__method': ('nested', 'method')})
+    True
+    >>> consistent({'nested': ('nested',), 'nested__method': ('nested', 'method')})
+    False
+
+    :param paths: paths by name.
+    :type paths: dict
+    :rtype: bool
+
+    """
+    leaves, levels = set(), set()
+    for name, path in paths.items():
+        parts = tuple(name.split(sep))
+        if path != parts and path != parts + ('__call__',):
+            return False
+        leaves.add(path)
+        levels.update(path[:index] for index in range(1, len(path)))
+    return len(leaves) == len(paths) and not leaves & levels
+
+
+def default_directory():
+    """Returns the directory layouts are stored in by default, which is
+    `$CUCKOOS_CACHE_DIR` if set, or a `cuckoos` directory in the user cache."""
+    directory = os.environ.get('CUCKOOS_CACHE_DIR')
+    if directory:
+        return directory
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'cuckoos', 'layouts')
+
+
+def enable(directory=None):
+    """Enable the persistent cache of nested class layouts. Classes created
+    afterwards use it.
+
+    :param directory: directory to store layouts in, see `default_directory`.
+    :rtype: LayoutCache
+
+    """
+    global cache
+    cache = LayoutCache(directory or default_directory())
+    return cache
+
+
+def disable():
+    """Disable the persistent cache of nested class layouts."""
+    global cache
+    cache = None
+
+
+if os.environ.get('CUCKOOS_CACHE_DIR'):
+    enable()
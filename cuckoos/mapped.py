@@ -0,0 +1,254 @@
+from __future__ import unicode_literals, absolute_import
+
+import io
+import mmap
+import struct
+
+import six
+
+from .flock import Context, unflock
+
+__all__ = ['dump', 'load', 'MappedFlock']
+
+# File layout: a header (magic, version, offset of the root object) followed by
+# values, each one starting with a tag. Containers refer to their items by
+# offset and are written after them, the root object being written last.
+magic = b'CKMF'
+version = 1
+header = struct.Struct(str('<4sHQ'))
+count = struct.Struct(str('<I'))
+offset = struct.Struct(str('<Q'))
+# Fields of objects: offset and length of the key, offset of the value.
+entry = struct.Struct(str('<QIQ'))
+int64 = struct.Struct(str('<q'))
+double = struct.Struct(str('<d'))
+
+
+def dump(obj, fileobj):
+    """
+    Serialize the given flocked object (or definition) to the given binary
+    file object (or path), to be mapped by `load`.
+
+    Nested dictionaries (or flocked objects) become nested mapped objects,
+    whereas lists and tuples are read back at once, along with any dictionary
+    they hold. Keys must be strings and values must be None, booleans,
+    numbers, text or bytes.
+
+    :param obj: flocked object or definition.
+    :param fileobj: binary file object or path. File objects must be at their
+                    start, as `load` maps whole files.
+    :raises TypeError: if a value cannot be serialized.
+    :raises ValueError: if the file object is not at its start.
+
+    """
+    if isinstance(fileobj, six.string_types):
+        with io.open(fileobj, 'wb') as fd:
+            return dump(obj, fd)
+    definition = unflock(obj) if isinstance(obj, Context) else obj
+    assert isinstance(definition, dict)
+    if fileobj.tell() != 0:
+        raise ValueError('Mapped flocks are written at the start of files')
+    fileobj.write(header.pack(magic, version, 0))
+    position = [header.size]
+
+    def write(data):
+        written = position[0]
+        fileobj.write(data)
+        position[0] += len(data)
+        return written
+
+    # Containers are written depth first, using an explicit stack of suspended
+    # containers, each one holding the offsets of its items written so far.
+    stack = [(definition, iter(sorted(definition.items())) if isinstance(definition, dict) else None, [])]
+    while True:
+        container, items, offsets = stack[-1]
+        for item in items:
+            value = item[1] if isinstance(container, dict) else item
+            if isinstance(value, (dict, list, tuple)):
+                if isinstance(value, dict):
+                    children = iter(sorted(value.items()))
+                else:
+                    children = iter(value)
+                stack.append((value, children, []))
+                break
+            offsets.append(write(encode(value)))
+        else:
+            stack.pop()
+            written = write(encode_container(container, offsets, write))
+            if not stack:
+                break
+            stack[-1][2].append(written)
+    fileobj.seek(0)
+    fileobj.write(header.pack(magic, version, written))
+    fileobj.seek(position[0])
+
+
+def encode(value):
+    if value is None:
+        return b'N'
+    if value is True:
+        return b'T'
+    if value is False:
+        return b'F'
+    if isinstance(value, six.integer_types):
+        if -(1 << 63) <= value < (1 << 63):
+            return b'i' + int64.pack(value)
+        data = str(value).encode('ascii')
+        return b'I' + count.pack(len(data)) + data
+    if isinstance(value, float):
+        return b'd' + double.pack(value)
+    if isinstance(value, six.text_type):
+        data = value.encode('utf-8')
+        return b's' + count.pack(len(data)) + data
+    if isinstance(value, six.binary_type):
+        return b'b' + count.pack(len(value)) + value
+    raise TypeError('%r cannot be mapped' % (value,))
+
+
+def encode_container(container, offsets, write):
+    if not isinstance(container, dict):
+        tag = b'l' if isinstance(container, list) else b't'
+        return tag + count.pack(len(offsets)) + b''.join(offset.pack(item) for item in offsets)
+    # Sorted items, as written, so that keys can be looked up by bisection.
+    entries = []
+    for key, item in zip(sorted(container), offsets):
+        if not isinstance(key, six.string_types):
+            raise TypeError('%r cannot be mapped, keys must be strings' % (key,))
+        data = key.encode('utf-8')
+        entries.append(entry.pack(write(data), len(data), item))
+    return b'o' + count.pack(len(entries)) + b''.join(entries)
+
+
+def load(path):
+    """
+    Map the given file, as written by `dump`, and return its root object.
+
+    The file is mapped read-only: pages are shared by every process mapping
+    it and values are only decoded when accessed, nothing being kept in
+    memory but the objects which are accessed.
+    >>> import os, tempfile
+    >>> fd, path = tempfile.mkstemp()
+    >>> os.close(fd)
+    >>> dump({'one': {'two': [2]}}, path)
+    >>> load(path).one.two
+    [2]
+    >>> os.remove(path)
+
+    :param path: path of the file.
+    :rtype: MappedFlock
+    :raises ValueError: if the file was not written by `dump`.
+
+    """
+    with io.open(path, 'rb') as fd:
+        buffer = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer.size() < header.size:
+        raise ValueError('%s is not a mapped flock' % path)
+    tag, file_version, root = header.unpack_from(buffer, 0)
+    if tag != magic or file_version != version:
+        raise ValueError('%s is not a mapped flock' % path)
+    return MappedFlock(buffer, root)
+
+
+class MappedFlock(Context):
+    """Read-only flocked object decoding its fields from a mapped buffer.
+
+    Fields are looked up by bisection over the sorted keys of the object and
+    decoded on every access, nested objects being new views bound to the
+    top most context.
+
+    :param buffer: buffer holding a file written by `dump`.
+    :param offset: offset of the object in the buffer.
+    :type offset: int
+    :param context: top most context, if any.
+
+    """
+    __slots__ = ('__buffer__', '__offset__', '__context__', '__namespaces__')
+
+    def __init__(self, buffer, offset, context=None):
+        set_slot = object.__setattr__
+        set_slot(self, '__buffer__', buffer)
+        set_slot(self, '__offset__', offset)
+        set_slot(self, '__context__', context)
+
+    @property
+    def __fields__(self):
+        buffer, start = self.__buffer__, self.__offset__
+        fields = []
+        for index in range(count.unpack_from(buffer, start + 1)[0]):
+            key, length, _ = entry.unpack_from(buffer, start + 1 + count.size + index * entry.size)
+            fields.append(buffer[key:key + length].decode('utf-8'))
+        return tuple(fields)
+
+    def __getattr__(self, name):
+        if name[:2] == '__' == name[-2:]:
+            raise AttributeError(name)
+        buffer, start = self.__buffer__, self.__offset__
+        wanted = name.encode('utf-8')
+        low, high = 0, count.unpack_from(buffer, start + 1)[0]
+        start += 1 + count.size
+        while low < high:
+            middle = (low + high) // 2
+            key, length, value = entry.unpack_from(buffer, start + middle * entry.size)
+            key = buffer[key:key + length]
+            if key < wanted:
+                low = middle + 1
+            elif key > wanted:
+                high = middle
+            else:
+                if buffer[value:value + 1] == b'o':
+                    return MappedFlock(buffer, value, self if self.__context__ is None else self.__context__)
+                return decode(buffer, value)
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name in ('__context__', '__namespaces__'):
+            return object.__setattr__(self, name, value)
+        raise AttributeError('Mapped flocks are read-only')
+
+    def __delattr__(self, name):
+        raise AttributeError('Mapped flocks are read-only')
+
+    def __rebind__(self, context):
+        return MappedFlock(self.__buffer__, self.__offset__, context)
+
+    def __reduce_ex__(self, protocol):
+        raise TypeError('Mapped flocks cannot be pickled, share the mapped file instead')
+
+    def __dir__(self):
+        return sorted(set(dir(type(self))) | set(self.__fields__))
+
+
+def decode(buffer, position):
+    """Decode the value at the given position of the buffer. Objects within
+    lists and tuples are decoded as dictionaries."""
+    tag = buffer[position:position + 1]
+    position += 1
+    if tag == b'N':
+        return None
+    if tag == b'T':
+        return True
+    if tag == b'F':
+        return False
+    if tag == b'i':
+        return int64.unpack_from(buffer, position)[0]
+    if tag == b'd':
+        return double.unpack_from(buffer, position)[0]
+    length = count.unpack_from(buffer, position)[0]
+    position += count.size
+    if tag == b's':
+        return buffer[position:position + length].decode('utf-8')
+    if tag == b'b':
+        return buffer[position:position + length]
+    if tag == b'I':
+        return int(buffer[position:position + length].decode('ascii'))
+    if tag in (b'l', b't'):
+        items = [decode(buffer, offset.unpack_from(buffer, position + index * offset.size)[0])
+                 for index in range(length)]
+        return items if tag == b'l' else tuple(items)
+    if tag == b'o':
+        obj = {}
+        for index in range(length):
+            key, size, value = entry.unpack_from(buffer, position + index * entry.size)
+            obj[buffer[key:key + size].decode('utf-8')] = decode(buffer, value)
+        return obj
+    raise ValueError('Unknown tag %r at %d' % (tag, position - 1))
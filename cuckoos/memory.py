@@ -0,0 +1,168 @@
+from __future__ import unicode_literals, absolute_import
+
+import gc
+import sys
+from collections import namedtuple
+
+import six
+
+from .flock import Context, LazyFlock, fields
+
+try:
+    import tracemalloc
+except ImportError:  # Python < 3.4
+    tracemalloc = None
+
+__all__ = ['footprint', 'live_types', 'allocated', 'Footprint']
+
+Footprint = namedtuple(str('Footprint'),
+                       [str('objects'), str('instances'), str('values'),
+                        str('types'), str('type_count')])
+
+
+def footprint(obj):
+    """
+    Returns the deep size of the given flocked object, in bytes.
+
+    Bytes held by the flocked objects of the tree themselves (their instance,
+    dictionary and bound namespaces), by their values (deep size of lists,
+    dictionaries, strings...) and by the flocked types they use are reported
+    separately. Values and types shared within the tree are counted once.
+    Functions and other objects are counted by their own size only. Levels of
+    lazy objects which were not accessed yet are counted as values.
+    >>> from cuckoos.flock import flock
+    >>> size = footprint(flock({'one': {'two': 'three'}}))
+    >>> size.objects, size.type_count
+    (2, 2)
+
+    :param obj: flocked object.
+    :type obj: Context
+    :rtype: Footprint
+
+    """
+    assert isinstance(obj, Context)
+    # Objects counted so far, kept alive so that their ids are not reused.
+    seen = {}
+    objects = instances = values = types = 0
+    classes = set()
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen[id(obj)] = obj
+        objects += 1
+        instances += sys.getsizeof(obj)
+        for storage in (getattr(obj, '__dict__', None), getattr(obj, '__namespaces__', None)):
+            if storage is not None and id(storage) not in seen:
+                seen[id(storage)] = storage
+                instances += sys.getsizeof(storage)
+        cls = type(obj)
+        if cls not in classes:
+            classes.add(cls)
+            types += type_size(cls)
+        for value in stored(obj):
+            if isinstance(value, Context):
+                stack.append(value)
+            else:
+                values += deep_size(value, seen)
+    return Footprint(objects, instances, values, types, len(classes))
+
+
+def stored(obj):
+    """Returns the values of the given flocked object as they are stored:
+    values are neither bound nor materialized."""
+    cls = type(obj)
+    storage = getattr(cls, '__storage__', None)
+    if storage is not None:
+        return [slot.__get__(obj, cls) for slot in storage]
+    if hasattr(cls, '__shape__'):
+        return list(six.itervalues(obj.__dict__))
+    if isinstance(obj, LazyFlock):
+        # Levels not accessed yet are still plain dictionaries.
+        return [obj.__dict__.get(name, value) for name, value in six.iteritems(obj.__source__)]
+    return [getattr(obj, name) for name in fields(obj)]
+
+
+def type_size(cls):
+    """Returns the size of the given type, including its dictionary and the
+    attributes it defines (fields, descriptors and shape)."""
+    size = sys.getsizeof(cls)
+    namespace = vars(cls)
+    referents = gc.get_referents(namespace)
+    if referents and isinstance(referents[0], dict):
+        size += sys.getsizeof(referents[0])
+    return size + sum(sys.getsizeof(value) for name, value in six.iteritems(namespace)
+                      if name not in ('__doc__', '__module__'))
+
+
+def deep_size(value, seen):
+    """Returns the size of the given value and of the containers, keys and
+    items it holds, skipping objects already seen."""
+    size = 0
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen[id(value)] = value
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            stack.extend(value)
+            stack.extend(six.itervalues(value))
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            stack.extend(value)
+    return size
+
+
+def live_types():
+    """
+    Returns the number of flocked types alive in the process, whether they
+    are registered or not. Types evicted from the registry are collected once
+    no instance uses them anymore, along with the reference cycles they are
+    part of.
+    >>> from cuckoos.flock import flock
+    >>> live_types() >= flock.cache_info().currsize
+    True
+
+    :rtype: int
+
+    """
+    count = 0
+    stack = [Context]
+    while stack:
+        cls = stack.pop()
+        subclasses = cls.__subclasses__()
+        stack.extend(subclasses)
+        count += sum(1 for subclass in subclasses if '__shape__' in vars(subclass))
+    return count
+
+
+def allocated(func, *args, **kwargs):
+    """
+    Calls the given function and returns its result along with the memory
+    allocated by the call and still held once it returns, as traced by
+    `tracemalloc`.
+    >>> from cuckoos.flock import flock
+    >>> objects, size = allocated(lambda: [flock({'one': 1}) for _ in range(10)])
+    >>> size > 0
+    True
+
+    :param func: function to call.
+    :return: result of the call and held memory, in bytes.
+    :rtype: tuple
+    :raises RuntimeError: if tracemalloc is not available (Python < 3.4).
+
+    """
+    if tracemalloc is None:
+        raise RuntimeError('tracemalloc is required to trace allocations')
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = func(*args, **kwargs)
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        if started:
+            tracemalloc.stop()
@@ -1,10 +1,10 @@
 from __future__ import unicode_literals, absolute_import
 
-from six import iteritems, callable
+from six import iteritems, callable, create_bound_method
 from inspect import isfunction
 from functools import update_wrapper
-from .flock import flock, get_context
-from .utils import merge, partition
+from . import layout
+from .flock import flock, bind, get_context, Context
 
 
 __all__ = ('NestedObjectType', 'Nest')
@@ -47,64 +47,170 @@ def fledge(method):
 
     :param method: method to recontextualize
     :return: recontextualized method
+    :rtype: FledgedMethod
 
     """
-    def wrapped_method(self, *args, **kwargs):
-        result = method(get_context(self), *args, **kwargs)
-        # make sure we inherit any function properties
-        update_wrapper(wrapped_method, method)
-        return result
+    return FledgedMethod(method)
 
-    update_wrapper(wrapped_method, method)
-    return wrapped_method
 
+class FledgedMethod(object):
+    """Descriptor binding a method to the top most context of the namespace it
+    is looked up from.
+
+    The context is resolved once, when the method is looked up, and the
+    original function is bound to it: calls do not go through any wrapper.
+    Metadata of the original function is copied once and any other attribute
+    is read from it.
+    >>> from cuckoos.flock import flock
+    >>> obj = flock({'nested': {'method': fledge(lambda self: self)}})
+    >>> obj.nested.method() is obj
+    True
+
+    :param method: method to recontextualize.
+    :param path: dotted path of the method in its class, used to report on
+                 it (see `cuckoos.instrument`). Defaults to its name.
+    :type path: basestring
 
-def consolidated(schema):
     """
-    Walk through the schema and merge list into dictionaries following a simple
-    rule. If a member of the list is not a dictianary but a callable, we create
-    a new dictionary {'__call__': value}. If a value is neither callable or
-    a dictionary, we have a deeper problem so we fail.
-
-    e.g.:
-    ```
-    schema = {
-        'land': [
-            <function Object.land at 0x7ff3ff119bf8>,
-            {'realm': <function Object.land__realm at 0x7ff3ff119840>}
-            {'realm':
-                {'act': <function Object.land__realm__act at 0x7f21a16c3a60>}
-            }
-        ]
-    }
-    consolidated(schema)
-    {
-        'land': [
-            {'__call__': <function Object.land at 0x7ff3ff119bf8>},
-            {'realm':
-                {
-                    '__call__': <function Object.land__realm at 0x7ff3ff119840>,
-                    'act': <function Object.land__realm__act at 0x7f21a16c3a60>
-                }
-            }
-        ]
-    }
+    def __init__(self, method, path=None):
+        self.__func__ = method
+        update_wrapper(self, method)
+        self.path = path or self.__name__
+
+    def __get__(self, namespace, owner):
+        if namespace is None:
+            return self
+        context = getattr(namespace, '__context__', None)
+        return create_bound_method(self.__func__, namespace if context is None else context)
+
+    def __call__(self, namespace, *args, **kwargs):
+        return self.__func__(get_context(namespace), *args, **kwargs)
+
+    def __getattr__(self, name):
+        # Only called for attributes not copied by update_wrapper.
+        if name == '__func__':
+            raise AttributeError(name)
+        return getattr(self.__func__, name)
+
+
+class Namespace(object):
+    """Descriptor exposing a top level namespace of a nested class.
+
+    Looked up from an instance, the namespace is bound to the instance and
+    cached in its dictionary, where later lookups find it directly. Looked up
+    from the class, the unbound namespace is returned.
+
+    :param name: name of the namespace in the class.
+    :param namespace: flocked namespace.
+    :type namespace: Context
+
     """
-    if not isinstance(schema, dict):
-        return schema
+    def __init__(self, name, namespace):
+        self.name = name
+        self.namespace = namespace
 
-    consolidated_schema = {}
-    for key, value in iteritems(schema):
-        if isinstance(value, list):
-            value_dict = {}
-            for element in value:
-                if callable(element):
-                    element = {'__call__': element}
-                value_dict = merge(value_dict, element)
-            consolidated_schema[key] = consolidated(value_dict)
-        else:
-            consolidated_schema[key] = consolidated(value)
-    return consolidated_schema
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self.namespace
+        namespace = bind(self.namespace, instance)
+        try:
+            return instance.__dict__.setdefault(self.name, namespace)
+        except AttributeError:
+            return namespace
+
+
+def graft(tree, name, reference, sep='__'):
+    """
+    Graft the given reference into a tree of nested dictionaries, using sep
+    as a separator in its name. When a reference and a nested structure share
+    the same path, the reference becomes the '__call__' entry of the
+    structure. As `partition` does, callable references are renamed after the
+    last part of their name.
+    >>> tree, call, method = {}, lambda: 0, lambda: 1
+    >>> graft(tree, 'nested__method', method)
+    >>> graft(tree, 'nested', call)
+    >>> tree == {'nested': {'method': method, '__call__': call}}
+    True
+
+    :param tree: tree to graft the reference into.
+    :type tree: dict
+    :param name: name of the reference.
+    :type name: basestring
+    :param reference: value of the leaf.
+    :param sep: separator used for partitioning.
+    :type sep: basestring
+    :raises TypeError: if the path is taken by a non callable reference.
+
+    """
+    node = tree
+    root, _, rel = name.partition(sep)
+    while rel:
+        child = node.get(root)
+        if child is None:
+            child = node[root] = {}
+        elif not isinstance(child, dict):
+            child = node[root] = {'__call__': nestable(child, root)}
+        node = child
+        name = rel
+        root, _, rel = name.partition(sep)
+    if callable(reference):
+        reference.__name__ = str(name)  # str() used for Python2 support
+    existing = node.get(name)
+    if isinstance(existing, dict):
+        existing['__call__'] = nestable(reference, name)
+    else:
+        node[name] = reference
+
+
+def nestable(reference, name):
+    if not callable(reference):
+        raise TypeError('%r cannot be both an attribute and a namespace' % (name,))
+    return reference
+
+
+def survey(tree, grafted):
+    """Returns the path of each reference grafted into the given tree, by
+    name.
+
+    :param tree: tree of nested dictionaries.
+    :type tree: dict
+    :param grafted: (name, reference) pairs grafted into the tree.
+    :type grafted: list
+    :rtype: dict
+
+    """
+    names = dict((id(reference), name) for name, reference in grafted)
+    paths = {}
+    stack = [((), tree)]
+    while stack:
+        path, node = stack.pop()
+        for key, value in iteritems(node):
+            if isinstance(value, dict):
+                stack.append((path + (key,), value))
+            else:
+                paths[names[id(value)]] = path + (key,)
+    return paths
+
+
+def replant(tree, grafted, paths):
+    """Put grafted references back into place, according to their paths as
+    returned by `survey`. References are renamed as `graft` does.
+
+    :param tree: tree of nested dictionaries.
+    :type tree: dict
+    :param grafted: (name, reference) pairs.
+    :type grafted: list
+    :param paths: paths by name.
+    :type paths: dict
+
+    """
+    for name, reference in grafted:
+        path = paths[name]
+        node = tree
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = reference
+        reference.__name__ = str(path[-2] if path[-1] == '__call__' else path[-1])
 
 
 class NestedObjectType(type):
@@ -131,51 +237,75 @@ class NestedObjectType(type):
     """
     # noinspection PyInitNewSignature,PyShadowingBuiltins
     def __new__(mcs, name, bases, namespace):
-        schema = mcs.__compile_namespace(namespace)
+        schema = mcs.__compile_namespace(name, namespace)
         cls = super(NestedObjectType, mcs).__new__(mcs, name, bases, dict(schema))
         cls.__methods__ = tuple(namespace)
         return cls
 
     @classmethod
-    def __compile_namespace(mcs, namespace):
+    def __compile_namespace(mcs, name, namespace):
         """
         Convert the given namespace into a flocked namespace, using '__' as a
         separator for nested structures. Private methods and attributes are
         kept untouched.
 
+        Nested methods are grafted into a single tree in one pass, which is
+        then flocked namespace by namespace. When the layout cache is enabled
+        (see `cuckoos.layout`), methods are put straight into place according
+        to the stored layout of the class.
+
+        :param name: name of the class.
         :param namespace: original namespace as defined by the class.
         :type namespace: dict
         :rtype: dict
 
         """
-        schema = {}
+        name = namespace.get('__qualname__', name)
+        schema, grafted = {}, []
         for method_name, reference in iteritems(namespace):
             if excluded(method_name, reference):
-                # If we keep our attribute as a dictionary it will be
-                # misinterpreted during flocking, so we wrap it in an
-                # unambiguous object.
-                if isinstance(reference, dict):
-                    reference = mcs.__wrap(reference)
-                structure = {method_name: reference}
+                schema[method_name] = reference
             else:
                 if isfunction(reference):
-                    reference = fledge(reference)
-                structure = partition(method_name, reference)
-            schema = merge(schema, structure)
-        for key, value in iteritems(consolidated(schema)):
-            if isinstance(value, (dict, )):
-                schema[key] = flock(value)
-            else:
-                # Now we need to unwrap any dictionary attribute.
-                if type(value).__name__ == '#!Wrapper':
-                    value = value.content
-                schema[key] = value
+                    reference = FledgedMethod(reference, '.'.join([name] + method_name.split('__')))
+                grafted.append((method_name, reference))
+
+        cache = layout.cache if '__module__' in namespace else None
+        paths = None
+        if cache is not None:
+            module = namespace['__module__']
+            names = [method_name for method_name, _ in grafted]
+            paths = cache.load(module, name, names)
+        tree = {}
+        if paths is not None:
+            replant(tree, grafted, paths)
+        else:
+            for method_name, reference in grafted:
+                graft(tree, method_name, reference)
+            if cache is not None and len(set(id(ref) for _, ref in grafted)) == len(grafted):
+                cache.store(module, name, names, survey(tree, grafted))
+
+        for key, value in iteritems(tree):
+            if key in schema:
+                nestable(schema[key], key)
+            if isinstance(value, dict):
+                value = Namespace(key, flock(value))
+            elif isinstance(value, FledgedMethod):
+                # Top level methods are already bound to their context.
+                value = value.__func__
+            schema[key] = value
         return schema
 
-    @staticmethod
-    def __wrap(value):
-        wrapper = type(str('#!Wrapper'), (object,), {})()
-        wrapper.content = value
-        return wrapper
 
-Nest = NestedObjectType(str('Nest'), (object,), {})
+def getstate(self):
+    """Returns the state of a nested object to pickle, leaving out namespaces
+    bound to it and their cache (see `bind`): they are bound again on first
+    access."""
+    return dict((name, value) for name, value in iteritems(self.__dict__)
+                if name != '__namespaces__' and not (
+                    isinstance(value, Context) and getattr(value, '__context__', None) is self))
+
+
+# Instances are top most contexts: a class level __context__ spares namespace
+# lookups from failing attribute lookups on them.
+Nest = NestedObjectType(str('Nest'), (object,), {'__context__': None, '__getstate__': getstate})
@@ -0,0 +1,162 @@
+from __future__ import unicode_literals, absolute_import
+
+import six
+
+from .delta import missing, adopt_tree
+from .flock import Context, flock, bind, bindable, fields, slot_name
+
+__all__ = ['overlay', 'Overlay']
+
+
+def overlay(base, overrides):
+    """
+    Stack the given overrides on top of a flocked object, in time linear in
+    the size of the overrides only.
+
+    Overrides are nested dictionaries: nested levels of the base object which
+    are overridden become nested overlays, other values replace the values
+    of the base object, and `missing` values hide them. Lookups of fields
+    which are not overridden fall through to the base object, levels left
+    untouched being shared with it (and viewed through empty overlays bound
+    to the overlay when accessed, whatever their size).
+    The base object is never modified.
+    >>> from cuckoos.flock import unflock
+    >>> base = flock({'db': {'host': 'localhost', 'port': 5432}, 'debug': False})
+    >>> obj = overlay(base, {'db': {'port': 5433}, 'debug': missing})
+    >>> obj.db.host, obj.db.port, base.db.port
+    ('localhost', 5433, 5432)
+    >>> unflock(obj)
+    {'db': {'host': 'localhost', 'port': 5433}}
+
+    :param base: flocked object (or overlay) to override.
+    :type base: Context
+    :param overrides: values overriding the ones of the base object.
+    :type overrides: dict
+    :rtype: Overlay
+
+    """
+    assert isinstance(base, Context) and isinstance(overrides, dict)
+    root = Overlay(base, {})
+    compact = getattr(type(base), '__storage__', None) is not None
+    stack = [(root, overrides)]
+    while stack:
+        target, layer = stack.pop()
+        values = target.__layer__
+        for key, value in six.iteritems(layer):
+            if isinstance(value, dict):
+                below = stored(target.__base__, key)
+                if isinstance(below, Context):
+                    child = values[key] = Overlay(below, {}, root)
+                    stack.append((child, value))
+                    continue
+                value = flock(value, compact)
+                adopt_tree(value, root)
+            values[key] = value
+    return root
+
+
+def stored(obj, name):
+    """Returns the value of the given field as it is stored by the given
+    object (neither bound nor rebound), or `missing`."""
+    cls = type(obj)
+    if hasattr(cls, '__shape__'):
+        if getattr(cls, '__storage__', None) is None:
+            return obj.__dict__.get(name, missing)
+        if name not in cls.__fieldset__:
+            return missing
+        return getattr(obj, slot_name(name, name in cls.__bound__))
+    if isinstance(obj, Overlay):
+        return obj.__stored__(name)
+    return getattr(obj, name, missing)
+
+
+class Overlay(Context):
+    """Flocked object overriding some of the fields of a base object, the
+    other ones being looked up in the base object. See `overlay`.
+
+    Values are looked up on every access, nested objects of the base object
+    being viewed through overlays bound to the top most overlay (once, see
+    `bind`) so that their methods and `get_context` see the overlay rather
+    than the base object.
+    Overlays are read-only.
+
+    :param base: flocked object to override.
+    :type base: Context
+    :param layer: overriding values by name, nested levels being overlays
+                  and `missing` hiding fields.
+    :type layer: dict
+    :param context: top most context, if any.
+
+    """
+    __slots__ = ('__base__', '__layer__', '__context__', '__namespaces__')
+
+    def __init__(self, base, layer, context=None):
+        set_slot = object.__setattr__
+        set_slot(self, '__base__', base)
+        set_slot(self, '__layer__', layer)
+        set_slot(self, '__context__', context)
+
+    @property
+    def __fields__(self):
+        layer, base = self.__layer__, self.__base__
+        names = [name for name in fields(base) if layer.get(name) is not missing]
+        names.extend(name for name, value in six.iteritems(layer)
+                     if value is not missing and name not in base)
+        return tuple(names)
+
+    def __stored__(self, name):
+        value = self.__layer__.get(name)
+        if value is None and name not in self.__layer__:
+            return stored(self.__base__, name)
+        return value
+
+    def __getattr__(self, name):
+        if name[:2] == '__' == name[-2:]:
+            raise AttributeError(name)
+        value = self.__stored__(name)
+        if value is missing:
+            raise AttributeError(name)
+        if isinstance(value, Context):
+            context = self if self.__context__ is None else self.__context__
+            if getattr(value, '__context__', None) is not context:
+                return bind(value, context, view)
+        elif bindable(value):
+            return type(value).__get__(value, self, type(self))
+        return value
+
+    def __contains__(self, name):
+        value = self.__layer__.get(name)
+        if value is None and name not in self.__layer__:
+            return name in self.__base__
+        return value is not missing
+
+    def __setattr__(self, name, value):
+        if name in ('__context__', '__namespaces__'):
+            return object.__setattr__(self, name, value)
+        raise AttributeError('Overlays are read-only')
+
+    def __delattr__(self, name):
+        raise AttributeError('Overlays are read-only')
+
+    def __rebind__(self, context):
+        return Overlay(self.__base__, self.__layer__, context)
+
+    def __reduce_ex__(self, protocol):
+        # The layer is restored once the overlay exists, as nested overlays
+        # refer to their top most overlay.
+        return Overlay, (self.__base__, {}), (self.__layer__, self.__context__)
+
+    def __setstate__(self, state):
+        set_slot = object.__setattr__
+        set_slot(self, '__layer__', state[0])
+        set_slot(self, '__context__', state[1])
+
+    def __dir__(self):
+        return sorted(set(dir(type(self))) | set(self.__fields__))
+
+
+def view(level, context):
+    """Returns an overlay of the given level overriding none of its fields,
+    bound to the given context: unlike `Context.__rebind__`, the fields of the
+    level are not copied."""
+    return Overlay(level, {}, context)
@@ -0,0 +1,80 @@
+from __future__ import unicode_literals, absolute_import
+
+from collections import namedtuple
+from threading import RLock
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    from ordereddict import OrderedDict
+
+__all__ = ['TypeRegistry', 'CacheInfo']
+
+CacheInfo = namedtuple(str('CacheInfo'),
+                       [str('hits'), str('misses'), str('evictions'),
+                        str('maxsize'), str('currsize')])
+
+
+class TypeRegistry(object):
+    """Bounded LRU registry of generated types.
+
+    Types are created on demand by the given factory and keyed by an arbitrary
+    hashable shape. Once more than `maxsize` types are registered, the least
+    recently used one is evicted. Evicted types stay valid for the instances
+    already using them, they are simply not handed out anymore.
+    >>> registry = TypeRegistry(lambda shape: type(str('T'), (object,), {}))
+    >>> registry[('one',)] is registry[('one',)]
+    True
+    >>> registry.info()
+    CacheInfo(hits=1, misses=1, evictions=0, maxsize=1024, currsize=1)
+
+    :param factory: callable building a new type from a shape.
+    :param maxsize: maximum number of types kept in the registry. A size of 0
+                    disables caching altogether.
+    :type maxsize: int
+
+    """
+    def __init__(self, factory, maxsize=1024):
+        self.factory = factory
+        self.maxsize = maxsize
+        self._types = OrderedDict()
+        self._lock = RLock()
+        self._hits = self._misses = self._evictions = 0
+
+    def __getitem__(self, shape):
+        with self._lock:
+            cls = self._types.pop(shape, None)
+            if cls is None:
+                self._misses += 1
+                cls = self.factory(shape)
+                if self.maxsize <= 0:
+                    return cls
+                while len(self._types) >= self.maxsize:
+                    self._types.popitem(last=False)
+                    self._evictions += 1
+            else:
+                self._hits += 1
+            self._types[shape] = cls
+            return cls
+
+    def __contains__(self, shape):
+        return shape in self._types
+
+    def __len__(self):
+        return len(self._types)
+
+    def info(self):
+        """Report registry statistics.
+
+        :rtype: CacheInfo
+
+        """
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions,
+                             self.maxsize, len(self._types))
+
+    def clear(self):
+        """Drop every registered type and reset statistics."""
+        with self._lock:
+            self._types.clear()
+            self._hits = self._misses = self._evictions = 0
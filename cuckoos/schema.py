@@ -0,0 +1,315 @@
+from __future__ import unicode_literals, absolute_import
+
+import six
+
+from .delta import missing
+from .flock import adopt, bindable, registry, instantiate
+
+__all__ = ['Schema', 'ValidationError', 'optional']
+
+
+class ValidationError(ValueError):
+    """Raised when data does not match a schema. Every error found is
+    reported, as a (path, message) pair, the path being a tuple of keys (and
+    of indexes, for lists and batches of records).
+
+    :param errors: (path, message) pairs.
+    :type errors: list
+
+    """
+    def __init__(self, errors):
+        self.errors = errors
+        super(ValidationError, self).__init__('\n'.join(
+            '%s: %s' % ('.'.join(six.text_type(key) for key in path) or '<root>', message)
+            for path, message in errors))
+
+    def __reduce__(self):
+        return ValidationError, (self.errors,)
+
+
+class Optional(object):
+    """Specification of a field which may be missing, see `optional`."""
+    __slots__ = ('spec', 'default')
+
+    def __init__(self, spec, default):
+        self.spec = spec
+        self.default = default
+
+
+def optional(spec, default=None):
+    """Returns the specification of a field which may be missing, the given
+    default being used instead. The default is taken as it is.
+
+    :param spec: specification of the field.
+    :param default: value of the field when missing.
+
+    """
+    return Optional(spec, default)
+
+
+# Placeholder for values which failed validation.
+invalid = object()
+
+
+class Schema(object):
+    """
+    Typed flock: validates, coerces and flocks data in a single pass.
+
+    Schemas are nested dictionaries of specifications, nested levels being
+    given as dictionaries or with separated keys, as `NestedObjectType` does
+    with methods. A specification can be:
+
+    - a type: values of the type are taken as they are, others are coerced:
+      integers and floats are parsed from text (floats being accepted as
+      integers when integral), booleans from 'true', 'false', 'yes', 'no',
+      '1', '0' and from integers 0 and 1, text from bytes (UTF-8) and any other
+      type by calling it with the value. Booleans are never taken as numbers.
+    - any other callable, returning the coerced value or raising a TypeError
+      or a ValueError.
+    - a dictionary, for a nested level.
+    - a list holding a single specification, for lists of items validated
+      against it. Items validated against a dictionary are dictionaries.
+    - an `optional` specification, for fields which may be missing.
+
+    The schema is compiled once: each level knows its fields, how to check
+    them and the flocked type it builds, so that data is walked once.
+    >>> schema = Schema({'id': int, 'user__name': str, 'user__tags': [str]})
+    >>> obj = schema({'id': '1', 'user': {'name': 'Bird', 'tags': ['a']}})
+    >>> obj.id, obj.user.name, obj.user.tags
+    (1, 'Bird', ['a'])
+    >>> schema({'id': 'one', 'user': {'tags': 'a'}})
+    Traceback (most recent call last):
+    ...
+    cuckoos.schema.ValidationError: id: expected int, got 'one'
+    user.name: missing
+    user.tags: expected a list, got 'a'
+
+    :param definition: specifications by name.
+    :type definition: dict
+    :param sep: separator of nested keys.
+    :type sep: basestring
+    :param compact: whether to build compact flocked objects.
+    :type compact: bool
+    :param extra: what to do with keys missing from the schema: 'error' or
+                  'ignore'.
+    :type extra: basestring
+    :raises TypeError: if a specification is not supported.
+
+    """
+    def __init__(self, definition, sep='__', compact=False, extra='error'):
+        assert extra in ('error', 'ignore')
+        self.definition = nest(definition, sep)
+        self.compact = compact
+        self.extra = extra
+        self.check = compile_level(self.definition, self, True)
+
+    def __call__(self, data):
+        """Returns the given data validated, coerced and flocked.
+
+        :param data: data to validate.
+        :type data: dict
+        :rtype: Context
+        :raises ValidationError: if the data does not match the schema.
+
+        """
+        errors, nested = [], []
+        obj = self.check(data, (), errors, nested)
+        if errors:
+            raise ValidationError(errors)
+        return adopt(obj, nested)
+
+    def many(self, records):
+        """Returns the given records validated, coerced and flocked. Every
+        record is validated before any error is raised, error paths starting
+        with the index of their record.
+
+        :param records: data to validate.
+        :rtype: list
+        :raises ValidationError: if any record does not match the schema.
+
+        """
+        check = self.check
+        objects, errors = [], []
+        for index, data in enumerate(records):
+            nested = []
+            obj = check(data, (index,), errors, nested)
+            if obj is not invalid:
+                objects.append(adopt(obj, nested))
+        if errors:
+            raise ValidationError(errors)
+        return objects
+
+
+def nest(definition, sep):
+    """Returns the given definition with separated keys turned into nested
+    dictionaries."""
+    tree = {}
+    stack = [(tree, definition)]
+    while stack:
+        node, level = stack.pop()
+        for name, spec in six.iteritems(level):
+            target = node
+            keys = name.split(sep)
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+                if not isinstance(target, dict):
+                    raise TypeError('%r is both a field and a level' % (name,))
+            if isinstance(spec, dict):
+                child = target.setdefault(keys[-1], {})
+                if not isinstance(child, dict):
+                    raise TypeError('%r is both a field and a level' % (name,))
+                stack.append((child, spec))
+            elif keys[-1] in target:
+                raise TypeError('%r is defined twice' % (name,))
+            else:
+                target[keys[-1]] = spec
+    return tree
+
+
+def compile_level(definition, schema, flocked):
+    """Returns the function checking a level of the given definition. Checked
+    levels are flocked (nested flocked objects being collected to be bound to
+    their top most object) or returned as dictionaries."""
+    fields = []
+    # Levels are always bound when looked up, values only if they are
+    # bindable, which only values of callables (or defaults) may be: the
+    # flocked type is known in advance otherwise.
+    levels, dynamic = [], []
+    for key, spec in six.iteritems(definition):
+        default = missing
+        if isinstance(spec, Optional):
+            spec, default = spec.spec, spec.default
+        if isinstance(spec, dict):
+            levels.append(key)
+            fields.append((key, None, compile_level(spec, schema, flocked), default))
+            continue
+        if isinstance(spec, list):
+            # Lists report errors of their items at the path of each item.
+            fields.append((key, None, compile_list(spec, schema), default))
+            continue
+        if bindable(default) or not isinstance(spec, (type, list)):
+            dynamic.append(key)
+        fields.append((key, compile_spec(spec, schema), None, default))
+    names, levels = tuple(definition), tuple(levels)
+    known = frozenset(names)
+    strict = schema.extra == 'error'
+    compact = schema.compact
+    cls = registry[(names, levels, compact)] if flocked and not dynamic else None
+
+    def check(data, path, errors, nested):
+        if not isinstance(data, dict):
+            errors.append((path, 'expected a dictionary, got %r' % (data,)))
+            return invalid
+        count = len(errors)
+        if strict and not known.issuperset(data):
+            errors.extend((path + (key,), 'unexpected') for key in data if key not in known)
+        values = {}
+        for key, coerce, level, default in fields:
+            try:
+                value = data[key]
+            except KeyError:
+                if default is missing:
+                    errors.append((path + (key,), 'missing'))
+                else:
+                    values[key] = default
+                continue
+            if level is not None:
+                values[key] = level(value, path + (key,), errors, nested)
+                continue
+            try:
+                values[key] = coerce(value)
+            except (TypeError, ValueError) as error:
+                errors.append((path + (key,), six.text_type(error)))
+        if len(errors) > count:
+            return invalid
+        if not flocked:
+            return values
+        if cls is not None:
+            obj = instantiate(cls, values, compact)
+        else:
+            bound = tuple(key for key in names if key in levels or (key in dynamic and bindable(values[key])))
+            obj = instantiate(registry[(names, bound, compact)], values, compact)
+        if path and not isinstance(path[-1], int):
+            nested.append(obj)
+        return obj
+    return check
+
+
+def compile_spec(spec, schema):
+    """Returns the function coercing values of the given specification,
+    raising a TypeError or a ValueError for invalid values."""
+    if isinstance(spec, type):
+        return coerce_type(spec)
+    if callable(spec):
+        return spec
+    raise TypeError('%r is not a valid specification' % (spec,))
+
+
+def compile_list(spec, schema):
+    """Returns the function checking lists of the given specification, which
+    reports errors of items at their own path (ending with their index)."""
+    if len(spec) != 1:
+        raise TypeError('List specifications hold a single specification, got %r' % (spec,))
+    item = spec[0]
+    if isinstance(item, dict):
+        check_item = compile_level(item, schema, False)
+    elif isinstance(item, list):
+        check_item = compile_list(item, schema)
+    else:
+        coerce = compile_spec(item, schema)
+
+        def check_item(value, path, errors, nested):
+            try:
+                return coerce(value)
+            except (TypeError, ValueError) as error:
+                errors.append((path, six.text_type(error)))
+                return invalid
+
+    def check(value, path, errors, nested):
+        if not isinstance(value, (list, tuple)):
+            errors.append((path, 'expected a list, got %r' % (value,)))
+            return invalid
+        count = len(errors)
+        items = [check_item(item, path + (index,), errors, None) for index, item in enumerate(value)]
+        return invalid if len(errors) > count else items
+    return check
+
+
+booleans = {'true': True, 'yes': True, '1': True, 'false': False, 'no': False, '0': False}
+
+
+def coerce_type(cls):
+    """Returns the function coercing values to the given type."""
+    name = cls.__name__
+    numeric = cls in six.integer_types or cls is float
+
+    def coerce(value):
+        if type(value) is cls:
+            return value
+        if isinstance(value, bool) and cls is not bool and numeric:
+            raise TypeError('expected %s, got %r' % (name, value))
+        if isinstance(value, cls):
+            return value
+        try:
+            if cls is bool:
+                if isinstance(value, six.string_types):
+                    return booleans[value.strip().lower()]
+                if isinstance(value, six.integer_types) and value in (0, 1):
+                    return bool(value)
+            elif cls in six.integer_types:
+                if isinstance(value, float) and value.is_integer():
+                    return cls(value)
+                if isinstance(value, six.string_types):
+                    return cls(value.strip())
+            elif cls is float:
+                if isinstance(value, six.integer_types + six.string_types):
+                    return float(value)
+            elif cls is six.text_type:
+                if isinstance(value, six.binary_type):
+                    return value.decode('utf-8')
+            else:
+                return cls(value)
+        except (KeyError, TypeError, ValueError):
+            pass
+        raise TypeError('expected %s, got %r' % (name, value))
+    return coerce
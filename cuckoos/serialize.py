@@ -0,0 +1,86 @@
+from __future__ import unicode_literals, absolute_import
+
+import io
+import json
+
+import six
+
+from .flock import Context, LazyFlock, fields
+
+__all__ = ['dumps', 'dump', 'default']
+
+
+def default(obj):
+    """
+    Returns the fields of the given flocked object, by name, for a JSON
+    encoder to encode them.
+
+    Default flocked objects are given as their dictionary, as it is, compact
+    ones as their slots and lazy ones as their definition, updated with the
+    fields stored on them: nested objects are handed back to this function
+    by the encoder as it goes, so that no dictionary is built for the whole
+    tree. Pass it as the `default` argument of a JSON encoder to encode
+    flocked objects nested in other values.
+    >>> from cuckoos.flock import flock
+    >>> json.dumps({'obj': flock({'one': 1})}, default=default)
+    '{"obj": {"one": 1}}'
+
+    :param obj: flocked object.
+    :type obj: Context
+    :rtype: dict
+    :raises TypeError: if the object is not a flocked object.
+
+    """
+    if not isinstance(obj, Context):
+        raise TypeError('%r is not JSON serializable' % (obj,))
+    cls = type(obj)
+    storage = cls.__dict__.get('__storage__')
+    if storage is not None:
+        return dict(zip(cls.__fields__, [slot.__get__(obj, cls) for slot in storage]))
+    if isinstance(obj, LazyFlock):
+        # Fields accessed (or assigned) so far are stored on the instance.
+        values = obj.__dict__
+        if not values:
+            return obj.__source__
+        return dict((name, values.get(name, value)) for name, value in six.iteritems(obj.__source__))
+    if hasattr(obj, '__dict__'):
+        return obj.__dict__
+    return dict((name, getattr(obj, name)) for name in fields(obj))
+
+
+encoder = json.JSONEncoder(default=default)
+
+
+def dumps(obj, **kwargs):
+    """
+    Serialize the given flocked object to a JSON string, without unflocking
+    it first.
+    >>> from cuckoos.flock import flock
+    >>> dumps(flock({'one': {'two': 2}}))
+    '{"one": {"two": 2}}'
+
+    :param obj: flocked object.
+    :type obj: Context
+    :param kwargs: arguments of `json.dumps`.
+    :rtype: str
+
+    """
+    if kwargs:
+        return json.dumps(obj, default=default, **kwargs)
+    return encoder.encode(obj)
+
+
+def dump(obj, fileobj, **kwargs):
+    """
+    Serialize the given flocked object as JSON to the given file object. JSON
+    is written as UTF-8 to binary file objects.
+
+    :param obj: flocked object.
+    :type obj: Context
+    :param fileobj: text or binary file object.
+    :param kwargs: arguments of `json.JSONEncoder`.
+
+    """
+    binary = isinstance(fileobj, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(fileobj, 'mode', '')
+    for chunk in json.JSONEncoder(default=default, **kwargs).iterencode(obj):
+        fileobj.write(chunk.encode('utf-8') if binary else chunk)
@@ -0,0 +1,153 @@
+from __future__ import unicode_literals, absolute_import
+
+import codecs
+import json
+import six
+from .flock import adopt, build
+
+__all__ = ['flock_stream']
+
+whitespace = ' \t\r\n'
+
+
+def flock_stream(fileobj, compact=False, chunk_size=1 << 16):
+    """
+    Flock the JSON records read from the given file object, one at a time.
+
+    Both newline delimited JSON (one object per line) and a top level JSON array
+    of objects are supported. Objects are flocked straight from the decoder:
+    the dictionaries it builds become the dictionaries of flocked instances
+    rather than being walked again, and only the record being decoded is held
+    in memory. As with `flock`, objects within arrays stay dictionaries.
+    >>> from io import StringIO
+    >>> [obj.one.two for obj in flock_stream(StringIO('{"one": {"two": 2}}'))]
+    [2]
+
+    :param fileobj: text or binary file object to read JSON from.
+    :param compact: whether to flock records in compact mode.
+    :type compact: bool
+    :param chunk_size: number of characters read at once from a JSON array.
+    :type chunk_size: int
+    :return: generator of flocked records.
+    :raises ValueError: if a record is not a JSON object.
+
+    """
+    # Keys holding nested objects, by decoded object. Objects are only flocked
+    # once their record is decoded, from the record down, so that objects
+    # decoded within arrays are left as dictionaries.
+    levels = {}
+
+    def hook(schema):
+        levels[id(schema)] = tuple([key for key, value in six.iteritems(schema) if isinstance(value, dict)])
+        return schema
+
+    decoder = json.JSONDecoder(object_hook=hook)
+    read = fileobj.read
+    if isinstance(read(0), six.binary_type):
+        read = reader(fileobj)
+    # The format is told from the first characters which are not whitespace,
+    # read a chunk at a time rather than a line at a time as arrays are often
+    # written on a single line.
+    head = ''
+    while not head:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        head = chunk.lstrip(whitespace)
+    if head[0] == '[':
+        records = array_records(decoder, head[1:], read, chunk_size)
+    else:
+        records = ndjson_records(decoder.decode, head, read, chunk_size)
+    for record in records:
+        if not isinstance(record, dict):
+            raise ValueError('Expecting a JSON object, got %r' % (record,))
+        obj = objectify(record, levels, compact)
+        levels.clear()
+        yield obj
+
+
+def objectify(record, levels, compact):
+    """Flock the given decoded record, following the nested objects recorded
+    by the decoder hook: their dictionaries are not walked again."""
+    bound = levels[id(record)]
+    if not bound:
+        return adopt(build(record, bound, compact))
+    # Nested objects are built deepest first, replacing their dictionary in
+    # their parent.
+    order = [(record, bound, None, None)]
+    for schema, bound, _, _ in order:
+        for key in bound:
+            child = schema[key]
+            order.append((child, levels[id(child)], schema, key))
+    nested = []
+    for schema, bound, parent, key in reversed(order):
+        obj = build(schema, bound, compact)
+        if parent is None:
+            return adopt(obj, nested)
+        parent[key] = obj
+        nested.append(obj)
+
+
+def ndjson_records(decode, buffer, read, chunk_size):
+    """Decode the lines of newline delimited JSON, starting with the given
+    buffer. Lines are decoded as soon as the buffer holds them entirely."""
+    position = searched = 0
+    while True:
+        end = buffer.find('\n', searched)
+        if end < 0:
+            # As for arrays, read at least as much as what is buffered.
+            chunk = read(max(chunk_size, len(buffer) - position))
+            if chunk:
+                buffer = buffer[position:] + chunk
+                searched = len(buffer) - len(chunk)
+                position = 0
+                continue
+            end = len(buffer)
+        line = buffer[position:end]
+        if line.strip(whitespace):
+            yield decode(line)
+        if end == len(buffer):
+            return
+        position = searched = end + 1
+
+
+def array_records(decoder, buffer, read, chunk_size):
+    """Decode the elements of a JSON array whose opening bracket has already
+    been consumed. Elements are decoded as soon as the buffer holds them
+    entirely."""
+    position = 0
+    exhausted = False
+    while True:
+        # Skip separators until the next element (or the end of the array).
+        while position < len(buffer) and buffer[position] in whitespace + ',':
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except ValueError:
+            if exhausted:
+                raise
+            # Read at least as much as what is buffered so that large records
+            # are not decoded over and over again.
+            chunk = read(max(chunk_size, len(buffer) - position))
+            exhausted = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield record
+        position = end
+
+
+def reader(fileobj):
+    """Returns a function reading text from the given binary file object.
+    Characters split across reads are decoded once read entirely."""
+    decode = codecs.getincrementaldecoder('utf-8')().decode
+
+    def read(size):
+        while True:
+            data = fileobj.read(size)
+            text = decode(data, final=not data)
+            if text or not data:
+                return text
+    return read
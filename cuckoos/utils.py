@@ -2,12 +2,17 @@ from __future__ import unicode_literals, absolute_import
 
 from six import iteritems, callable
 
+# Strategies resolving collisions of values in `combine`.
+strategies = ('multi', 'override', 'append', 'error')
+
 
 def merge(this, that):
     """
     Merge two dictionaries into a single one. It differs from dict.update in
     that it does not override values in the original dictionary. When a key is
     found in both dictionaries, a multi-value entry is created or extended.
+    The first dictionary is updated in place, see `combine` to merge many
+    dictionaries without modifying them.
     >>> merge({'one': 1}, {'one': 0})
     {'one': [1, 0]}
     >>> merge({'one': [0, 1]}, {'one': {'two': 2}})
@@ -35,6 +40,116 @@ def merge(this, that):
     return this
 
 
+def combine(layers, strategy='multi', paths=None, sep='.'):
+    """
+    Merge the given dictionaries into a new one, in order, without modifying
+    any of them. Dictionaries found at the same path are merged key by key,
+    other values found at the same path are resolved by a strategy:
+    'multi' builds multi-value entries as `merge` does, 'override' keeps the
+    last value, 'append' concatenates lists and tuples (keeping the last
+    value otherwise) and 'error' raises a ValueError. A callable strategy is
+    called with the path (as a tuple of keys), the current value and the new
+    one, and returns the merged value.
+
+    Levels are walked with an explicit stack and multi-value entries are
+    extended in place once created, so that the total cost is linear in the
+    size of the layers. Levels found in a single layer are shared with it.
+    >>> combine([{'one': 1}, {'one': 0}, {'one': [2, 3]}])
+    {'one': [1, 0, 2, 3]}
+    >>> combine([{'one': {'two': 2}}, {'one': {'two': 3}}], 'override')
+    {'one': {'two': 3}}
+    >>> combine([{'db': {'hosts': ['a']}, 'port': 1}, {'db': {'hosts': ['b']}, 'port': 2}],
+    ...         paths={'db.hosts': 'append', 'port': 'override'})
+    {'db': {'hosts': ['a', 'b']}, 'port': 2}
+
+    :param layers: dictionaries to merge, from the lowest to the highest.
+    :param strategy: strategy used for paths without a strategy of their own.
+    :type strategy: basestring or callable
+    :param paths: strategies by path (keys joined by sep), applying to the
+                  path and to the paths nested in it.
+    :type paths: dict
+    :param sep: separator of the keys of the paths.
+    :type sep: basestring
+    :return: merged dictionary
+    :rtype: dict
+    :raises ValueError: if values collide where the strategy is 'error', or
+                        if a strategy is unknown.
+
+    """
+    paths = dict((tuple(path.split(sep)), resolver(value)) for path, value in iteritems(paths or {}))
+    default = resolver(strategy)
+    result = {}
+    # Containers created by the merge, which can be updated in place, by id.
+    owned = {id(result): result}
+    for layer in layers:
+        assert isinstance(layer, dict)
+        stack = [(result, layer, (), default)]
+        while stack:
+            target, source, path, level = stack.pop()
+            for key, value in iteritems(source):
+                if key not in target:
+                    target[key] = value
+                    continue
+                current = target[key]
+                if isinstance(current, dict) and isinstance(value, dict):
+                    if id(current) not in owned:
+                        current = target[key] = dict(current)
+                        owned[id(current)] = current
+                    nested = path + (key,)
+                    stack.append((current, value, nested, paths.get(nested, level) if paths else level))
+                    continue
+                resolve = paths.get(path + (key,), level) if paths else level
+                target[key] = resolve(path, key, current, value, owned)
+    return result
+
+
+def resolver(strategy):
+    """Returns the function resolving collisions with the given strategy."""
+    if callable(strategy):
+        return lambda path, key, current, value, owned: strategy(path + (key,), current, value)
+    try:
+        return resolvers[strategy]
+    except KeyError:
+        raise ValueError('Unknown merge strategy %r, expected one of %s or a callable'
+                         % (strategy, ', '.join(strategies)))
+
+
+def owned_list(current, owned):
+    """Returns the given value as a list which can be extended in place."""
+    if current.__class__ is not list or id(current) not in owned:
+        current = list(current) if isinstance(current, (list, tuple)) else [current]
+        owned[id(current)] = current
+    return current
+
+
+def resolve_multi(path, key, current, value, owned):
+    current = owned_list(current, owned)
+    if isinstance(value, (list, tuple)):
+        current.extend(value)
+    else:
+        current.append(value)
+    return current
+
+
+def resolve_override(path, key, current, value, owned):
+    return value
+
+
+def resolve_append(path, key, current, value, owned):
+    if isinstance(current, (list, tuple)) and isinstance(value, (list, tuple)):
+        current = owned_list(current, owned)
+        current.extend(value)
+        return current
+    return value
+
+
+def resolve_error(path, key, current, value, owned):
+    raise ValueError('Conflicting values at %r: %r and %r' % (path + (key,), current, value))
+
+
+resolvers = dict(zip(strategies, (resolve_multi, resolve_override, resolve_append, resolve_error)))
+
+
 def extend(target, element):
     """
     Extend the given list with the given element. If element is a scalar, it is
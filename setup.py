@@ -41,7 +41,7 @@ setup(
     author_email='alex.r.hoyling@gmail.com',
     platforms=['any'],
     license='BSD',
-    packages=find_packages(exclude=['tests', 'tests.*']),
+    packages=find_packages(exclude=['tests', 'tests.*', 'benchmarks', 'benchmarks.*']),
     include_package_data=False,
     install_requires=requires.pop('default'),
     extras_require=requires,
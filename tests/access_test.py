@@ -0,0 +1,59 @@
+from __future__ import unicode_literals
+
+import pytest
+
+from cuckoos import access
+from cuckoos.access import path, pluck
+from cuckoos.flock import flock
+
+
+def records(count):
+    return [flock({'id': index, 'user': {'name': 'User %d' % index,
+                                         'auth': {'token': '%04x' % index} if index % 2 else None}})
+            for index in range(count)]
+
+
+class TestPath:
+    def setup(self):
+        self.objects = records(4)
+
+    def test_path(self):
+        assert path('user.auth.token')(self.objects[1]) == '0001'
+        assert path('user__auth__token', sep='__')(self.objects[3]) == '0003'
+        assert path('user.auth.token') is path('user.auth.token')
+
+    def test_default(self):
+        get = path('user.auth.token', default='')
+        assert [get(obj) for obj in self.objects] == ['', '0001', '', '0003']
+        assert path('user.missing', default=None)(self.objects[0]) is None
+        with pytest.raises(AttributeError):
+            path('user.auth.token')(self.objects[0])
+
+    def test_cached(self):
+        obj = self.objects[0]
+        assert path('user.name', default=None) is path('user.name', default=None)
+        assert path('user.missing', default=1)(obj) == 1
+        assert path('user.missing', default=True)(obj) is True
+        assert path('user.missing', default=[])(obj) == []
+        for index in range(access.max_getters + 1):
+            path('level%d' % index)
+        assert len(access.getters) == access.max_getters
+
+
+class TestPluck:
+    def setup(self):
+        self.objects = records(4)
+
+    def test_single_path(self):
+        assert pluck(self.objects, 'id') == [0, 1, 2, 3]
+        assert pluck(self.objects, 'user.auth.token', default=None) == [None, '0001', None, '0003']
+
+    def test_many_paths(self):
+        assert pluck(self.objects[:2], ['id', 'user.name']) == [(0, 'User 0'), (1, 'User 1')]
+        assert pluck(self.objects[:2], ['user__auth__token', 'id'], sep='__', default='') == \
+            [('', 0), ('0001', 1)]
+        assert pluck(self.objects[:2], ['id']) == [(0,), (1,)]
+
+    def test_missing(self):
+        with pytest.raises(AttributeError):
+            pluck(self.objects, ['id', 'user.auth.token'])
@@ -0,0 +1,151 @@
+from __future__ import unicode_literals
+
+import asyncio
+import inspect
+
+import pytest
+
+from cuckoos import Nest, instrument
+from cuckoos.aio import fan_out
+from cuckoos.nest import fledge
+
+
+class Server(object):
+    """Local stand-in for a remote service: answers each line with its upper
+    case version after a delay, tracking concurrent connections."""
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.active = self.peak = 0
+
+    async def handle(self, reader, writer):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            line = await reader.readline()
+            await asyncio.sleep(self.delay)
+            writer.write(line.upper())
+            await writer.drain()
+        finally:
+            self.active -= 1
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+class Client(Nest):
+    def __init__(self, port):
+        self.port = port
+
+    async def get(self, value):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        try:
+            writer.write(value.encode('utf-8') + b'\n')
+            return (await reader.readline()).decode('utf-8').strip()
+        finally:
+            writer.close()
+
+    async def get__twice(self, value):
+        return [await self.get(value), await self.get(value)]
+
+    async def get__each(self, *values):
+        for value in values:
+            yield await self.get(value)
+
+    def get__sync(self, value):
+        return value.upper()
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def with_server(test, **kwargs):
+    async def scenario():
+        server = await Server(**kwargs).start()
+        try:
+            return await test(server, Client(server.port))
+        finally:
+            await server.stop()
+    return run(scenario())
+
+
+class TestAsyncFledge:
+    def test_method_kinds(self):
+        client = Client(0)
+        assert inspect.iscoroutinefunction(client.get.__call__)
+        assert inspect.iscoroutinefunction(client.get.twice)
+        assert inspect.isasyncgenfunction(client.get.each)
+        assert not inspect.iscoroutinefunction(client.get.sync)
+        assert client.get.sync('a') == 'A'
+
+    def test_fledged_descriptor(self):
+        async def method(self):
+            pass
+
+        async def generator(self):
+            yield
+
+        assert inspect.iscoroutinefunction(fledge(method))
+        assert inspect.isasyncgenfunction(fledge(generator))
+
+    def test_context(self):
+        async def test(server, client):
+            each = [value async for value in client.get.each('a', 'b')]
+            return await client.get.twice('a'), each
+        assert with_server(test) == (['A', 'A'], ['A', 'B'])
+
+    def test_instrumented(self):
+        async def test(server, client):
+            return await client.get.twice('a'), [value async for value in client.get.each('b')]
+        instrument.enable()
+        try:
+            client = Client(0)
+            assert inspect.iscoroutinefunction(client.get.twice)
+            assert inspect.isasyncgenfunction(client.get.each)
+            assert with_server(test) == (['A', 'A'], ['B'])
+            calls = instrument.snapshot()['calls']
+        finally:
+            instrument.disable()
+        assert calls['Client.get.twice']['count'] == calls['Client.get.each']['count'] == 1
+
+
+class TestFanOut:
+    def test_results_order(self):
+        async def test(server, client):
+            return await fan_out(client, [('get', ('b',)), ('get', (), {'value': 'c'}),
+                                          ('get.twice', ('d',))])
+        assert with_server(test) == ['B', 'C', ['D', 'D']]
+
+    def test_bounded_concurrency(self):
+        async def test(server, client):
+            results = await fan_out(client, [('get', (str(index),)) for index in range(20)], limit=4)
+            return results, server.peak
+        results, peak = with_server(test)
+        assert results == [str(index) for index in range(20)]
+        assert 1 < peak <= 4
+
+    def test_unbounded_concurrency(self):
+        async def test(server, client):
+            await fan_out(client, [('get', (str(index),)) for index in range(10)])
+            return server.peak
+        assert with_server(test, delay=0.05) == 10
+
+    def test_exceptions(self):
+        async def test(server, client):
+            return await fan_out(client, [('get', ('a',)), ('get', (1,))], return_exceptions=True)
+        results = with_server(test)
+        assert results[0] == 'A'
+        assert isinstance(results[1], AttributeError)
+        with pytest.raises(AttributeError):
+            with_server(lambda server, client: fan_out(client, [('get', (1,))]))
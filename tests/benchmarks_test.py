@@ -0,0 +1,36 @@
+from __future__ import unicode_literals
+
+import json
+
+from benchmarks import suite
+
+
+class TestSuite:
+    def setup(self):
+        self.baseline = {'results': {'fast': 1.0, 'slow': 1.0}, 'threshold': 1.5,
+                         'thresholds': {'slow': 3.0}}
+
+    def test_compare(self):
+        comparison = suite.compare({'fast': 2.0, 'slow': 2.0, 'new': 1.0}, self.baseline)
+        assert comparison == [('fast', 2.0, 2.0, True), ('slow', 2.0, 2.0, False), ('new', 1.0, None, False)]
+
+    def test_compare_threshold(self):
+        comparison = suite.compare({'fast': 1.2, 'slow': 2.0}, self.baseline, threshold=1.1)
+        assert [failed for _, _, _, failed in comparison] == [True, True]
+
+    def test_cases(self):
+        for setup, _ in suite.cases.values():
+            setup()()
+
+    def test_main(self, tmpdir):
+        baseline, output = str(tmpdir.join('baseline.json')), str(tmpdir.join('output.json'))
+        assert suite.main(['--baseline', baseline, '--save', '--filter', 'access', '--repeat', '1']) == 0
+        # Timings of a single run are noisy, the success case only checks
+        # that results are compared and written.
+        assert suite.main(['--baseline', baseline, '--filter', 'depth 1$', '--repeat', '1',
+                           '--threshold', '1e6', '--output', output]) == 0
+        with open(output) as fd:
+            results = json.load(fd)
+        assert list(results['results']) == ['access, depth 1']
+        assert suite.main(['--baseline', baseline, '--filter', 'depth 1$', '--repeat', '1',
+                           '--threshold', '1e-6']) == 1
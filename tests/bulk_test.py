@@ -0,0 +1,71 @@
+from __future__ import unicode_literals
+
+from multiprocessing.pool import ThreadPool
+
+import pytest
+
+from cuckoos.bulk import flock_many, encode_chunk, decode_chunk
+from cuckoos.flock import flock, unflock, get_context
+
+
+def definitions(count):
+    return [{'id': index, 'user': {'name': 'User %d' % index, 'address': {'zip': index}},
+             'tags': ['a', {'b': index}], 'empty': {}} for index in range(count)]
+
+
+class TestBulk:
+    def setup(self):
+        self.definitions = definitions(250)
+
+    def check(self, objects, compact=False):
+        assert [unflock(obj) for obj in objects] == self.definitions
+        for obj in objects[:3]:
+            assert type(obj) is type(flock(self.definitions[0], compact))
+            assert get_context(obj.user.address) is obj
+            assert obj.user.address.zip == obj.id
+
+    def test_inline(self):
+        self.check(list(flock_many(self.definitions)))
+
+    def test_threads(self):
+        self.check(list(flock_many(self.definitions, workers=2, executor='thread', chunksize=16)))
+
+    def test_processes(self):
+        self.check(list(flock_many(iter(self.definitions), workers=2, chunksize=16)))
+
+    def test_compact(self):
+        objects = list(flock_many(self.definitions, workers=2, chunksize=16, compact=True))
+        self.check(objects, compact=True)
+        assert not hasattr(objects[0], '__dict__')
+
+    def test_pool(self):
+        pool = ThreadPool(2)
+        try:
+            self.check(list(flock_many(self.definitions, executor=pool, chunksize=7)))
+            # The given pool is left running.
+            assert pool.apply_async(len, ([1],)).get() == 1
+        finally:
+            pool.terminate()
+
+    def test_streaming(self):
+        consumed = []
+
+        def source():
+            for definition in self.definitions:
+                consumed.append(definition)
+                yield definition
+        results = flock_many(source(), workers=2, executor='thread', chunksize=10)
+        assert next(results).id == 0
+        # At most two chunks per worker are read ahead.
+        assert len(consumed) <= 50
+        results.close()
+
+    def test_unknown_executor(self):
+        with pytest.raises(ValueError):
+            list(flock_many(self.definitions, workers=2, executor='fiber'))
+
+    def test_encoding(self):
+        shapes, records = encode_chunk(self.definitions)
+        # Shapes are sent once per chunk.
+        assert len(shapes) == 4
+        assert [unflock(obj) for obj in decode_chunk((shapes, records))] == self.definitions
@@ -0,0 +1,171 @@
+from __future__ import unicode_literals
+
+import gc
+import sys
+import threading
+
+import pytest
+
+from cuckoos.cache import cached, cache_info, invalidate, instances
+from cuckoos.flock import flock
+from cuckoos.nest import Nest, fledge
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+clock = Clock()
+
+
+class Client(Nest):
+    def __init__(self):
+        self.calls = []
+
+    @cached(maxsize=2, ttl=10, timer=clock)
+    def get(self, key, **params):
+        self.calls.append(('get', key))
+        return {'key': key, 'params': params}
+
+    @cached()
+    def get__json(self, key):
+        self.calls.append(('json', key))
+        return dict(self.get(key), json=True)
+
+    @cached(maxsize=None)
+    def users__profile__load(self, user):
+        assert isinstance(self, Client)
+        self.calls.append(('profile', user))
+        return [user]
+
+
+class Request(Nest):
+    def __init__(self, uri):
+        self.uri = uri
+
+    def get(self, key):
+        return {'uri': self.uri, 'key': key}
+
+    def get__json(self, key):
+        return self.get(key)
+
+
+class CachedRequest(Request):
+    # As documented: the `get` namespace of `Request` is shadowed.
+    def get(self, key):
+        return {'uri': self.uri, 'key': key}
+
+    @cached(maxsize=256, ttl=60)
+    def get__json(self, key):
+        return self.get(key)
+
+
+class TestCached:
+    def setup(self):
+        clock.now = 0.0
+        self.client = Client()
+
+    def test_nested(self):
+        client = self.client
+        assert client.get.json(1) is client.get.json(1)
+        assert client.users.profile.load('a') is client.users.profile.load('a')
+        assert client.calls == [('json', 1), ('get', 1), ('profile', 'a')]
+        assert cache_info(client, 'get.json') == (1, 1, 0, 128, 1)
+        assert cache_info(client.users, 'profile.load').currsize == 1
+        assert cache_info(client, 'get') == (0, 1, 0, 2, 1)
+
+    def test_subclass(self):
+        req = CachedRequest('get')
+        assert req.get.json(1) is req.get.json(1)
+        assert req.get.json(1) == Request('get').get.json(1)
+        assert cache_info(req, 'get.json').hits == 2
+        invalidate(req, 'get.json', 1)
+        assert cache_info(req, 'get.json').currsize == 0
+
+    def test_per_instance(self):
+        other = Client()
+        self.client.get.json(1)
+        other.get.json(1)
+        assert len(other.calls) == 2
+        assert cache_info(other, 'get.json').misses == 1
+
+    def test_keys(self):
+        client = self.client
+        assert client.get(1, page=2) is client.get(1, page=2)
+        assert client.get(1, page=2) is not client.get(1, page=3)
+        assert client.get(1) is not client.get(1, page=2)
+
+    def test_lru_and_ttl(self):
+        client = self.client
+        client.get(1), client.get(2), client.get(1), client.get(3)
+        assert cache_info(client, 'get').evictions == 1
+        client.get(1)
+        client.get(2)
+        assert client.calls.count(('get', 2)) == 2
+        clock.now = 11
+        client.get(2)
+        assert client.calls.count(('get', 2)) == 3
+
+    def test_invalidate(self):
+        client = self.client
+        client.get.json(1), client.get.json(2), client.get(3)
+        invalidate(client, 'get.json', 1)
+        assert cache_info(client, 'get.json').currsize == 1
+        invalidate(client, 'get.json')
+        assert cache_info(client, 'get.json').currsize == 0
+        assert cache_info(client, 'get').currsize == 2
+        invalidate(client)
+        assert cache_info(client, 'get').currsize == 0
+        with pytest.raises(ValueError):
+            invalidate(client, 'users')
+        with pytest.raises(AttributeError):
+            cache_info(client, 'missing')
+
+    def test_collected(self):
+        client = Client()
+        client.get.json(1)
+        key = id(client)
+        assert key in instances
+        del client
+        gc.collect()
+        assert key not in instances
+
+    def test_flocked(self):
+        calls = []
+
+        def load(self, key):
+            calls.append(key)
+            return key
+        obj = flock({'nested': {'load': fledge(cached()(load))}})
+        assert obj.nested.load(1) == obj.nested.load(1) == 1
+        assert calls == [1]
+        assert cache_info(obj, 'nested.load').hits == 1
+
+    def test_threads(self):
+        client = self.client
+        barrier = threading.Event()
+        results = []
+
+        def work():
+            barrier.wait()
+            results.extend(client.users.profile.load(index % 10) for index in range(1000))
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        barrier.set()
+        for thread in threads:
+            thread.join()
+        info = cache_info(client, 'users.profile.load')
+        assert len(results) == 8000 and info.hits + info.misses == 8000
+        assert info.currsize == 10
+
+    @pytest.mark.skipif(sys.version_info < (3, 5), reason='requires async def')
+    def test_coroutines(self):
+        namespace = {}
+        exec('async def method(self):\n    pass', namespace)
+        with pytest.raises(TypeError):
+            cached()(namespace['method'])
@@ -0,0 +1,4 @@
+import sys
+
+# Coroutine syntax is only available from Python 3.5.
+collect_ignore = ['aio_test.py'] if sys.version_info < (3, 5) else []
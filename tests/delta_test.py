@@ -0,0 +1,134 @@
+from __future__ import unicode_literals
+
+import pickle
+
+import pytest
+
+from cuckoos.delta import patch, diff, missing
+from cuckoos.flock import flock, unflock, get_context
+from cuckoos.utils import merge
+
+
+def definition():
+    return {'name': 'config', 'db': {'host': 'localhost', 'port': 5432, 'options': {'ssl': True}},
+            'cache': {'ttl': 60}, 'tags': ['a']}
+
+
+class TestPatch:
+    def test_merge_semantics(self):
+        delta = {'db': {'port': 5433, 'user': 'admin', 'options': {'ssl': False}},
+                 'tags': 'b', 'cache': 1, 'new': {'one': 1}}
+        obj = patch(flock(definition()), delta)
+        assert unflock(obj) == merge(definition(), delta)
+
+    def test_overwrite(self):
+        obj = flock(definition())
+        assert patch(obj, {'db': {'port': 5433}, 'cache': missing, 'extra': missing},
+                     overwrite=True) is obj
+        expected = definition()
+        expected['db']['port'] = 5433
+        del expected['cache']
+        assert unflock(obj) == expected
+
+    def test_in_place(self):
+        obj = flock(definition())
+        db, options, cache = obj.db, obj.db.options, obj.cache
+        patch(obj, {'db': {'port': 5433, 'replica': {'host': 'replica'}}}, overwrite=True)
+        assert obj.db is db and db.port == 5433
+        assert obj.db.options is options and obj.cache is cache
+        assert obj.db.replica.host == 'replica'
+        assert get_context(obj.db.replica) is obj
+        assert type(obj.db) is type(flock(unflock(obj.db)))
+
+    def test_copy(self):
+        obj = flock(definition())
+        copied = patch(obj, {'db': {'port': 5433}, 'new': {'one': 1}}, copy=True, overwrite=True)
+        assert unflock(obj) == definition()
+        assert copied.db.port == 5433 and copied.new.one == 1
+        # Unchanged levels are shared, changed ones are copied.
+        assert vars(copied)['cache'] is vars(obj)['cache']
+        assert vars(copied.db)['options'] is vars(obj.db)['options']
+        assert vars(copied)['db'] is not vars(obj)['db']
+        assert get_context(copied.db) is copied
+        assert get_context(copied.cache) is copied
+        assert get_context(obj.cache) is obj
+
+    def test_compact(self):
+        obj = flock(definition(), compact=True)
+        patch(obj, {'db': {'port': 5433, 'user': 'admin'}}, overwrite=True)
+        assert obj.db.port == 5433 and obj.db.user == 'admin'
+        assert get_context(obj.db) is obj
+        assert not hasattr(obj.db, '__dict__')
+        with pytest.raises(TypeError):
+            patch(obj, {'new': 1})
+        copied = patch(obj, {'new': 1}, copy=True)
+        assert copied.new == 1 and not hasattr(obj, 'new')
+
+    def test_compact_unchanged_on_error(self):
+        obj = flock({'one': {'two': 2}, 'three': {'four': 4}}, compact=True)
+        changes = []
+        with pytest.raises(TypeError):
+            patch(obj, {'one': {'two': 5}, 'three': {'four': 6}, 'new': 1}, overwrite=True,
+                  callback=lambda *change: changes.append(change))
+        assert unflock(obj) == {'one': {'two': 2}, 'three': {'four': 4}}
+        assert changes == []
+
+    def test_lazy(self):
+        delta = {'db': {'port': 5433, 'options': {'ssl': False}}, 'new': {'one': 1}}
+        obj = flock(definition(), lazy=True)
+        patched = patch(obj, delta, copy=True)
+        assert unflock(patched) == merge(definition(), delta)
+        assert get_context(patched.db.options) is patched
+        assert unflock(obj) == definition()
+        with pytest.raises(TypeError):
+            patch(obj, delta)
+        assert unflock(obj) == definition()
+        parent = flock({'lazy': flock({'one': 1}, lazy=True)})
+        patch(parent, {'lazy': {'two': 2}})
+        assert unflock(parent) == {'lazy': {'one': 1, 'two': 2}}
+        assert get_context(parent.lazy) is parent
+
+    def test_callback(self):
+        changes = []
+        patch(flock(definition()), {'db': {'port': 5433, 'user': 'admin'}, 'cache': missing,
+                                    'name': 'config'},
+              overwrite=True, callback=lambda *change: changes.append(change))
+        changes = dict((path, (old, new)) for path, old, new in changes)
+        assert changes[('db', 'port')] == (5432, 5433)
+        assert changes[('db', 'user')] == (missing, 'admin')
+        assert changes[('cache',)][1] is missing
+        assert len(changes) == 3
+
+    def test_missing_pickle(self):
+        assert pickle.loads(pickle.dumps(missing)) is missing
+
+
+class TestDiff:
+    def test_diff(self):
+        this, that = definition(), definition()
+        that['db']['options']['ssl'] = False
+        that['db']['user'] = 'admin'
+        del that['cache']
+        that['tags'] = ['a', 'b']
+        delta = diff(flock(this), flock(that))
+        assert delta == {'db': {'options': {'ssl': False}, 'user': 'admin'},
+                         'cache': missing, 'tags': ['a', 'b']}
+        obj = flock(this)
+        assert unflock(patch(obj, delta, overwrite=True)) == that
+        assert diff(obj, flock(that)) == {}
+
+    def test_lazy(self):
+        this = flock(definition(), lazy=True)
+        that = definition()
+        that['db']['port'] = 5433
+        assert diff(this, flock(that, lazy=True)) == {'db': {'port': 5433}}
+
+    def test_levels_replaced(self):
+        assert diff(flock({'one': {'two': 2}}), flock({'one': 1})) == {'one': 1}
+        assert diff(flock({'one': 1}), flock({'one': {'two': 2}})) == {'one': {'two': 2}}
+        assert diff(flock({'one': 1}), {'one': {'two': 2}}) == {'one': {'two': 2}}
+
+    def test_shared_levels(self):
+        obj = flock(definition())
+        copied = patch(obj, {'name': 'other'}, copy=True, overwrite=True)
+        assert diff(obj, copied) == {'name': 'other'}
@@ -1,8 +1,18 @@
 from __future__ import unicode_literals
 
+import copy
+import pickle
+import sys
+
+import pytest
 import six
 from inspect import getmodule
-from cuckoos.flock import flock, unflock, get_context
+from cuckoos.flock import flock, unflock, get_context, LazyFlock
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 
 if six.PY2:
     import __builtin__ as builtins
@@ -43,6 +53,27 @@ class TestPack:
         definition = {'one': {'two': {'three': self.func}}}
         assert unflock(flock(definition)) == definition
 
+    def test_flock_unflock_names(self):
+        definition = {'one_two': 1, '_three': 3, 'four': {'f_ive': 5}}
+        assert unflock(flock(definition)) == definition
+
+    def test_flock_unflock_deep(self):
+        depth = 10 * sys.getrecursionlimit()
+        definition = leaf = {}
+        for _ in range(depth):
+            leaf['next'] = leaf = {}
+        leaf['value'] = 1
+
+        obj = flock(definition)
+        for _ in range(depth):
+            obj = obj.next
+        assert obj.value == 1
+
+        schema = unflock(flock(definition))
+        for _ in range(depth):
+            schema = schema['next']
+        assert schema == {'value': 1}
+
 
 class TestContext:
     def func(self):
@@ -54,6 +85,31 @@ class TestContext:
         assert get_context(obj.one) == obj
         assert get_context(obj.one.two) == obj
 
+    def test_context_bound_at_creation(self):
+        obj = flock({'one': {'two': {'three': 3}}})
+        assert obj.one.__context__ is obj
+        assert obj.one.two.__context__ is obj
+        assert obj.one is obj.one
+
+    def test_context_rebinding(self):
+        obj = flock({'one': {'two': 2}})
+        other = flock({'three': obj.one})
+        assert get_context(other.three) is other
+        assert other.three is other.three
+        assert get_context(obj.one) is obj
+
+    @pytest.mark.parametrize('compact', [False, True])
+    def test_context_rebinding_reassigned(self, compact):
+        obj = flock({'db': {'host': 'a'}, 'sub': {'db': {'host': 'b'}}}, compact=compact)
+        for index in range(1000):
+            obj.db = flock({'host': index})
+            obj.sub.db = flock({'host': index})
+            assert obj.db.host == obj.sub.db.host == index
+            assert get_context(obj.sub.db) is obj
+        assert len(obj.__namespaces__) == 2
+        del obj.db
+        assert len(obj.__namespaces__) == 1
+
     def test_context_function(self):
         assert get_context(lambda: 1) == getmodule(self)
         assert get_context(self.func) == self
@@ -69,3 +125,230 @@ class TestContext:
         assert get_context([1, 2, 3, 4]) is None
         assert get_context((1, 2, 3,)) is None
         assert get_context({1: 2}) is None
+
+
+class TestShapeCache:
+    def setup(self):
+        flock.cache_clear()
+
+    def test_same_shape_same_type(self):
+        one, two = flock({'one': 1, 'two': {'three': 3}}), flock({'one': 'a', 'two': {'three': 'b'}})
+        assert type(one) is type(two)
+        assert type(one.two) is type(two.two)
+        assert (one.one, one.two.three) == (1, 3)
+        assert (two.one, two.two.three) == ('a', 'b')
+
+    def test_different_shape_different_type(self):
+        assert type(flock({'one': 1})) is not type(flock({'two': 1}))
+        assert type(flock({'one': 1})) is not type(flock({'one': lambda _: 1}))
+
+    def test_cache_info(self):
+        flock({'one': 1})
+        flock({'one': 2})
+        info = flock.cache_info()
+        assert (info.hits, info.misses, info.evictions, info.currsize) == (1, 1, 0, 1)
+
+    def test_cache_eviction(self):
+        from cuckoos.flock import registry
+        maxsize, registry.maxsize = registry.maxsize, 2
+        try:
+            first = type(flock({'one': 1}))
+            flock({'two': 2})
+            flock({'three': 3})
+            assert flock.cache_info().evictions == 1
+            assert type(flock({'one': 1})) is not first
+        finally:
+            registry.maxsize = maxsize
+
+    def test_values_bound_per_instance(self):
+        one, two = flock({'get': lambda self: self.value, 'value': 1}), flock({'get': lambda self: self.value, 'value': 2})
+        assert type(one) is type(two)
+        assert (one.get(), two.get()) == (1, 2)
+
+
+class TestCompact:
+    def func(self):
+        return 1
+
+    def test_compact_attributes(self):
+        obj = flock({'one': 1, 'two': {'three': self.func, 'four': lambda _: 4}}, compact=True)
+        assert not hasattr(obj, '__dict__')
+        assert not hasattr(obj.two, '__dict__')
+        assert obj.one == 1
+        assert obj.two.three() == 1
+        assert obj.two.four() == 4
+
+    def test_compact_context(self):
+        obj = flock({'one': {'two': lambda: 3, 'three': 4}}, compact=True)
+        assert get_context(obj) == obj
+        assert get_context(obj.one) == obj
+
+    def test_compact_unflock(self):
+        definition = {'one': {'two': {'three': self.func}}, 'four': 4}
+        assert unflock(flock(definition, compact=True)) == definition
+
+    def test_compact_type_cache(self):
+        assert type(flock({'one': 1}, compact=True)) is type(flock({'one': 2}, compact=True))
+        assert type(flock({'one': 1}, compact=True)) is not type(flock({'one': 1}))
+
+    def test_compact_memory(self):
+        tracemalloc = pytest.importorskip('tracemalloc')
+        definition = dict(('key%d' % i, i) for i in range(8))
+
+        def bytes_per_object(compact, count=3000):
+            tracemalloc.start()
+            try:
+                before = tracemalloc.get_traced_memory()[0]
+                objects = [flock(definition, compact=compact) for _ in range(count)]
+                after = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+            assert len(objects) == count
+            return (after - before) / float(count)
+
+        # Warm interpreter free lists up so that they do not account for growth.
+        bytes_per_object(False), bytes_per_object(True)
+        default, compact = bytes_per_object(False), bytes_per_object(True)
+        assert compact < default / 2, (compact, default)
+
+
+class TestLazy:
+    def func(self):
+        return 1
+
+    def test_lazy_attributes(self):
+        obj = flock({'one': 1, 'two': {'three': self.func, 'four': lambda _: 4}}, lazy=True)
+        assert isinstance(obj, LazyFlock)
+        assert obj.one == 1
+        assert obj.two.three() == 1
+        assert obj.two.four() == 4
+        with pytest.raises(AttributeError):
+            obj.five
+
+    def test_lazy_materialization(self):
+        obj = flock({'one': {'two': {'three': 3}}, 'four': {'five': 5}}, lazy=True)
+        assert vars(obj) == {}
+        assert obj.one.two.three == 3
+        assert set(vars(obj)) == {'one'}
+        assert obj.one is obj.one
+        assert set(vars(obj.one)) == {'two'}
+
+    def test_lazy_context(self):
+        obj = flock({'one': {'two': lambda: 3, 'three': 4}}, lazy=True)
+        assert get_context(obj) == obj
+        assert get_context(obj.one) == obj
+
+    def test_lazy_unflock(self):
+        definition = {'one': {'two': {'three': self.func}}, 'four': 4}
+        assert unflock(flock(definition, lazy=True)) == definition
+
+
+def module_function(self):
+    return self
+
+
+class TestPickle:
+    def setup(self):
+        self.definition = {'one': {'two': {'three': 3}, 'four': [4]}, 'five': module_function}
+
+    @pytest.mark.parametrize('compact', [False, True])
+    def test_round_trip(self, compact):
+        obj = flock(self.definition, compact=compact)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            copied = pickle.loads(pickle.dumps(obj, protocol))
+            assert type(copied) is type(obj)
+            assert unflock(copied.one) == self.definition['one']
+            assert get_context(copied.one.two) is copied
+            assert copied.five() is copied
+
+    def test_shape_lookup(self):
+        obj = flock(self.definition)
+        data = pickle.dumps(obj)
+        flock.cache_clear()
+        copied = pickle.loads(data)
+        assert type(copied) is type(flock(self.definition))
+        assert copied.one.two.three == 3
+
+    def test_nested(self):
+        obj = flock(self.definition)
+        copied = pickle.loads(pickle.dumps(obj.one))
+        assert copied.two.three == 3
+        assert get_context(copied.two) is get_context(copied)
+
+    def test_copy(self):
+        obj = flock(self.definition)
+        shallow, deep = copy.copy(obj), copy.deepcopy(obj)
+        shallow.five = deep.five = None
+        assert obj.five() is obj
+        assert get_context(shallow.one) is shallow
+        assert deep.one.four == [4] and deep.one.four is not obj.one.four
+
+    def test_lazy(self):
+        obj = flock(self.definition, lazy=True)
+        assert obj.one.two.three == 3
+        copied = pickle.loads(pickle.dumps(obj))
+        assert isinstance(copied, LazyFlock)
+        assert vars(copied) == {}
+        assert unflock(copied.one) == self.definition['one']
+
+
+class TestMapping:
+    def setup(self):
+        self.definition = {'id': 1, 'user': {'name': 'Bird', 'tags': ['a']}, 'method': lambda self: self}
+
+    def test_protocol(self):
+        for compact in (False, True):
+            obj = flock(self.definition, compact=compact)
+            assert isinstance(obj, Mapping) and isinstance(obj.user, Mapping)
+            assert obj['id'] == 1 and obj['user'] is obj.user
+            assert obj['method']() is obj
+            assert get_context(obj['user']) is obj
+            assert list(obj) == ['id', 'user', 'method'] and len(obj) == 3
+            assert 'user' in obj and 'missing' not in obj and '__dict__' not in obj
+            with pytest.raises(KeyError):
+                obj['missing']
+            with pytest.raises(KeyError):
+                obj['__class__']
+            assert obj.get('missing', 0) == 0 and obj.get('id') == 1
+            assert list(obj.user.keys()) == ['name', 'tags']
+            assert list(obj.user.values()) == ['Bird', ['a']]
+            assert dict(obj.user.items()) == dict(obj.user) == {'name': 'Bird', 'tags': ['a']}
+
+    def test_interop(self):
+        obj = flock(self.definition)
+        assert '{id} {user[name]}'.format(**obj) == '1 Bird'
+        assert (lambda **kwargs: sorted(kwargs))(**obj.user) == ['name', 'tags']
+
+    def test_fields_first(self):
+        obj = flock({'items': [1], 'keys': 'k', 'get': None})
+        assert obj.items == [1] and obj.keys == 'k' and obj.get is None
+        assert obj['items'] == [1]
+        assert list(Mapping.keys(obj)) == ['items', 'keys', 'get']
+
+    def test_truth(self):
+        assert flock({}) and flock({}, compact=True) and not len(flock({}))
+
+    def test_other_contexts(self):
+        lazy = flock(self.definition, lazy=True)
+        assert 'user' in lazy and lazy['user']['name'] == 'Bird' and len(lazy) == 3
+        assert sorted(lazy) == ['id', 'method', 'user']
+        with pytest.raises(KeyError):
+            lazy['missing']
+
+    def test_dynamic_contexts(self):
+        from cuckoos.frozen import freeze
+        from cuckoos.overlay import overlay
+        definition = {'id': 1, 'user': {'name': 'Bird', 'keys': 'k'}}
+        for obj in (flock(definition, lazy=True), freeze(definition), overlay(flock(definition), {'id': 1})):
+            assert isinstance(obj, Mapping) and isinstance(obj.user, Mapping)
+            assert dict(obj) == {'id': 1, 'user': obj.user}
+            assert (lambda **kwargs: sorted(kwargs))(**obj) == ['id', 'user']
+            assert list(obj.keys()) == ['id', 'user'] and list(obj.values()) == [1, obj.user]
+            assert dict(obj.items()) == {'id': 1, 'user': obj.user}
+            assert obj.get('id') == 1 and obj.get('missing', 0) == 0 and obj.get(1) is None
+            # Fields take precedence over mapping methods.
+            assert obj.user.keys == 'k' and list(Mapping.keys(obj.user)) == ['name', 'keys']
+            with pytest.raises(KeyError):
+                obj[1]
+        with pytest.raises(KeyError):
+            flock({1: 'one'}, lazy=True)[1]
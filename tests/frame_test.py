@@ -0,0 +1,96 @@
+from __future__ import unicode_literals
+
+import pickle
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+from cuckoos.flock import flock, unflock, get_context
+from cuckoos.frame import FlockFrame, RowView
+
+
+def records(count=4):
+    return [{'id': index, 'ratio': index / 2.0, 'active': index % 2 == 0,
+             'user': {'name': 'User %d' % index, 'tags': [index], 'address': {'zip': '%05d' % index}},
+             'big': 1 << 70, 'empty': {}}
+            for index in range(count)]
+
+
+class TestFlockFrame:
+    def setup(self):
+        self.records = records()
+        self.frame = FlockFrame(self.records)
+
+    def test_columns(self):
+        frame = self.frame
+        assert len(frame) == 4
+        assert frame.id.dtype == numpy.int64
+        assert frame.ratio.dtype == numpy.float64
+        assert frame.active.dtype == numpy.bool_
+        assert frame.big.dtype == object and frame.user.name.dtype == object
+        assert frame.user.tags[1] == [1]
+        assert list(frame.user.address.zip) == ['00000', '00001', '00002', '00003']
+        assert frame.id.sum() == 6
+        assert list(frame.ratio[frame.active]) == [0.0, 1.0]
+
+    def test_mixed_types(self):
+        frame = FlockFrame([{'value': 1}, {'value': 1.5}, {'value': None}])
+        assert frame.value.dtype == object
+        assert frame.records() == [{'value': 1}, {'value': 1.5}, {'value': None}]
+
+    def test_rows(self):
+        row = self.frame[1]
+        assert isinstance(row, RowView)
+        assert row.id == 1 and type(row.id) is int
+        assert row.active is False
+        assert row.user.address.zip == '00001'
+        assert get_context(row.user.address) is row
+        assert self.frame[-1].id == 3
+        with pytest.raises(IndexError):
+            self.frame[4]
+        with pytest.raises(AttributeError):
+            row.missing
+
+    def test_row_mapping(self):
+        row = self.frame[1]
+        assert dict(row.user.address) == {'zip': '00001'}
+        assert (lambda **kwargs: kwargs['id'])(**row) == 1
+        assert row.get('id') == 1 and row.get('missing') is None
+        with pytest.raises(KeyError):
+            row[1]
+
+    def test_reserved_names(self):
+        frame = FlockFrame([{'length': 5, 'records': {'columns': 'a'}, 'tree': 1, 'namespace': 2}] * 3)
+        assert len(frame) == 3
+        assert list(frame.length) == [5, 5, 5] and list(frame.tree) == [1, 1, 1]
+        assert list(frame.namespace) == [2, 2, 2]
+        assert list(frame.column('records.columns')) == ['a'] * 3
+        assert list(frame.column(('records', 'columns'))) == ['a'] * 3
+        assert frame.records()[0]['records'] == {'columns': 'a'}
+        assert frame[1:].records() == frame.records()[1:]
+        for path in ('records.missing', 'length.a'):
+            with pytest.raises(KeyError):
+                frame.column(path)
+
+    def test_round_trip(self):
+        assert [unflock(row) for row in self.frame] == self.records
+        assert self.frame.records() == self.records
+        assert FlockFrame([flock(record) for record in self.records]).records() == self.records
+        assert unflock(pickle.loads(pickle.dumps(self.frame[2]))) == self.records[2]
+
+    def test_slice(self):
+        sliced = self.frame[1:3]
+        assert len(sliced) == 2
+        assert sliced.records() == self.records[1:3]
+        assert numpy.shares_memory(sliced.id, self.frame.id)
+
+    def test_shape_mismatch(self):
+        with pytest.raises(ValueError):
+            FlockFrame([{'one': 1}, {'one': 1, 'two': 2}])
+        with pytest.raises(ValueError):
+            FlockFrame([{'one': 1, 'two': 2}, {'one': 1}])
+        with pytest.raises(ValueError):
+            FlockFrame([{'one': {'two': 2}}, {'one': 1}])
+        with pytest.raises(ValueError):
+            FlockFrame([])
@@ -0,0 +1,88 @@
+from __future__ import unicode_literals
+
+import pickle
+
+import pytest
+
+from cuckoos.flock import flock, unflock, get_context
+from cuckoos.frozen import freeze, FrozenFlock
+
+
+def definition():
+    return {'name': 'config', 'db': {'hosts': ['a', 'b'], 'options': {'ssl': True}},
+            'tags': {'x', 'y'}, 'layers': [{'one': {'two': 2}}]}
+
+
+class TestFrozen:
+    def setup(self):
+        self.obj = freeze(definition())
+
+    def test_values(self):
+        obj = self.obj
+        assert isinstance(obj, FrozenFlock) and isinstance(obj.db.options, FrozenFlock)
+        assert obj.db.hosts == ('a', 'b')
+        assert obj.tags == frozenset(['x', 'y'])
+        assert obj.layers[0].one.two == 2
+        assert get_context(obj.db.options) is obj
+        assert get_context(obj.layers[0].one) is obj.layers[0]
+        assert unflock(obj)['db'] == {'hosts': ('a', 'b'), 'options': {'ssl': True}}
+
+    def test_read_only(self):
+        with pytest.raises(AttributeError):
+            self.obj.name = 'other'
+        with pytest.raises(AttributeError):
+            self.obj.db.extra = 1
+        with pytest.raises(AttributeError):
+            del self.obj.name
+
+    def test_equality(self):
+        other = freeze(flock(definition()))
+        assert other == self.obj and not other != self.obj
+        assert hash(other) == hash(self.obj)
+        assert other.db == self.obj.db
+        changed = definition()
+        changed['db']['options']['ssl'] = False
+        assert freeze(changed) != self.obj
+        assert self.obj != unflock(self.obj)
+        assert freeze(self.obj) is self.obj
+
+    def test_keys(self):
+        cache = {self.obj: 1}
+        assert cache[freeze(definition())] == 1
+        calls = []
+
+        def compute(config):
+            calls.append(config)
+            return config.name
+        try:
+            from functools import lru_cache
+        except ImportError:
+            return
+        cached = lru_cache()(compute)
+        assert cached(self.obj) == cached(freeze(definition())) == 'config'
+        assert len(calls) == 1
+
+    def test_hash_cached(self):
+        assert self.obj.__digest__ is None
+        hash(self.obj)
+        assert self.obj.__digest__ is not None
+        assert self.obj.db.options.__digest__ is not None
+
+    def test_deep(self):
+        definition = level = {}
+        for _ in range(5000):
+            level['next'] = level = {}
+        obj = freeze(definition)
+        assert obj == freeze(definition) and hash(obj)
+
+    def test_namespace(self):
+        namespace = freeze({'one': {'two': 2}})
+        Class = type(str('Class'), (object,), {'namespace': namespace})
+        obj = Class()
+        assert obj.namespace == namespace and obj.namespace is not namespace
+        assert get_context(obj.namespace.one) is obj
+
+    def test_pickle(self):
+        obj = pickle.loads(pickle.dumps(self.obj))
+        assert obj == self.obj and hash(obj) == hash(self.obj)
+        assert get_context(obj.db.options) is obj
@@ -0,0 +1,94 @@
+from __future__ import unicode_literals
+
+import timeit
+
+from cuckoos import Nest, instrument
+from cuckoos import flock as flocking
+from cuckoos.flock import flock, unflock, get_context, Context
+from cuckoos.nest import FledgedMethod
+
+
+class Birds(Nest):
+    def method(self):
+        return self
+
+    def nested__method(self):
+        return self
+
+    def nested__deeper__method(self, value):
+        return value
+
+
+class TestInstrument:
+    def teardown(self):
+        instrument.disable()
+
+    def test_counters(self):
+        flock.cache_clear()
+        instrument.enable()
+        obj = flock({'one': {'two': {'three': 3}}, 'other': {'three': 3}})
+        assert obj.one.two.three == 3
+        assert obj.other.three == 3
+        unflock(obj)
+        get_context(obj.one)
+        stats = instrument.snapshot()
+        assert (stats['flock'], stats['unflock'], stats['get_context']) == (1, 1, 1)
+        assert stats['types'] == 3
+        # unflock resolves nested contexts as well.
+        assert stats['accesses'] == {1: 5, 2: 2}
+
+    def test_calls(self):
+        instrument.enable()
+        birds = Birds()
+        for value in range(3):
+            assert birds.nested.deeper.method(value) == value
+        assert birds.nested.method() is birds
+        calls = instrument.snapshot()['calls']
+        assert set(calls) == {'Birds.nested.deeper.method', 'Birds.nested.method'}
+        stats = calls['Birds.nested.deeper.method']
+        assert stats['count'] == sum(stats['histogram']) == 3
+        assert stats['total'] > 0
+        assert len(stats['histogram']) == len(instrument.buckets)
+
+    def test_reset(self):
+        instrument.enable()
+        flock({})
+        instrument.reset()
+        assert instrument.snapshot()['flock'] == 0
+
+    def test_disabled(self):
+        originals = (Context.__dict__['__get__'], FledgedMethod.__dict__['__get__'],
+                     flocking.registry.factory)
+        instrument.enable()
+        assert instrument.enabled()
+        Birds().nested.method()
+        instrument.disable()
+        assert not instrument.enabled()
+        assert instrument.snapshot() is None
+        # Hot paths run the original implementations.
+        assert (Context.__dict__['__get__'], FledgedMethod.__dict__['__get__'],
+                flocking.registry.factory) == originals
+        assert flocking.monitor is None
+        assert flock({'one': {'two': 2}}).one.two == 2
+        birds = Birds()
+        assert birds.nested.method() is birds
+
+    def test_bound_before_enabled(self):
+        birds = Birds()
+        assert birds.nested.method() is birds
+        instrument.enable()
+        assert birds.nested.method() is birds
+        assert instrument.snapshot()['calls']['Birds.nested.method']['count'] == 1
+
+    def test_call_cost_after_disabled(self):
+        instrument.enable()
+        bound = Birds()
+        bound.nested.method()
+        instrument.disable()
+        fresh = Birds()
+        fresh.nested.method()
+        # Methods bound while enabled are no longer wrapped.
+        assert bound.nested.method.__func__ is fresh.nested.method.__func__
+        cost = min(timeit.repeat(bound.nested.method, number=10000, repeat=5))
+        baseline = min(timeit.repeat(fresh.nested.method, number=10000, repeat=5))
+        assert cost < 2 * baseline
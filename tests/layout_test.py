@@ -0,0 +1,130 @@
+from __future__ import unicode_literals
+
+import json
+import os
+import sys
+import time
+
+from cuckoos import layout
+from cuckoos.flock import unflock
+from cuckoos.nest import NestedObjectType
+
+width = 2000
+
+
+def namespace():
+    def method(self):
+        return self
+
+    attributes = {'__module__': 'layout_test_module', '__qualname__': 'Generated'}
+    for index in range(width):
+        attributes['group%d__sub%d__method%d' % (index % 10, index % 7, index)] = method
+        attributes['group%d__method' % (index % 10)] = method
+    return attributes
+
+
+def compile_class(attributes=None):
+    attributes = dict(namespace() if attributes is None else attributes)
+    # Functions are renamed when compiled, use fresh ones for every class.
+    for key, value in list(attributes.items()):
+        if callable(value):
+            attributes[key] = (lambda self: self)
+    return NestedObjectType(str('Generated'), (object,), attributes)
+
+
+def structure(cls):
+    def shape(value):
+        if isinstance(value, dict):
+            return dict((key, shape(item)) for key, item in value.items())
+        return value.__name__
+    return dict((key, shape(unflock(getattr(cls, key))))
+                for key in vars(cls) if key.startswith('group'))
+
+
+class TestLayoutCache:
+    def teardown(self):
+        layout.disable()
+
+    def test_cold_and_warm(self, tmpdir):
+        cache = layout.enable(str(tmpdir))
+        cold = compile_class()
+        assert (cache.hits, cache.misses) == (0, 1)
+        assert len(os.listdir(str(tmpdir))) == 1
+        warm = compile_class()
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        obj = warm()
+        assert obj.group3.sub3.method3() is obj
+        assert obj.group3.method() is obj
+        assert structure(cold) == structure(warm)
+
+    def test_invalidation(self, tmpdir):
+        cache = layout.enable(str(tmpdir))
+        compile_class()
+        attributes = namespace()
+        attributes['group0__other'] = attributes.pop('group0__method')
+        changed = compile_class(attributes)
+        assert (cache.hits, cache.misses) == (0, 2)
+        assert len(os.listdir(str(tmpdir))) == 1
+        assert changed().group0.other() is not None
+        assert not hasattr(changed.group0, 'method')
+
+    def test_corrupted_layout(self, tmpdir):
+        cache = layout.enable(str(tmpdir))
+        compile_class()
+        for entry in os.listdir(str(tmpdir)):
+            with open(os.path.join(str(tmpdir), entry), 'w') as fd:
+                fd.write('{"group0__method": ["group0"]}')
+        obj = compile_class()()
+        assert (cache.hits, cache.misses) == (0, 2)
+        assert obj.group0.method() is obj
+
+    def test_inconsistent_layout(self, tmpdir):
+        cache = layout.enable(str(tmpdir))
+        compile_class()
+        entry = os.path.join(str(tmpdir), os.listdir(str(tmpdir))[0])
+        with open(entry) as fd:
+            stored = json.load(fd)
+        for name, path in (('group0__method', ['group0']), ('group0__method', ['__call__']),
+                           ('group0__method', ['group1', 'method'])):
+            with open(entry, 'w') as fd:
+                fd.write(json.dumps(dict(stored, paths=dict(stored['paths'], **{name: path}))))
+            obj = compile_class()()
+            assert obj.group0.method() is obj
+        assert (cache.hits, cache.misses) == (0, 4)
+
+    def test_unwritable_directory(self, tmpdir):
+        target = tmpdir.join('file')
+        target.write('')
+        cache = layout.enable(os.path.join(str(target), 'layouts'))
+        obj = compile_class()()
+        assert cache.misses == 1
+        assert obj.group1.method() is obj
+
+    def test_disabled(self, tmpdir):
+        layout.disable()
+        compile_class()
+        assert not tmpdir.listdir()
+
+    def test_import_timings(self, tmpdir, record_property):
+        source = ['from cuckoos import Nest', '', '', 'class Generated(Nest):']
+        for index in range(width):
+            source.append('    def group%d__sub%d__method%d(self):' % (index % 10, index % 7, index))
+            source.append('        return %d' % index)
+        tmpdir.join('layout_generated.py').write('\n'.join(source) + '\n')
+        cache = layout.enable(str(tmpdir.join('cache')))
+        sys.path.insert(0, str(tmpdir))
+        timings = []
+        try:
+            for _ in range(3):
+                sys.modules.pop('layout_generated', None)
+                start = time.time()
+                module = __import__('layout_generated')
+                timings.append(time.time() - start)
+                assert module.Generated().group5.sub5.method5() == 5
+        finally:
+            sys.path.remove(str(tmpdir))
+            sys.modules.pop('layout_generated', None)
+        assert (cache.hits, cache.misses) == (2, 1)
+        record_property('cold_import_ms', timings[0] * 1e3)
+        record_property('warm_import_ms', min(timings[1:]) * 1e3)
@@ -0,0 +1,138 @@
+from __future__ import unicode_literals
+
+import multiprocessing
+import pickle
+import tracemalloc
+
+import pytest
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from cuckoos.flock import flock, unflock, get_context
+from cuckoos.mapped import dump, load, MappedFlock
+from cuckoos.serialize import dumps
+
+definition = {
+    'id': 1,
+    'big': 1 << 80,
+    'ratio': -0.5,
+    'flags': {'active': True, 'deleted': False, 'parent': None},
+    'user': {'name': 'Üser', 'auth': {'token': 'abc', 'raw': b'\x00\x01'}},
+    'tags': ['a', {'b': [1, (2, 3)]}],
+    'pair': (1, 'two'),
+    'empty': {},
+}
+
+
+def read_token(path, queue):
+    queue.put(load(path).user.auth.token)
+
+
+class TestMapped:
+    def mapped(self, tmpdir, obj=definition):
+        path = str(tmpdir.join('mapped.bin'))
+        dump(obj, path)
+        return load(path)
+
+    def test_round_trip(self, tmpdir):
+        obj = self.mapped(tmpdir)
+        assert isinstance(obj, MappedFlock)
+        assert unflock(obj) == definition
+        assert obj.user.auth.token == 'abc'
+        assert obj.user.name == 'Üser'
+        assert obj.tags[1] == {'b': [1, (2, 3)]}
+        assert obj.big == 1 << 80
+
+    def test_flocked_source(self, tmpdir):
+        obj = self.mapped(tmpdir, flock(definition))
+        assert unflock(obj) == definition
+
+    def test_context(self, tmpdir):
+        obj = self.mapped(tmpdir)
+        assert get_context(obj) is obj
+        assert get_context(obj.user.auth) is obj
+
+    def test_fields(self, tmpdir):
+        obj = self.mapped(tmpdir)
+        assert set(obj.__fields__) == set(definition)
+        assert 'user' in dir(obj)
+        assert obj.empty.__fields__ == ()
+        with pytest.raises(AttributeError):
+            obj.missing
+        assert getattr(obj.user, 'missing', 0) == 0
+
+    def test_mapping(self, tmpdir):
+        obj = self.mapped(tmpdir)
+        assert isinstance(obj, Mapping) and dict(obj.flags) == definition['flags']
+        assert obj.get('id') == 1 and list(obj.flags.keys()) == list(definition['flags'])
+        with pytest.raises(KeyError):
+            obj[1]
+
+    def test_read_only(self, tmpdir):
+        obj = self.mapped(tmpdir)
+        with pytest.raises(AttributeError):
+            obj.id = 2
+        with pytest.raises(AttributeError):
+            del obj.id
+        with pytest.raises(TypeError):
+            pickle.dumps(obj)
+
+    def test_serialize(self, tmpdir):
+        obj = self.mapped(tmpdir, {'one': {'two': [2]}})
+        assert dumps(obj) == '{"one": {"two": [2]}}'
+
+    def test_deep(self, tmpdir):
+        deep = leaf = {}
+        for _ in range(3000):
+            leaf['next'] = leaf = {}
+        leaf['value'] = 1
+        obj = self.mapped(tmpdir, deep)
+        for _ in range(3000):
+            obj = obj.next
+        assert obj.value == 1
+
+    def test_invalid(self, tmpdir):
+        with pytest.raises(TypeError):
+            self.mapped(tmpdir, {'one': object()})
+        path = tmpdir.join('invalid.bin')
+        path.write(b'not a mapped flock', mode='wb')
+        with pytest.raises(ValueError):
+            load(str(path))
+        with open(str(path), 'wb') as fd:
+            fd.write(b'prefix')
+            with pytest.raises(ValueError):
+                dump({'one': 1}, fd)
+
+    def test_file_object(self, tmpdir):
+        path = str(tmpdir.join('file.bin'))
+        with open(path, 'wb') as fd:
+            dump(definition, fd)
+            fd.write(b'trailer')
+        assert unflock(load(path)) == definition
+
+    def test_no_copy(self, tmpdir):
+        big = dict(('key%d' % index, {'value': 'x' * 100, 'index': index}) for index in range(20000))
+        path = str(tmpdir.join('big.bin'))
+        dump(big, path)
+        tracemalloc.start()
+        try:
+            obj = load(path)
+            assert obj.key19999.index == 19999
+            size = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert size < 64 * 1024
+
+    def test_processes(self, tmpdir):
+        path = str(tmpdir.join('shared.bin'))
+        dump(definition, path)
+        queue = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=read_token, args=(path, queue)) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        assert [queue.get(timeout=10) for _ in workers] == ['abc', 'abc']
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,80 @@
+from __future__ import unicode_literals
+
+import gc
+import sys
+
+import pytest
+
+from cuckoos.flock import flock, registry
+from cuckoos.memory import footprint, live_types, allocated, Footprint, deep_size
+
+# Budgets, in bytes per flocked record of the shape below, values excluded.
+record_budget = 2048
+compact_record_budget = 768
+
+
+def record(index):
+    return {
+        'id': index,
+        'user': {'name': 'User %d' % index, 'address': {'city': 'City', 'zip': '%05d' % index}},
+        'tags': ['a', 'b'],
+        'active': index % 2 == 0,
+    }
+
+
+class TestFootprint:
+    def test_footprint(self):
+        definition = record(1)
+        size = footprint(flock(definition))
+        assert isinstance(size, Footprint)
+        assert size.objects == 3 and size.type_count == 3
+        leaves = [1, 'User 1', 'City', '00001', definition['tags'], False]
+        assert size.values == deep_size(leaves, {}) - sys.getsizeof(leaves)
+        assert size.instances > 0 and size.types > size.instances
+
+    def test_shared(self):
+        shared = ['x'] * 100
+        size = footprint(flock({'one': shared, 'two': shared, 'three': {'four': shared}}))
+        assert size.values < 2 * deep_size(shared, {})
+
+    def test_modes(self):
+        definition = record(1)
+        default, compact = footprint(flock(definition)), footprint(flock(definition, compact=True))
+        assert compact.instances < default.instances
+        assert compact.values == default.values
+        lazy = flock(definition, lazy=True)
+        assert footprint(lazy).objects == 1 and not vars(lazy)
+        lazy.user.address
+        assert footprint(lazy).objects == 3
+
+
+class TestBudget:
+    def setup(self):
+        pytest.importorskip('tracemalloc')
+        self.definitions = [record(index) for index in range(1000)]
+        # Types are created (and cached) before measuring.
+        flock(self.definitions[0])
+        flock(self.definitions[0], compact=True)
+
+    def test_bytes_per_record(self):
+        objects, size = allocated(lambda: [flock(definition) for definition in self.definitions])
+        assert size / len(objects) < record_budget
+
+    def test_bytes_per_compact_record(self):
+        objects, size = allocated(lambda: [flock(definition, compact=True) for definition in self.definitions])
+        assert size / len(objects) < compact_record_budget
+
+    def test_no_type_per_record(self):
+        gc.collect()
+        before = live_types()
+        objects = [flock(definition) for definition in self.definitions]
+        assert live_types() - before <= 3
+        del objects
+
+    def test_evicted_types_collected(self):
+        gc.collect()
+        before = live_types()
+        for index in range(registry.maxsize * 2):
+            flock({'field%d' % index: index})
+        gc.collect()
+        assert live_types() - before <= registry.maxsize
@@ -1,9 +1,14 @@
 from __future__ import unicode_literals
 
+import pickle
+import threading
+
 import pytest
 import six
 
 from cuckoos import Nest
+from cuckoos.flock import flock
+from cuckoos.nest import fledge, NestedObjectType
 
 
 class Birds(Nest):
@@ -98,3 +103,103 @@ class TestNestedObjectType:
 
     def test_dictionary_attribute(self):
         assert self.object.attribute == {'zero': 0}
+
+
+class Context(Nest):
+    def nested__context(self):
+        return self
+
+    def nested__deeper__context(self):
+        return self
+
+
+class TestContextBinding:
+    def test_interleaved_access(self):
+        one, two = Context(), Context()
+        nested, deeper = one.nested, one.nested.deeper
+        assert two.nested.context() is two
+        assert two.nested.deeper.context() is two
+        assert nested.context() is one
+        assert deeper.context() is one
+
+    def test_class_namespace_untouched(self):
+        obj = Context()
+        assert obj.nested is not Context.nested
+        assert not hasattr(Context.nested, '__context__') or Context.nested.__context__ is None
+        assert obj.nested.deeper is obj.nested.deeper
+
+    def test_threaded_access(self):
+        errors = []
+        start = threading.Event()
+
+        def run():
+            obj = Context()
+            start.wait()
+            for _ in range(2000):
+                if obj.nested.context() is not obj or obj.nested.deeper.context() is not obj:
+                    errors.append(obj)
+
+        threads = [threading.Thread(target=run) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+
+    def test_pickle(self):
+        obj = Context()
+        obj.settings = flock({'one': 1})
+        assert obj.nested.deeper.context() is obj
+        copied = pickle.loads(pickle.dumps(obj))
+        assert set(vars(copied)) == {'settings'}
+        assert copied.nested.deeper.context() is copied
+        assert copied.settings.one == 1
+
+
+class TestFledge:
+    def test_fledge_metadata(self):
+        def method(self):
+            """Documented."""
+            return self
+
+        fledged = fledge(method)
+        method.flag = True
+        assert fledged.__doc__ == 'Documented.'
+        assert fledged.__wrapped__ is method
+        assert fledged.flag
+
+    def test_fledge_call(self):
+        obj = flock({'nested': {'method': fledge(lambda self, value: (self, value))}})
+        assert obj.nested.method(1) == (obj, 1)
+        assert fledge(lambda self: self)(obj.nested) is obj
+
+    def test_fledge_bound_once(self):
+        obj = Context()
+        assert obj.nested.context.__self__ is obj
+        assert 'context' in vars(obj.nested)
+
+
+class TestCompiler:
+    def test_graft_order(self):
+        def method(self):
+            return 'method'
+
+        def call(self):
+            return 'call'
+
+        for namespace in ({'nested': call, 'nested__method': method},
+                          {'nested__method': method, 'nested': call}):
+            obj = NestedObjectType(str('Class'), (object,), dict(namespace))()
+            assert obj.nested() == 'call'
+            assert obj.nested.method() == 'method'
+
+    def test_attribute_namespace_conflict(self):
+        with pytest.raises(TypeError):
+            NestedObjectType(str('Class'), (object,), {'nested': 0, 'nested__method': lambda self: 1})
+
+    def test_many_methods(self):
+        namespace = dict(('api__group%d__method%d' % (index % 10, index), lambda self: self)
+                         for index in range(1000))
+        obj = NestedObjectType(str('Api'), (object,), namespace)()
+        assert obj.api.group3.method993() is obj
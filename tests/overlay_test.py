@@ -0,0 +1,84 @@
+from __future__ import unicode_literals
+
+import pickle
+
+import pytest
+
+from cuckoos.delta import missing
+from cuckoos.flock import flock, unflock, get_context
+from cuckoos.overlay import overlay, Overlay
+
+
+def definition():
+    return {'name': 'config', 'db': {'host': 'localhost', 'port': 5432, 'options': {'ssl': True}},
+            'cache': {'size': 10}}
+
+
+class TestOverlay:
+    def setup(self):
+        self.base = flock(definition())
+        self.obj = overlay(self.base, {'db': {'port': 5433, 'options': {'ssl': False}},
+                                       'extra': {'one': 1}, 'name': missing})
+
+    def test_values(self):
+        obj = self.obj
+        assert obj.db.host == 'localhost' and obj.db.port == 5433 and obj.db.options.ssl is False
+        assert obj.cache.size == 10 and obj.extra.one == 1
+        assert not hasattr(obj, 'name') and 'name' not in obj
+        assert 'cache' in obj and 'extra' in obj and 'other' not in obj
+        assert isinstance(obj.db, Overlay)
+
+    def test_base_unchanged(self):
+        self.obj.cache.size
+        assert unflock(self.base) == definition()
+        assert get_context(self.base.cache) is self.base
+
+    def test_unflock(self):
+        expected = definition()
+        del expected['name']
+        expected['db'].update(port=5433, options={'ssl': False})
+        expected['extra'] = {'one': 1}
+        assert unflock(self.obj) == expected
+        assert list(self.obj) == ['db', 'cache', 'extra']
+
+    def test_context(self):
+        obj = self.obj
+        for level in (obj.db, obj.db.options, obj.cache, obj.extra):
+            assert get_context(level) is obj
+        # Untouched levels are bound once and share their values with the base.
+        assert obj.cache is obj.cache and obj.cache is not self.base.cache
+        assert isinstance(obj.cache, Overlay) and obj.cache.__base__ is self.base.cache
+
+    def test_methods(self):
+        base = flock({'db': {'port': 1, 'url': lambda self: 'db:%d' % self.port}})
+        obj = overlay(base, {'db': {'port': 2}, 'root': lambda self: get_context(self)})
+        assert obj.db.url() == 'db:2' and base.db.url() == 'db:1'
+        assert obj.root() is obj
+
+    def test_replace(self):
+        obj = overlay(self.base, {'db': 'sqlite://', 'name': {'first': 'a'}})
+        assert obj.db == 'sqlite://' and obj.name.first == 'a'
+        assert get_context(obj.name) is obj
+
+    def test_stack(self):
+        obj = overlay(self.obj, {'db': {'host': 'remote'}, 'name': 'other'})
+        assert obj.db.host == 'remote' and obj.db.port == 5433 and obj.name == 'other'
+        assert get_context(obj.db.options) is obj
+        assert self.obj.db.host == 'localhost'
+
+    def test_compact(self):
+        base = flock(definition(), compact=True)
+        obj = overlay(base, {'db': {'port': 5433}, 'extra': {'one': 1}})
+        assert obj.db.port == 5433 and obj.db.options.ssl is True
+        assert unflock(obj.extra) == {'one': 1}
+
+    def test_read_only(self):
+        with pytest.raises(AttributeError):
+            self.obj.name = 'other'
+        with pytest.raises(AttributeError):
+            del self.obj.db
+
+    def test_pickle(self):
+        obj = pickle.loads(pickle.dumps(self.obj))
+        assert unflock(obj) == unflock(self.obj)
+        assert get_context(obj.db.options) is obj
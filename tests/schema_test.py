@@ -0,0 +1,118 @@
+from __future__ import unicode_literals
+
+import pickle
+
+import pytest
+
+from cuckoos.flock import flock, unflock, get_context
+from cuckoos.schema import Schema, ValidationError, optional
+
+
+def record(index):
+    return {'id': index, 'active': True, 'score': 1.5,
+            'user': {'name': 'User %d' % index, 'tags': ['a'], 'address': {'zip': '%05d' % index}}}
+
+
+class TestSchema:
+    def setup(self):
+        self.schema = Schema({'id': int, 'active': bool, 'score': float, 'user__name': str,
+                              'user__tags': [str], 'user': {'address': {'zip': str}}})
+
+    def test_build(self):
+        obj = self.schema(record(1))
+        assert unflock(obj) == record(1)
+        assert type(obj) is type(flock(record(1)))
+        assert type(obj.user.address) is type(flock(record(1)).user.address)
+        assert get_context(obj.user.address) is obj
+
+    def test_compact(self):
+        schema = Schema(self.schema.definition, compact=True)
+        obj = schema(record(1))
+        assert not hasattr(obj, '__dict__')
+        assert unflock(obj) == record(1)
+        assert get_context(obj.user.address) is obj
+
+    def test_coercion(self):
+        data = record(1)
+        data.update(id='2', active='no', score=3)
+        data['user']['name'] = b'Bird'
+        obj = self.schema(data)
+        assert (obj.id, obj.active, obj.score, obj.user.name) == (2, False, 3.0, 'Bird')
+        assert type(obj.score) is float
+        assert Schema({'id': int})({'id': 2.0}).id == 2
+        assert Schema({'flag': bool})({'flag': 1}).flag is True
+
+    def test_errors(self):
+        data = record(1)
+        data.update(id=True, active='maybe', extra=1)
+        data['user'].update(tags=['a', 2])
+        del data['user']['address']['zip']
+        with pytest.raises(ValidationError) as info:
+            self.schema(data)
+        errors = dict(info.value.errors)
+        assert set(errors) == {('id',), ('active',), ('extra',), ('user', 'tags', 1),
+                               ('user', 'address', 'zip')}
+        assert errors[('user', 'address', 'zip')] == 'missing'
+        assert errors[('extra',)] == 'unexpected'
+        assert errors[('user', 'tags', 1)].startswith('expected str')
+        with pytest.raises(ValidationError) as info:
+            self.schema({'id': 1.5, 'active': True, 'score': 'x', 'user': 'none'})
+        assert [path for path, _ in info.value.errors] == [('id',), ('score',), ('user',)]
+
+    def test_optional_and_extra(self):
+        schema = Schema({'id': int, 'name': optional(str, 'anonymous'), 'meta': optional({'tag': str})},
+                        extra='ignore')
+        obj = schema({'id': 1, 'other': 2})
+        assert obj.name == 'anonymous' and obj.meta is None
+        assert not hasattr(obj, 'other')
+        assert schema({'id': 1, 'meta': {'tag': 't'}}).meta.tag == 't'
+
+    def test_callables(self):
+        schema = Schema({'id': lambda value: int(value) * 2, 'handler': optional(lambda value: value,
+                                                                                 lambda self: self)})
+        obj = schema({'id': '2'})
+        assert obj.id == 4
+        assert obj.handler() is obj
+        with pytest.raises(ValidationError):
+            schema({'id': 'x'})
+
+    def test_list_of_levels(self):
+        schema = Schema({'items': [{'id': int, 'tags': [str]}]})
+        obj = schema({'items': [{'id': '1', 'tags': []}, {'id': 2, 'tags': ['a']}]})
+        assert obj.items == [{'id': 1, 'tags': []}, {'id': 2, 'tags': ['a']}]
+        with pytest.raises(ValidationError) as info:
+            schema({'items': [{'id': 1, 'tags': [1]}, {'tags': 'a'}, 2], 'other': [[1]]})
+        assert info.value.errors == [
+            (('other',), 'unexpected'), (('items', 0, 'tags', 0), 'expected str, got 1'),
+            (('items', 1, 'id'), 'missing'), (('items', 1, 'tags'), "expected a list, got 'a'"),
+            (('items', 2), 'expected a dictionary, got 2')]
+        nested = Schema({'matrix': [[int]]})
+        assert nested({'matrix': [['1'], []]}).matrix == [[1], []]
+        with pytest.raises(ValidationError) as info:
+            nested({'matrix': [[1, 'x'], 'y']})
+        assert [path for path, _ in info.value.errors] == [('matrix', 0, 1), ('matrix', 1)]
+
+    def test_many(self):
+        records = [record(index) for index in range(5)]
+        objects = self.schema.many(records)
+        assert [unflock(obj) for obj in objects] == records
+        assert get_context(objects[2].user.address) is objects[2]
+        records[1]['id'] = 'one'
+        records[3]['user']['name'] = None
+        del records[4]['active']
+        with pytest.raises(ValidationError) as info:
+            self.schema.many(records)
+        assert [path for path, _ in info.value.errors] == [(1, 'id'), (3, 'user', 'name'), (4, 'active')]
+
+    def test_definition_errors(self):
+        with pytest.raises(TypeError):
+            Schema({'user': int, 'user__name': str})
+        with pytest.raises(TypeError):
+            Schema({'ids': [int, str]})
+        with pytest.raises(TypeError):
+            Schema({'id': 1})
+
+    def test_pickle_error(self):
+        error = pickle.loads(pickle.dumps(ValidationError([(('id',), 'missing')])))
+        assert error.errors == [(('id',), 'missing')]
+        assert str(error) == 'id: missing'
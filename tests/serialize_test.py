@@ -0,0 +1,45 @@
+from __future__ import unicode_literals
+
+import io
+import json
+
+import pytest
+
+from cuckoos.flock import flock, unflock
+from cuckoos.serialize import dumps, dump, default
+
+definition = {'id': 1, 'user': {'name': 'User', 'tags': ['a', {'b': None}]},
+              'auth': {'token': 'abc', 'scopes': {}}, 'ratio': 0.5, 'active': True}
+
+
+class TestSerialize:
+    @pytest.mark.parametrize('mode', [{}, {'compact': True}, {'lazy': True}])
+    def test_dumps(self, mode):
+        obj = flock(definition, **mode)
+        assert json.loads(dumps(obj)) == definition
+        assert dumps(obj, sort_keys=True) == json.dumps(definition, sort_keys=True)
+
+    def test_lazy_assigned(self):
+        obj = flock(definition, lazy=True)
+        obj.id = 5
+        obj.user.name = 'Other'
+        assert json.loads(dumps(obj)) == unflock(obj)
+        assert unflock(obj)['user']['name'] == 'Other' and definition['user']['name'] == 'User'
+
+    def test_dump(self):
+        obj = flock(definition)
+        text, binary = io.StringIO(), io.BytesIO()
+        dump(obj, text)
+        dump(obj, binary, indent=2)
+        assert json.loads(text.getvalue()) == definition
+        assert json.loads(binary.getvalue().decode('utf-8')) == definition
+
+    def test_nested_in_values(self):
+        data = {'objects': [flock(definition)], 'other': 1}
+        assert json.loads(json.dumps(data, default=default)) == {'objects': [definition], 'other': 1}
+
+    def test_not_serializable(self):
+        with pytest.raises(TypeError):
+            dumps(flock({'one': object()}))
+        with pytest.raises(TypeError):
+            dumps(flock({'one': lambda _: 1}))
@@ -0,0 +1,77 @@
+from __future__ import unicode_literals
+
+import json
+from io import BytesIO, StringIO
+
+import pytest
+
+from cuckoos.flock import flock, unflock, get_context
+from cuckoos.stream import flock_stream
+
+records = [
+    {'id': 1, 'user': {'name': 'User', 'tags': ['a', 'b']}},
+    {'id': 2, 'user': {'name': 'Other', 'tags': []}},
+    {'id': 3, 'user': None, 'groups': [{'name': 'a', 'roles': [[{'name': 'b'}]]}]},
+]
+
+
+class TestStream:
+    def test_stream_ndjson(self):
+        source = StringIO('\n'.join(json.dumps(record) for record in records) + '\n\n')
+        objects = list(flock_stream(source))
+        assert [unflock(obj) for obj in objects] == records
+        assert objects[0].user.name == 'User'
+        assert get_context(objects[0].user) is objects[0]
+        assert objects[2].groups == records[2]['groups']
+
+    def test_stream_binary(self):
+        source = BytesIO('\n'.join(json.dumps(record) for record in records).encode('utf-8'))
+        assert [unflock(obj) for obj in flock_stream(source, chunk_size=7)] == records
+
+    def test_stream_array(self):
+        source = StringIO(json.dumps(records, indent=2))
+        assert [unflock(obj) for obj in flock_stream(source, chunk_size=7)] == records
+
+    def test_stream_binary_array(self):
+        values = [{'name': '\u00e9t\u00e9 \u2603 \U0001f426', 'nested': {'key': '\u00fc' * 5}}] * 3
+        source = BytesIO(json.dumps(values, indent=2, ensure_ascii=False).encode('utf-8'))
+        assert [unflock(obj) for obj in flock_stream(source, chunk_size=7)] == values
+
+    def test_stream_array_objects(self):
+        created = flock.cache_info().misses
+        obj = next(flock_stream(StringIO('{"tags": [{"a-b": 1}]}'), compact=True))
+        assert obj.tags == [{'a-b': 1}]
+        assert flock.cache_info().misses - created <= 1
+
+    def test_stream_empty(self):
+        assert list(flock_stream(StringIO(''))) == []
+        assert list(flock_stream(StringIO('[]'))) == []
+
+    def test_stream_compact(self):
+        obj = next(flock_stream(StringIO(json.dumps(records[0])), compact=True))
+        assert not hasattr(obj, '__dict__')
+        assert type(obj) is type(flock(records[0], compact=True))
+
+    def test_stream_non_object(self):
+        with pytest.raises(ValueError):
+            list(flock_stream(StringIO('[1, 2]')))
+
+    @pytest.mark.parametrize('dump', [lambda count: (json.dumps(records[0]) + '\n') * count,
+                                      lambda count: json.dumps([records[0]] * count)],
+                             ids=['ndjson', 'single line array'])
+    def test_stream_bounded_memory(self, dump):
+        tracemalloc = pytest.importorskip('tracemalloc')
+
+        def peak(count):
+            source = StringIO(dump(count))
+            tracemalloc.start()
+            try:
+                for _ in flock_stream(source, chunk_size=4096):
+                    pass
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        # Warm interpreter free lists up so that they do not account for growth.
+        peak(2500)
+        assert peak(10000) < 2 * peak(1000)
@@ -5,7 +5,11 @@ try:
 except ImportError:
     from ordereddict import OrderedDict
 
-from cuckoos.utils import merge, listify, extend, partition
+import copy
+
+import pytest
+
+from cuckoos.utils import merge, combine, listify, extend, partition
 
 
 class TestUtils:
@@ -33,3 +37,58 @@ class TestUtils:
         assert partition('a.nested.string', sep='.') == {'a': {'nested': {'string': None}}}
         assert partition('a__nested__string', sep='.') == {'a__nested__string': None}
         assert partition('a_string', sep='_', ref=42) == {'a': {'string': 42}}
+
+
+class TestCombine:
+    def setup(self):
+        self.layers = [
+            {'name': 'base', 'db': {'host': 'localhost', 'hosts': ['a'], 'options': {'ssl': True}},
+             'tags': ('x',)},
+            {'name': 'env', 'db': {'port': 5432, 'hosts': ['b'], 'options': 1}, 'tags': 'y'},
+            {'db': {'hosts': ['c'], 'options': {'timeout': 3}}, 'cache': {'ttl': 60}},
+        ]
+
+    def test_multi(self):
+        expected = {}
+        for layer in copy.deepcopy(self.layers):
+            expected = merge(expected, layer)
+        assert combine(self.layers) == expected
+
+    def test_inputs_untouched(self):
+        layers = copy.deepcopy(self.layers)
+        result = combine(layers)
+        assert layers == self.layers
+        # Levels found in a single layer are shared, others are new.
+        assert result['cache'] is layers[2]['cache']
+        assert result['db'] is not layers[0]['db']
+
+    def test_strategies(self):
+        result = combine(self.layers, 'override', {'db.hosts': 'append', 'tags': 'append'})
+        assert result['name'] == 'env'
+        assert result['db']['hosts'] == ['a', 'b', 'c']
+        assert result['db']['options'] == {'timeout': 3}
+        assert result['tags'] == 'y'
+        result = combine(self.layers, paths={'db': 'override'})
+        assert result['name'] == ['base', 'env']
+        assert result['db']['hosts'] == ['c']
+
+    def test_callable(self):
+        calls = []
+
+        def keep_first(path, current, value):
+            calls.append(path)
+            return current
+        result = combine(self.layers, keep_first)
+        assert result['name'] == 'base' and result['db']['hosts'] == ['a']
+        assert ('db', 'options') in calls
+
+    def test_error(self):
+        assert combine([{'one': {'two': 2}}, {'one': {'three': 3}}], 'error') == \
+            {'one': {'two': 2, 'three': 3}}
+        with pytest.raises(ValueError):
+            combine(self.layers, paths={'db.port': 'override', 'name': 'error'})
+        with pytest.raises(ValueError):
+            combine(self.layers, 'unknown')
+
+    def test_many_collisions(self):
+        assert combine([{'one': index} for index in range(10000)]) == {'one': list(range(10000))}